@@ -1,28 +1,84 @@
+__all__ = ["InMemoryAuthRepo", "AuthStoreMetrics"]
+
+import heapq
+import itertools
+import sys
+import threading
+import time
+from typing import NotRequired, TypedDict, Unpack
+
+from app.adapters.integration_keys import IntegrationKeysIndex, IntegrationMetrics
 from app.config import config
 from app.domain.dependencies.iam_repo import AuthRepo
 from app.domain.entities import Integration, RefreshTokenInfo, User
 from app.domain.entities.common import TimeStamp
+from app.domain.exceptions import NotFoundError
+
+DEFAULT_MAX_REFRESH_TOKENS_PER_USER = 10
+
+# The expiry heap is rebuilt once it holds this many times more entries
+# than there are live tokens (deleted tokens are left in it until then).
+EXPIRY_HEAP_MAX_GARBAGE_RATIO = 2
+
+
+class AuthStoreMetrics(TypedDict):
+    users: int
+    refresh_tokens: int
+    # Entries of the expiry heap, including the ones of deleted tokens
+    expiry_heap_entries: int
+    # Shallow size of the containers, without the entities themselves
+    containers_bytes: int
+
+
+class InMemoryAuthRepoDict(TypedDict):
+    max_refresh_tokens_per_user: NotRequired[int]
 
 
 class InMemoryAuthRepo(AuthRepo):
-    def __init__(self):
-        self._id_counter = 1
+    """
+    Refresh tokens are indexed by their expiry in a heap, so expired ones
+    are deleted by `delete_expired_refresh_tokens` without scanning all of
+    them. Every user has at most `max_refresh_tokens_per_user` live tokens,
+    the oldest ones are revoked when a new one is created.
+
+    Only salted digests of integration keys are kept, see
+    `IntegrationKeysIndex`.
+    """
+
+    def __init__(self, **kwargs: Unpack[InMemoryAuthRepoDict]):
+        self._max_refresh_tokens_per_user = kwargs.get(
+            "max_refresh_tokens_per_user",
+            DEFAULT_MAX_REFRESH_TOKENS_PER_USER,
+        )
+
+        self._ids = itertools.count(1)
         self._users_by_id: dict[int, User] = {}
-        self._integrations_by_api_keys: dict[str, Integration] = {}
-        for refresh_token, integration_name in config.authorized_integrations.items():
-            self._integrations_by_api_keys[refresh_token] = Integration(
-                name=integration_name,
-            )
+        self._users_by_email: dict[str, User] = {}
+        # Coroutines can't interleave within `upsert_user`, but the repo
+        # may also be used from executor threads.
+        self._users_lock = threading.Lock()
+        self._integrations = IntegrationKeysIndex(config.authorized_integrations)
         self._refresh_tokens: dict[str, RefreshTokenInfo] = {}
+        # (expires at, token)
+        self._refresh_tokens_expiry: list[tuple[float, str]] = []
+        # Tokens of every user in the order they were created
+        self._refresh_tokens_by_user_id: dict[int, dict[str, None]] = {}
+        self._refresh_tokens_lock = threading.Lock()
 
     async def upsert_user(self, email: str) -> User:
-        for id, user in self._users_by_id.items():
-            if user.email == email:
+        # Existing users are found without taking the lock
+        if (user := self._users_by_email.get(email)) is not None:
+            return user
+
+        with self._users_lock:
+            # The user may have been created while we were waiting
+            if (user := self._users_by_email.get(email)) is not None:
                 return user
 
-        user = User(id=self._id_counter, email=email)
-        self._users_by_id[self._id_counter] = user
-        self._id_counter += 1
+            user = User(id=next(self._ids), email=email)
+            self._users_by_id[user.id] = user
+            self._users_by_email[email] = user
+
         return user
 
     async def get_user_by_id(self, user_id: int) -> User | None:
@@ -39,14 +95,115 @@ class InMemoryAuthRepo(AuthRepo):
             user_id=user_id,
             expires_at=expires_at,
         )
-        self._refresh_tokens[token] = refresh_token_info
+
+        with self._refresh_tokens_lock:
+            self._refresh_tokens[token] = refresh_token_info
+            heapq.heappush(self._refresh_tokens_expiry, (expires_at.timestamp(), token))
+
+            user_tokens = self._refresh_tokens_by_user_id.setdefault(user_id, {})
+            user_tokens[token] = None
+
+            while len(user_tokens) > self._max_refresh_tokens_per_user:
+                self._delete_refresh_token(next(iter(user_tokens)))
+
+            self._compact_expiry_heap()
+
         return refresh_token_info
 
     async def get_refresh_token_info(self, token: str) -> RefreshTokenInfo | None:
         return self._refresh_tokens.get(token)
 
     async def delete_refresh_token(self, token: str) -> None:
-        del self._refresh_tokens[token]
+        with self._refresh_tokens_lock:
+            if token not in self._refresh_tokens:
+                raise NotFoundError("Refresh token is not found")
+            self._delete_refresh_token(token)
+
+    async def rotate_refresh_token(
+        self,
+        token: str,
+        new_token: str,
+        now: TimeStamp,
+        expires_at: TimeStamp,
+    ) -> RefreshTokenInfo | None:
+        with self._refresh_tokens_lock:
+            refresh_token_info = self._refresh_tokens.get(token)
+            if refresh_token_info is None:
+                return None
+
+            self._delete_refresh_token(token)
+
+            if now >= refresh_token_info.expires_at:
+                return None
+
+        return await self.create_refresh_token(
+            new_token,
+            refresh_token_info.user_id,
+            expires_at,
+        )
+
+    async def delete_expired_refresh_tokens(self, now: TimeStamp) -> int:
+        deleted = 0
+
+        with self._refresh_tokens_lock:
+            expiry = self._refresh_tokens_expiry
+
+            while expiry and expiry[0][0] <= now.timestamp():
+                _, token = heapq.heappop(expiry)
+
+                refresh_token_info = self._refresh_tokens.get(token)
+                # The token may have been deleted, or it is another token
+                # with the same value
+                if refresh_token_info is None or refresh_token_info.expires_at > now:
+                    continue
+
+                self._delete_refresh_token(token)
+                deleted += 1
+
+        return deleted
 
     async def get_integration_by_api_key(self, api_key: str) -> Integration | None:
-        return self._integrations_by_api_keys.get(api_key)
+        return self._integrations.find(api_key, time.time())
+
+    async def get_integrations_metrics(self) -> dict[str, IntegrationMetrics]:
+        return self._integrations.get_metrics(time.time())
+
+    def get_metrics(self) -> AuthStoreMetrics:
+        containers = (
+            self._users_by_id,
+            self._users_by_email,
+            self._refresh_tokens,
+            self._refresh_tokens_expiry,
+            self._refresh_tokens_by_user_id,
+            *self._refresh_tokens_by_user_id.values(),
+        )
+
+        return AuthStoreMetrics(
+            users=len(self._users_by_id),
+            refresh_tokens=len(self._refresh_tokens),
+            expiry_heap_entries=len(self._refresh_tokens_expiry),
+            containers_bytes=sum(map(sys.getsizeof, containers)),
+        )
+
+    def _delete_refresh_token(self, token: str):
+        refresh_token_info = self._refresh_tokens.pop(token)
+
+        user_tokens = self._refresh_tokens_by_user_id[refresh_token_info.user_id]
+        del user_tokens[token]
+        if not user_tokens:
+            del self._refresh_tokens_by_user_id[refresh_token_info.user_id]
+
+        # The expiry heap entry is left to be skipped by the sweep
+
+    def _compact_expiry_heap(self):
+        live = len(self._refresh_tokens)
+        if len(self._refresh_tokens_expiry) <= EXPIRY_HEAP_MAX_GARBAGE_RATIO * (
+            live + 1
+        ):
+            return
+
+        self._refresh_tokens_expiry = [
+            (info.expires_at.timestamp(), token)
+            for token, info in self._refresh_tokens.items()
+        ]
+        heapq.heapify(self._refresh_tokens_expiry)
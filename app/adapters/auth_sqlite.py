@@ -0,0 +1,383 @@
+__all__ = ["SQLiteAuthRepo", "SQLiteConnectionPool"]
+
+import asyncio
+import collections.abc
+import concurrent.futures
+import hmac
+import queue
+import sqlite3
+import time
+from pathlib import Path
+from typing import NotRequired, TypedDict, TypeVar, Unpack
+
+from app.adapters.integration_keys import (
+    IntegrationMetrics,
+    create_salt,
+    get_api_key_prefix,
+    get_rate_window_start,
+    hash_api_key,
+)
+from app.config import config
+from app.domain.dependencies.iam_repo import AuthRepo
+from app.domain.entities import Integration, RefreshTokenInfo, User
+from app.domain.entities.common import TimeStamp
+from app.domain.exceptions import NotFoundError
+
+T = TypeVar("T")
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MAX_REFRESH_TOKENS_PER_USER = 10
+
+# Seconds to wait for a lock held by another connection (or process)
+BUSY_TIMEOUT = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS refresh_tokens (
+    token TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+-- Per-user cap, in the order the tokens were created
+CREATE INDEX IF NOT EXISTS refresh_tokens_user
+    ON refresh_tokens (user_id);
+
+-- Sweeping of expired tokens
+CREATE INDEX IF NOT EXISTS refresh_tokens_expires_at
+    ON refresh_tokens (expires_at);
+
+-- Raw API keys were kept there before
+DROP TABLE IF EXISTS integrations;
+
+CREATE TABLE IF NOT EXISTS integration_keys (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    key_prefix TEXT NOT NULL,
+    salt BLOB NOT NULL,
+    digest BLOB NOT NULL,
+    requests INTEGER NOT NULL DEFAULT 0,
+    window_start REAL NOT NULL DEFAULT 0,
+    window_requests INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS integration_keys_prefix
+    ON integration_keys (key_prefix);
+"""
+
+# Statements are kept as constants, so that every connection compiles each
+# of them once and then takes it from its statements cache.
+UPSERT_USER = (
+    "INSERT INTO users (email) VALUES (?)"
+    " ON CONFLICT (email) DO UPDATE SET email = excluded.email"
+    " RETURNING id"
+)
+GET_USER_BY_ID = "SELECT id, email FROM users WHERE id = ?"
+INSERT_REFRESH_TOKEN = (
+    "INSERT OR REPLACE INTO refresh_tokens (token, user_id, expires_at)"
+    " VALUES (?, ?, ?)"
+)
+DELETE_EXCESS_REFRESH_TOKENS = (
+    "DELETE FROM refresh_tokens WHERE user_id = ? AND rowid NOT IN ("
+    " SELECT rowid FROM refresh_tokens WHERE user_id = ?"
+    " ORDER BY rowid DESC LIMIT ?"
+    ")"
+)
+GET_REFRESH_TOKEN = (
+    "SELECT token, user_id, expires_at FROM refresh_tokens WHERE token = ?"
+)
+DELETE_REFRESH_TOKEN = (
+    "DELETE FROM refresh_tokens WHERE token = ? RETURNING user_id, expires_at"
+)
+DELETE_EXPIRED_REFRESH_TOKENS = "DELETE FROM refresh_tokens WHERE expires_at <= ?"
+GET_INTEGRATION_KEYS = (
+    "SELECT id, name, salt, digest FROM integration_keys WHERE key_prefix = ?"
+)
+COUNT_INTEGRATION_REQUEST = (
+    "UPDATE integration_keys SET requests = requests + 1,"
+    " window_requests = CASE WHEN window_start = ?1"
+    " THEN window_requests + 1 ELSE 1 END,"
+    " window_start = ?1"
+    " WHERE id = ?2"
+)
+GET_INTEGRATIONS_METRICS = (
+    "SELECT name, SUM(requests),"
+    " SUM(CASE WHEN window_start = ? THEN window_requests ELSE 0 END)"
+    " FROM integration_keys GROUP BY name"
+)
+
+
+class SQLiteConnectionPool:
+    """
+    Fixed set of SQLite connections that are used from executor threads.
+
+    A connection is taken by one thread at a time, so queries of different
+    coroutines run in parallel without blocking the event loop. Reads start
+    deferred transactions, which don't block each other or the writer in
+    WAL mode; writes take the write lock right away, so that they don't
+    fail on upgrading a read lock.
+    """
+
+    def __init__(self, path: Path | str, size: int = DEFAULT_POOL_SIZE):
+        self._connections: queue.SimpleQueue[sqlite3.Connection] = queue.SimpleQueue()
+        self._all_connections: list[sqlite3.Connection] = []
+
+        for _ in range(size):
+            connection = sqlite3.connect(
+                path,
+                timeout=BUSY_TIMEOUT,
+                check_same_thread=False,
+                # Transactions are started explicitly
+                isolation_level=None,
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            self._connections.put(connection)
+            self._all_connections.append(connection)
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=size)
+
+    async def run(
+        self,
+        func: collections.abc.Callable[[sqlite3.Connection], T],
+        write: bool = True,
+    ) -> T:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            self.run_blocking,
+            func,
+            write,
+        )
+
+    def run_blocking(
+        self,
+        func: collections.abc.Callable[[sqlite3.Connection], T],
+        write: bool = True,
+    ) -> T:
+        """
+        Runs `func` in a transaction on one of the connections.
+
+        :param write: Whether `func` changes the database.
+        """
+
+        connection = self._connections.get()
+        try:
+            connection.execute("BEGIN IMMEDIATE" if write else "BEGIN DEFERRED")
+            try:
+                result = func(connection)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return result
+        finally:
+            self._connections.put(connection)
+
+    def close(self):
+        self._executor.shutdown()
+        for connection in self._all_connections:
+            connection.close()
+
+
+class SQLiteAuthRepoDict(TypedDict):
+    # Every pooled connection to ":memory:" gets a database of its own
+    path: Path | str
+    pool_size: NotRequired[int]
+    max_refresh_tokens_per_user: NotRequired[int]
+
+
+class SQLiteAuthRepo(AuthRepo):
+    """
+    Auth repository in an SQLite database, so that sessions survive restarts
+    and are shared by all the workers on the host.
+    """
+
+    def __init__(self, **kwargs: Unpack[SQLiteAuthRepoDict]):
+        self._max_refresh_tokens_per_user = kwargs.get(
+            "max_refresh_tokens_per_user",
+            DEFAULT_MAX_REFRESH_TOKENS_PER_USER,
+        )
+        self._pool = SQLiteConnectionPool(
+            kwargs["path"],
+            kwargs.get("pool_size", DEFAULT_POOL_SIZE),
+        )
+        self._pool.run_blocking(self._init_blocking)
+
+    def close(self):
+        self._pool.close()
+
+    async def upsert_user(self, email: str) -> User:
+        def upsert(connection: sqlite3.Connection) -> User:
+            (user_id,) = connection.execute(UPSERT_USER, (email,)).fetchone()
+            return User(id=user_id, email=email)
+
+        return await self._pool.run(upsert)
+
+    async def get_user_by_id(self, user_id: int) -> User | None:
+        def get(connection: sqlite3.Connection) -> User | None:
+            row = connection.execute(GET_USER_BY_ID, (user_id,)).fetchone()
+            return None if row is None else User(id=row[0], email=row[1])
+
+        return await self._pool.run(get, write=False)
+
+    async def create_refresh_token(
+        self,
+        token: str,
+        user_id: int,
+        expires_at: TimeStamp,
+    ) -> RefreshTokenInfo:
+        def create(connection: sqlite3.Connection) -> RefreshTokenInfo:
+            self._insert_refresh_token(connection, token, user_id, expires_at)
+            return RefreshTokenInfo(token=token, user_id=user_id, expires_at=expires_at)
+
+        return await self._pool.run(create)
+
+    async def get_refresh_token_info(self, token: str) -> RefreshTokenInfo | None:
+        def get(connection: sqlite3.Connection) -> RefreshTokenInfo | None:
+            row = connection.execute(GET_REFRESH_TOKEN, (token,)).fetchone()
+            if row is None:
+                return None
+            return RefreshTokenInfo(
+                token=row[0],
+                user_id=row[1],
+                expires_at=TimeStamp(row[2]),
+            )
+
+        return await self._pool.run(get, write=False)
+
+    async def delete_refresh_token(self, token: str) -> None:
+        def delete(connection: sqlite3.Connection):
+            if connection.execute(DELETE_REFRESH_TOKEN, (token,)).fetchone() is None:
+                raise NotFoundError("Refresh token is not found")
+
+        await self._pool.run(delete)
+
+    async def rotate_refresh_token(
+        self,
+        token: str,
+        new_token: str,
+        now: TimeStamp,
+        expires_at: TimeStamp,
+    ) -> RefreshTokenInfo | None:
+        def rotate(connection: sqlite3.Connection) -> RefreshTokenInfo | None:
+            row = connection.execute(DELETE_REFRESH_TOKEN, (token,)).fetchone()
+            if row is None:
+                return None
+
+            user_id, old_expires_at = row
+            if old_expires_at <= now.timestamp():
+                return None
+
+            self._insert_refresh_token(connection, new_token, user_id, expires_at)
+            return RefreshTokenInfo(
+                token=new_token,
+                user_id=user_id,
+                expires_at=expires_at,
+            )
+
+        return await self._pool.run(rotate)
+
+    async def delete_expired_refresh_tokens(self, now: TimeStamp) -> int:
+        def delete(connection: sqlite3.Connection) -> int:
+            cursor = connection.execute(
+                DELETE_EXPIRED_REFRESH_TOKENS, (now.timestamp(),)
+            )
+            return cursor.rowcount
+
+        return await self._pool.run(delete)
+
+    async def get_integration_by_api_key(self, api_key: str) -> Integration | None:
+        window_start = get_rate_window_start(time.time())
+
+        def get(connection: sqlite3.Connection) -> Integration | None:
+            rows = connection.execute(
+                GET_INTEGRATION_KEYS, (get_api_key_prefix(api_key),)
+            ).fetchall()
+
+            # Every candidate is checked, so that the time doesn't tell
+            # which of them matched
+            matched: tuple[int, str] | None = None
+            for key_id, name, salt, digest in rows:
+                if hmac.compare_digest(hash_api_key(api_key, salt), digest):
+                    matched = (key_id, name)
+
+            if matched is None:
+                return None
+
+            connection.execute(COUNT_INTEGRATION_REQUEST, (window_start, matched[0]))
+            return Integration(name=matched[1])
+
+        return await self._pool.run(get)
+
+    async def get_integrations_metrics(self) -> dict[str, IntegrationMetrics]:
+        window_start = get_rate_window_start(time.time())
+
+        def get(connection: sqlite3.Connection) -> dict[str, IntegrationMetrics]:
+            rows = connection.execute(GET_INTEGRATIONS_METRICS, (window_start,))
+            return {
+                name: IntegrationMetrics(
+                    requests=requests,
+                    window_requests=window_requests,
+                )
+                for name, requests, window_requests in rows
+            }
+
+        return await self._pool.run(get, write=False)
+
+    def _init_blocking(self, connection: sqlite3.Connection):
+        for statement in SCHEMA.split(";"):
+            if statement.strip():
+                connection.execute(statement)
+
+        self._sync_integration_keys(connection)
+
+    def _sync_integration_keys(self, connection: sqlite3.Connection):
+        # Integrations are configured, the table only mirrors the config.
+        # Keys that are still configured keep their counters.
+        rows = connection.execute(
+            "SELECT id, name, key_prefix, salt, digest FROM integration_keys"
+        ).fetchall()
+        kept_ids: set[int] = set()
+
+        for api_key, name in config.authorized_integrations.items():
+            prefix = get_api_key_prefix(api_key)
+
+            for key_id, key_name, key_prefix, salt, digest in rows:
+                if (
+                    key_name == name
+                    and key_prefix == prefix
+                    and hmac.compare_digest(hash_api_key(api_key, salt), digest)
+                ):
+                    kept_ids.add(key_id)
+                    break
+            else:
+                salt = create_salt()
+                cursor = connection.execute(
+                    "INSERT INTO integration_keys (name, key_prefix, salt, digest)"
+                    " VALUES (?, ?, ?, ?)",
+                    (name, prefix, salt, hash_api_key(api_key, salt)),
+                )
+                kept_ids.add(cursor.lastrowid or 0)
+
+        connection.executemany(
+            "DELETE FROM integration_keys WHERE id = ?",
+            [(row[0],) for row in rows if row[0] not in kept_ids],
+        )
+
+    def _insert_refresh_token(
+        self,
+        connection: sqlite3.Connection,
+        token: str,
+        user_id: int,
+        expires_at: TimeStamp,
+    ):
+        connection.execute(
+            INSERT_REFRESH_TOKEN, (token, user_id, expires_at.timestamp())
+        )
+        connection.execute(
+            DELETE_EXCESS_REFRESH_TOKENS,
+            (user_id, user_id, self._max_refresh_tokens_per_user),
+        )
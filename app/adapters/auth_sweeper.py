@@ -0,0 +1,61 @@
+__all__ = ["RefreshTokensSweeper"]
+
+import asyncio
+from datetime import timedelta
+from logging import getLogger
+from typing import NotRequired, TypedDict, Unpack
+
+from app.domain.dependencies.iam_repo import AuthRepo
+from app.domain.entities import TimeStamp
+
+DEFAULT_SWEEP_INTERVAL = timedelta(minutes=10)
+
+logger = getLogger(__name__)
+
+
+class RefreshTokensSweeperDict(TypedDict):
+    repo: AuthRepo
+    interval: NotRequired[timedelta]
+
+
+class RefreshTokensSweeper:
+    """
+    Deletes expired refresh tokens every `interval`, so that tokens of
+    users that never come back don't stay in the repository forever.
+    """
+
+    def __init__(self, **kwargs: Unpack[RefreshTokensSweeperDict]):
+        self._repo = kwargs["repo"]
+        self._interval = kwargs.get("interval", DEFAULT_SWEEP_INTERVAL)
+
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run(self):
+        while True:
+            await self.sweep()
+            await asyncio.sleep(self._interval.total_seconds())
+
+    async def sweep(self):
+        try:
+            deleted = await self._repo.delete_expired_refresh_tokens(TimeStamp.now())
+        except Exception as e:
+            logger.warning(f"Error while deleting expired refresh tokens: {e}")
+            return
+
+        if deleted:
+            logger.info(f"Deleted {deleted} expired refresh tokens")
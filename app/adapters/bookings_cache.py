@@ -0,0 +1,308 @@
+__all__ = ["CachedBookings"]
+
+import collections
+import math
+import time
+from datetime import timedelta
+from typing import NotRequired, TypedDict, Unpack
+
+from app.adapters.outlook import RoomsRegistry
+from app.domain.dependencies import BookingsRepo
+from app.domain.entities import (
+    Booking,
+    BookingId,
+    BookingWithId,
+    Room,
+    TimePeriod,
+    TimeStamp,
+    User,
+)
+
+DAY_SECONDS = 24 * 60 * 60
+
+DEFAULT_MAX_STALENESS = timedelta(minutes=1)
+DEFAULT_MAX_CACHED_BOOKINGS = 100_000
+
+# (room email, day number since epoch)
+BucketKey = tuple[str, int]
+
+
+class DayBucket:
+    """
+    All bookings of one room that overlap one (UTC) day.
+    """
+
+    def __init__(self, fetched_at: float):
+        self.fetched_at = fetched_at
+        self.bookings: dict[BookingId, BookingWithId] = {}
+
+
+class CachedBookingsDict(TypedDict):
+    bookings_repo: BookingsRepo
+    rooms_registry: RoomsRegistry
+    max_staleness: NotRequired[timedelta]
+    max_cached_bookings: NotRequired[int]
+
+
+class CachedBookings(BookingsRepo):
+    """
+    Write-through cache in front of another bookings repository.
+
+    Bookings are kept in per-room, per-day buckets. Period queries are served
+    from memory when all the buckets they touch are younger than
+    `max_staleness`; otherwise the stale rooms are fetched for whole days and
+    their buckets are replaced. Least recently used buckets are evicted once
+    more than `max_cached_bookings` bookings are cached (every bucket counts
+    as one more booking, so that empty days aren't free either).
+    """
+
+    _buckets: collections.OrderedDict[BucketKey, DayBucket]
+
+    def __init__(self, **kwargs: Unpack[CachedBookingsDict]):
+        self._repo = kwargs["bookings_repo"]
+        self._rooms = kwargs["rooms_registry"]
+        self._max_staleness = kwargs.get(
+            "max_staleness",
+            DEFAULT_MAX_STALENESS,
+        ).total_seconds()
+        self._max_cached_bookings = kwargs.get(
+            "max_cached_bookings",
+            DEFAULT_MAX_CACHED_BOOKINGS,
+        )
+
+        self._buckets = collections.OrderedDict()
+        self._cached_bookings_count = 0
+
+        # Incremented on every write to a room, so that a fetch that raced
+        # with a write doesn't put outdated buckets into the cache.
+        self._rooms_versions: collections.Counter[str] = collections.Counter()
+
+    async def create_booking(self, booking: Booking) -> BookingId:
+        booking_id = await self._repo.create_booking(booking)
+        self._add_created_booking(booking, booking_id)
+        return booking_id
+
+    async def create_bookings(
+        self,
+        bookings: list[Booking],
+    ) -> list[BookingId | Exception]:
+        results = await self._repo.create_bookings(bookings)
+
+        for booking, result in zip(bookings, results):
+            if not isinstance(result, Exception):
+                self._add_created_booking(booking, result)
+
+        return results
+
+    async def delete_booking(self, booking_id: BookingId):
+        await self._repo.delete_booking(booking_id)
+        self._drop_buckets_with_bookings({booking_id})
+
+    async def delete_bookings(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[Exception | None]:
+        results = await self._repo.delete_bookings(bookings_ids)
+
+        self._drop_buckets_with_bookings(
+            {
+                booking_id
+                for booking_id, result in zip(bookings_ids, results)
+                if result is None
+            }
+        )
+
+        return results
+
+    async def get_bookings_in_period(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+        filter_user_email: str | None = None,
+    ) -> list[BookingWithId]:
+        if filter_rooms is None:
+            filter_rooms = self._rooms.get_all()
+
+        days = get_period_days(period)
+
+        fresh_rooms: list[Room] = []
+        stale_rooms: list[Room] = []
+        for room in filter_rooms:
+            if self._is_fresh(room.email, days):
+                fresh_rooms.append(room)
+            else:
+                stale_rooms.append(room)
+
+        candidates: list[BookingWithId] = []
+
+        for room in fresh_rooms:
+            for day in days:
+                self._buckets.move_to_end((room.email, day))
+                candidates.extend(self._buckets[(room.email, day)].bookings.values())
+
+        if stale_rooms:
+            stale_rooms_emails = {room.email for room in stale_rooms}
+            candidates.extend(
+                booking
+                for booking in await self._fetch(stale_rooms, days)
+                if booking.room.email in stale_rooms_emails
+            )
+
+        bookings: dict[BookingId, BookingWithId] = {}
+
+        for booking in candidates:
+            if booking.id in bookings:
+                continue
+
+            if not is_overlapping(booking.period, period):
+                continue
+
+            if (
+                filter_user_email is not None
+                and booking.owner.email != filter_user_email
+            ):
+                continue
+
+            bookings[booking.id] = booking
+
+        return list(bookings.values())
+
+    async def get_rooms_busy_periods(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+    ) -> dict[str, list[TimePeriod]]:
+        if filter_rooms is None:
+            filter_rooms = self._rooms.get_all()
+
+        days = get_period_days(period)
+
+        if not all(self._is_fresh(room.email, days) for room in filter_rooms):
+            # Free/busy lookup is cheaper than filling the cache with bookings
+            return await self._repo.get_rooms_busy_periods(period, filter_rooms)
+
+        bookings = await self.get_bookings_in_period(period, filter_rooms)
+
+        busy_periods: dict[str, list[TimePeriod]] = {
+            room.email: [] for room in filter_rooms
+        }
+        for booking in bookings:
+            busy_periods[booking.room.email].append(booking.period)
+
+        return busy_periods
+
+    async def get_booking_owner(self, booking_id: BookingId) -> User:
+        return await self._repo.get_booking_owner(booking_id)
+
+    async def get_bookings_owners(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[User | Exception]:
+        return await self._repo.get_bookings_owners(bookings_ids)
+
+    async def _fetch(self, rooms: list[Room], days: range) -> list[BookingWithId]:
+        fetched_at = time.monotonic()
+        versions = {room.email: self._rooms_versions[room.email] for room in rooms}
+
+        # Fetch whole days, so that the buckets are complete
+        bookings = await self._repo.get_bookings_in_period(
+            TimePeriod(
+                start=TimeStamp(days.start * DAY_SECONDS),
+                end=TimeStamp(days.stop * DAY_SECONDS),
+            ),
+            filter_rooms=rooms,
+        )
+
+        buckets: dict[BucketKey, DayBucket] = {}
+
+        for room in rooms:
+            if self._rooms_versions[room.email] != versions[room.email]:
+                continue
+
+            for day in days:
+                buckets[(room.email, day)] = DayBucket(fetched_at)
+
+        for booking in bookings:
+            for day in get_period_days(booking.period):
+                bucket = buckets.get((booking.room.email, day))
+                if bucket is not None:
+                    bucket.bookings[booking.id] = booking
+
+        for key, bucket in buckets.items():
+            self._drop_bucket(key)
+            self._buckets[key] = bucket
+            self._cached_bookings_count += get_bucket_size(bucket)
+
+        self._evict()
+
+        return bookings
+
+    def _is_fresh(self, room_email: str, days: range) -> bool:
+        now = time.monotonic()
+
+        for day in days:
+            bucket = self._buckets.get((room_email, day))
+            if bucket is None or now - bucket.fetched_at > self._max_staleness:
+                return False
+
+        return True
+
+    def _add_created_booking(self, booking: Booking, booking_id: BookingId):
+        self._rooms_versions[booking.room.email] += 1
+
+        booking_with_id = BookingWithId(
+            id=booking_id,
+            title=booking.title,
+            owner=booking.owner,
+            period=booking.period,
+            room=booking.room,
+        )
+
+        for day in get_period_days(booking.period):
+            bucket = self._buckets.get((booking.room.email, day))
+            if bucket is not None:
+                self._add_to_bucket(bucket, booking_with_id)
+
+    def _add_to_bucket(self, bucket: DayBucket, booking: BookingWithId):
+        if booking.id not in bucket.bookings:
+            self._cached_bookings_count += 1
+        bucket.bookings[booking.id] = booking
+
+    def _drop_buckets_with_bookings(self, bookings_ids: set[BookingId]):
+        if not bookings_ids:
+            return
+
+        # A deleted booking may also be present in the room calendar under
+        # another ID, so we drop the whole buckets instead of the single item.
+        for key, bucket in list(self._buckets.items()):
+            if not bookings_ids.isdisjoint(bucket.bookings):
+                self._rooms_versions[key[0]] += 1
+                self._drop_bucket(key)
+
+    def _drop_bucket(self, key: BucketKey):
+        bucket = self._buckets.pop(key, None)
+        if bucket is not None:
+            self._cached_bookings_count -= get_bucket_size(bucket)
+
+    def _evict(self):
+        while self._buckets and self._cached_bookings_count > self._max_cached_bookings:
+            _, bucket = self._buckets.popitem(last=False)
+            self._cached_bookings_count -= get_bucket_size(bucket)
+
+
+def get_period_days(period: TimePeriod) -> range:
+    """
+    :return: Numbers (since epoch) of the UTC days that the period overlaps.
+    """
+
+    start = math.floor(period.start.timestamp() / DAY_SECONDS)
+    end = math.ceil(period.end.timestamp() / DAY_SECONDS)
+    return range(start, max(end, start + 1))
+
+
+def get_bucket_size(bucket: DayBucket) -> int:
+    return 1 + len(bucket.bookings)
+
+
+def is_overlapping(a: TimePeriod, b: TimePeriod) -> bool:
+    return a.start < b.end and a.end > b.start
@@ -0,0 +1,268 @@
+__all__ = ["CoalescingBookings", "CoalescingMetrics"]
+
+import asyncio
+import collections.abc
+from typing import Generic, TypedDict, TypeVar, Unpack
+
+from app.adapters.bookings_cache import is_overlapping
+from app.adapters.outlook import RoomsRegistry
+from app.domain.dependencies import BookingsRepo
+from app.domain.entities import (
+    Booking,
+    BookingId,
+    BookingWithId,
+    Room,
+    TimePeriod,
+    User,
+)
+
+T = TypeVar("T")
+
+
+class CoalescingMetrics(TypedDict):
+    # Queries that reached the wrapped repository
+    fetches: int
+    # Queries that were served by a fetch of another query
+    coalesced: int
+
+
+class Flight(Generic[T]):
+    """
+    Fetch that is in progress, together with what it was asked for.
+    """
+
+    def __init__(
+        self,
+        period: TimePeriod,
+        rooms_emails: frozenset[str],
+        filter_user_email: str | None,
+        task: asyncio.Task[T],
+    ):
+        self.period = period
+        self.rooms_emails = rooms_emails
+        self.filter_user_email = filter_user_email
+        self.task = task
+
+    def covers(
+        self,
+        period: TimePeriod,
+        rooms_emails: frozenset[str],
+        filter_user_email: str | None,
+    ) -> bool:
+        return (
+            self.period.start <= period.start
+            and self.period.end >= period.end
+            and self.rooms_emails >= rooms_emails
+            and self.filter_user_email in (None, filter_user_email)
+        )
+
+
+class CoalescingBookingsDict(TypedDict):
+    bookings_repo: BookingsRepo
+    rooms_registry: RoomsRegistry
+
+
+class CoalescingBookings(BookingsRepo):
+    """
+    Single-flight layer in front of another bookings repository.
+
+    Period queries that arrive while a fetch covering them (same or longer
+    period, same or more rooms, same or no user filter) is in progress don't
+    reach the repository, they wait for that fetch and take their slice of
+    its result. So however many clients ask for the same window at once,
+    it is fetched only once.
+
+    Nothing is cached after a fetch completes, and writes detach the
+    fetches in progress, so that queries made after a write don't get
+    bookings fetched before it.
+    """
+
+    def __init__(self, **kwargs: Unpack[CoalescingBookingsDict]):
+        self._repo = kwargs["bookings_repo"]
+        self._rooms = kwargs["rooms_registry"]
+
+        self._bookings_flights: list[Flight[list[BookingWithId]]] = []
+        self._busy_periods_flights: list[Flight[dict[str, list[TimePeriod]]]] = []
+
+        self._fetches = 0
+        self._coalesced = 0
+
+    def get_metrics(self) -> CoalescingMetrics:
+        return CoalescingMetrics(fetches=self._fetches, coalesced=self._coalesced)
+
+    async def create_booking(self, booking: Booking) -> BookingId:
+        try:
+            return await self._repo.create_booking(booking)
+        finally:
+            self._detach_flights()
+
+    async def create_bookings(
+        self,
+        bookings: list[Booking],
+    ) -> list[BookingId | Exception]:
+        try:
+            return await self._repo.create_bookings(bookings)
+        finally:
+            self._detach_flights()
+
+    async def delete_booking(self, booking_id: BookingId):
+        try:
+            await self._repo.delete_booking(booking_id)
+        finally:
+            self._detach_flights()
+
+    async def delete_bookings(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[Exception | None]:
+        try:
+            return await self._repo.delete_bookings(bookings_ids)
+        finally:
+            self._detach_flights()
+
+    async def get_bookings_in_period(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+        filter_user_email: str | None = None,
+    ) -> list[BookingWithId]:
+        if filter_rooms is None:
+            filter_rooms = self._rooms.get_all()
+
+        rooms_emails = frozenset(room.email for room in filter_rooms)
+
+        flight = self._find_flight(
+            self._bookings_flights,
+            period,
+            rooms_emails,
+            filter_user_email,
+        )
+
+        if flight is None:
+            flight = self._start_flight(
+                self._bookings_flights,
+                period,
+                rooms_emails,
+                filter_user_email,
+                self._repo.get_bookings_in_period(
+                    period,
+                    filter_rooms,
+                    filter_user_email,
+                ),
+            )
+
+        bookings = await asyncio.shield(flight.task)
+
+        if (
+            flight.period == period
+            and flight.rooms_emails == rooms_emails
+            and flight.filter_user_email == filter_user_email
+        ):
+            return list(bookings)
+
+        return [
+            booking
+            for booking in bookings
+            if booking.room.email in rooms_emails
+            and is_overlapping(booking.period, period)
+            and (filter_user_email is None or booking.owner.email == filter_user_email)
+        ]
+
+    async def get_rooms_busy_periods(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+    ) -> dict[str, list[TimePeriod]]:
+        if filter_rooms is None:
+            filter_rooms = self._rooms.get_all()
+
+        rooms_emails = frozenset(room.email for room in filter_rooms)
+
+        flight = self._find_flight(
+            self._busy_periods_flights,
+            period,
+            rooms_emails,
+            None,
+        )
+
+        if flight is None:
+            flight = self._start_flight(
+                self._busy_periods_flights,
+                period,
+                rooms_emails,
+                None,
+                self._repo.get_rooms_busy_periods(period, filter_rooms),
+            )
+
+        busy_periods = await asyncio.shield(flight.task)
+
+        return {
+            room.email: [
+                busy_period
+                for busy_period in busy_periods.get(room.email, [])
+                if is_overlapping(busy_period, period)
+            ]
+            for room in filter_rooms
+        }
+
+    async def get_booking_owner(self, booking_id: BookingId) -> User:
+        return await self._repo.get_booking_owner(booking_id)
+
+    async def get_bookings_owners(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[User | Exception]:
+        return await self._repo.get_bookings_owners(bookings_ids)
+
+    def _find_flight(
+        self,
+        flights: list[Flight[T]],
+        period: TimePeriod,
+        rooms_emails: frozenset[str],
+        filter_user_email: str | None,
+    ) -> Flight[T] | None:
+        # There are only as many flights as distinct windows requested at
+        # the same moment, so a linear scan is enough.
+        for flight in flights:
+            if flight.covers(period, rooms_emails, filter_user_email):
+                self._coalesced += 1
+                return flight
+
+        return None
+
+    def _start_flight(
+        self,
+        flights: list[Flight[T]],
+        period: TimePeriod,
+        rooms_emails: frozenset[str],
+        filter_user_email: str | None,
+        fetch: collections.abc.Coroutine[object, object, T],
+    ) -> Flight[T]:
+        self._fetches += 1
+
+        # The fetch is a task of its own, so that the callers waiting for it
+        # may be cancelled without cancelling it for the others.
+        flight = Flight(
+            period,
+            rooms_emails,
+            filter_user_email,
+            asyncio.get_running_loop().create_task(fetch),
+        )
+        flights.append(flight)
+
+        def land(task: asyncio.Task[T]):
+            if flight in flights:
+                flights.remove(flight)
+            # Every caller may have been cancelled, don't let the error be
+            # reported as never retrieved.
+            if not task.cancelled():
+                task.exception()
+
+        flight.task.add_done_callback(land)
+
+        return flight
+
+    def _detach_flights(self):
+        # Fetches in progress keep serving their current callers
+        self._bookings_flights.clear()
+        self._busy_periods_flights.clear()
@@ -0,0 +1,185 @@
+__all__ = ["ReplicaBookings"]
+
+from typing import TypedDict, Unpack
+
+from app.adapters.bookings_store import BookingsStore
+from app.adapters.bookings_sync import BookingsSync
+from app.adapters.outlook import RoomsRegistry
+from app.domain.dependencies import BookingsRepo
+from app.domain.entities import (
+    Booking,
+    BookingId,
+    BookingWithId,
+    Room,
+    TimePeriod,
+    User,
+)
+
+
+class ReplicaBookingsDict(TypedDict):
+    bookings_repo: BookingsRepo
+    rooms_registry: RoomsRegistry
+    store: BookingsStore
+    sync: BookingsSync
+
+
+class ReplicaBookings(BookingsRepo):
+    """
+    Serves reads from a local store that is kept up to date by
+    `BookingsSync`, so that reads don't hit Exchange at all.
+
+    Writes go through to the wrapped repository and are applied to the store
+    right away; the sync reconciles them with the rooms calendars later.
+    Rooms that haven't been synced yet are read from the wrapped repository.
+    """
+
+    def __init__(self, **kwargs: Unpack[ReplicaBookingsDict]):
+        self._repo = kwargs["bookings_repo"]
+        self._rooms = kwargs["rooms_registry"]
+        self._store = kwargs["store"]
+        self._sync = kwargs["sync"]
+
+    async def create_booking(self, booking: Booking) -> BookingId:
+        booking_id = await self._repo.create_booking(booking)
+        self._add_created_booking(booking, booking_id)
+        return booking_id
+
+    async def create_bookings(
+        self,
+        bookings: list[Booking],
+    ) -> list[BookingId | Exception]:
+        results = await self._repo.create_bookings(bookings)
+
+        for booking, result in zip(bookings, results):
+            if not isinstance(result, Exception):
+                self._add_created_booking(booking, result)
+
+        return results
+
+    async def delete_booking(self, booking_id: BookingId):
+        await self._repo.delete_booking(booking_id)
+        self._store.delete_booking(booking_id)
+
+    async def delete_bookings(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[Exception | None]:
+        results = await self._repo.delete_bookings(bookings_ids)
+
+        for booking_id, result in zip(bookings_ids, results):
+            if result is None:
+                self._store.delete_booking(booking_id)
+
+        return results
+
+    async def get_bookings_in_period(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+        filter_user_email: str | None = None,
+    ) -> list[BookingWithId]:
+        synced_rooms, unsynced_rooms = self._split_rooms(filter_rooms)
+
+        bookings = self._store.get_bookings_in_period(
+            period,
+            [room.email for room in synced_rooms],
+            filter_user_email,
+        )
+
+        if unsynced_rooms:
+            # The wrapped repository also returns copies of bookings of other
+            # rooms (from the calendar of the service account), and the
+            # synced ones are already taken from the store
+            unsynced_emails = {room.email for room in unsynced_rooms}
+            bookings.extend(
+                booking
+                for booking in await self._repo.get_bookings_in_period(
+                    period,
+                    unsynced_rooms,
+                    filter_user_email,
+                )
+                if booking.room.email in unsynced_emails
+            )
+
+        return bookings
+
+    async def get_rooms_busy_periods(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+    ) -> dict[str, list[TimePeriod]]:
+        synced_rooms, unsynced_rooms = self._split_rooms(filter_rooms)
+
+        busy_periods: dict[str, list[TimePeriod]] = {
+            room.email: [] for room in synced_rooms
+        }
+        for booking in self._store.get_bookings_in_period(
+            period,
+            [room.email for room in synced_rooms],
+        ):
+            busy_periods[booking.room.email].append(booking.period)
+
+        if unsynced_rooms:
+            unsynced_emails = {room.email for room in unsynced_rooms}
+            busy_periods.update(
+                (room_email, periods)
+                for room_email, periods in (
+                    await self._repo.get_rooms_busy_periods(period, unsynced_rooms)
+                ).items()
+                if room_email in unsynced_emails
+            )
+
+        return busy_periods
+
+    async def get_booking_owner(self, booking_id: BookingId) -> User:
+        if (booking := self._store.get_booking(booking_id)) is not None:
+            return booking.owner
+        return await self._repo.get_booking_owner(booking_id)
+
+    async def get_bookings_owners(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[User | Exception]:
+        owners: dict[BookingId, User | Exception] = {}
+        missing_ids: list[BookingId] = []
+
+        for booking_id in bookings_ids:
+            if (booking := self._store.get_booking(booking_id)) is not None:
+                owners[booking_id] = booking.owner
+            else:
+                missing_ids.append(booking_id)
+
+        if missing_ids:
+            owners.update(
+                zip(missing_ids, await self._repo.get_bookings_owners(missing_ids))
+            )
+
+        return [owners[booking_id] for booking_id in bookings_ids]
+
+    def _add_created_booking(self, booking: Booking, booking_id: BookingId):
+        self._store.upsert_booking(
+            BookingWithId(
+                id=booking_id,
+                title=booking.title,
+                owner=booking.owner,
+                period=booking.period,
+                room=booking.room,
+            )
+        )
+
+    def _split_rooms(
+        self,
+        filter_rooms: list[Room] | None,
+    ) -> tuple[list[Room], list[Room]]:
+        if filter_rooms is None:
+            filter_rooms = self._rooms.get_all()
+
+        synced_rooms: list[Room] = []
+        unsynced_rooms: list[Room] = []
+        for room in filter_rooms:
+            if self._sync.is_room_synced(room.email):
+                synced_rooms.append(room)
+            else:
+                unsynced_rooms.append(room)
+
+        return synced_rooms, unsynced_rooms
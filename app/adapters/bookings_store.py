@@ -0,0 +1,300 @@
+__all__ = ["BookingsStore", "InMemoryBookingsStore"]
+
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from app.adapters.outlook import RoomsRegistry
+from app.domain.entities import (
+    Availability,
+    BookingId,
+    BookingWithId,
+    TimePeriod,
+    TimeStamp,
+    User,
+)
+
+# (room email, start timestamp, end timestamp)
+SlotKey = tuple[str, float, float]
+
+
+class BookingsStore(ABC):
+    """
+    Local copy of the rooms calendars, fed by `BookingsSync`.
+
+    A room may report the same booking under another ID than the calendar
+    it was created in. A booking of the same room with exactly the same
+    period as a stored one keeps the stored ID, and its own ID becomes an
+    alias: all the methods accept aliases, but return only stored IDs.
+    """
+
+    @abstractmethod
+    def upsert_booking(self, booking: BookingWithId):
+        pass
+
+    @abstractmethod
+    def delete_booking(self, booking_id: BookingId):
+        """
+        Deletes the booking together with all its aliases.
+        """
+        pass
+
+    @abstractmethod
+    def replace_room_bookings(
+        self,
+        room_email: str,
+        period: TimePeriod,
+        bookings: list[BookingWithId],
+    ):
+        """
+        Replaces all bookings of the room that overlap the period.
+        """
+        pass
+
+    @abstractmethod
+    def get_booking(self, booking_id: BookingId) -> BookingWithId | None:
+        pass
+
+    @abstractmethod
+    def get_bookings_in_period(
+        self,
+        period: TimePeriod,
+        filter_rooms_emails: list[str] | None = None,
+        filter_user_email: str | None = None,
+    ) -> list[BookingWithId]:
+        pass
+
+    @abstractmethod
+    def get_sync_state(self, room_email: str) -> str | None:
+        pass
+
+    @abstractmethod
+    def set_sync_state(self, room_email: str, sync_state: str | None):
+        pass
+
+
+class InMemoryBookingsStore(BookingsStore):
+    def __init__(self):
+        self._bookings: dict[BookingId, BookingWithId] = {}
+        self._availability = Availability()
+        self._bookings_ids_by_slot: dict[SlotKey, BookingId] = {}
+        # Queries of one user touch only the user's bookings, not every room
+        self._bookings_ids_by_owner: dict[str, set[BookingId]] = {}
+        # Alias -> stored ID, and back
+        self._aliases: dict[BookingId, BookingId] = {}
+        self._aliases_by_booking_id: dict[BookingId, set[BookingId]] = {}
+        self._sync_states: dict[str, str] = {}
+
+    def upsert_booking(self, booking: BookingWithId):
+        self._upsert_booking(booking)
+
+    def delete_booking(self, booking_id: BookingId):
+        booking_id = self._aliases.get(booking_id, booking_id)
+        self._remove_booking(booking_id)
+
+        for alias in self._aliases_by_booking_id.pop(booking_id, ()):
+            del self._aliases[alias]
+
+    def replace_room_bookings(
+        self,
+        room_email: str,
+        period: TimePeriod,
+        bookings: list[BookingWithId],
+    ):
+        # Stale bookings are deleted after the upserts, so that copies of
+        # stored bookings keep the stored IDs
+        stale_ids = {
+            booking.id for booking in self.get_bookings_in_period(period, [room_email])
+        }
+
+        for booking in bookings:
+            stale_ids.discard(self._upsert_booking(booking))
+
+        for booking_id in stale_ids:
+            self.delete_booking(booking_id)
+
+    def get_booking(self, booking_id: BookingId) -> BookingWithId | None:
+        return self._bookings.get(self._aliases.get(booking_id, booking_id))
+
+    def get_bookings_in_period(
+        self,
+        period: TimePeriod,
+        filter_rooms_emails: list[str] | None = None,
+        filter_user_email: str | None = None,
+    ) -> list[BookingWithId]:
+        if filter_user_email is not None:
+            return self._get_user_bookings_in_period(
+                period,
+                filter_rooms_emails,
+                filter_user_email,
+            )
+
+        if filter_rooms_emails is None:
+            filter_rooms_emails = self._availability.get_rooms_emails()
+
+        bookings: list[BookingWithId] = []
+
+        for room_email in filter_rooms_emails:
+            schedule = self._availability.get_schedule(room_email)
+            if schedule is None:
+                continue
+
+            bookings.extend(
+                self._bookings[booking_id]
+                for booking_id in schedule.get_overlapping(period)
+            )
+
+        return bookings
+
+    def get_sync_state(self, room_email: str) -> str | None:
+        return self._sync_states.get(room_email)
+
+    def set_sync_state(self, room_email: str, sync_state: str | None):
+        if sync_state is None:
+            self._sync_states.pop(room_email, None)
+        else:
+            self._sync_states[room_email] = sync_state
+
+    def dump(self, path: Path):
+        """
+        Saves the bookings together with the sync states, so that the store
+        can be restored after a restart without a full sync.
+        """
+
+        snapshot = {
+            "sync_states": self._sync_states,
+            "aliases": self._aliases,
+            "bookings": [
+                {
+                    "id": booking.id,
+                    "title": booking.title,
+                    "owner_email": booking.owner.email,
+                    "room_email": booking.room.email,
+                    "start": booking.period.start.timestamp(),
+                    "end": booking.period.end.timestamp(),
+                }
+                for booking in self._bookings.values()
+            ],
+        }
+
+        path.write_text(json.dumps(snapshot))
+
+    def load(self, path: Path, rooms_registry: RoomsRegistry):
+        snapshot = json.loads(path.read_text())
+
+        for booking in snapshot["bookings"]:
+            room = rooms_registry.get_by_email(booking["room_email"])
+            if room is None:
+                continue
+
+            self.upsert_booking(
+                BookingWithId(
+                    id=BookingId(booking["id"]),
+                    title=booking["title"],
+                    owner=User(id=0, email=booking["owner_email"]),
+                    room=room,
+                    period=TimePeriod(
+                        start=TimeStamp(booking["start"]),
+                        end=TimeStamp(booking["end"]),
+                    ),
+                )
+            )
+
+        # Snapshots of older versions have no aliases
+        for alias, booking_id in snapshot.get("aliases", {}).items():
+            if booking_id in self._bookings:
+                self._add_alias(BookingId(alias), BookingId(booking_id))
+
+        for room_email, sync_state in snapshot["sync_states"].items():
+            # Rooms that are not bookable anymore will be fully synced again
+            if rooms_registry.get_by_email(room_email) is not None:
+                self._sync_states[room_email] = sync_state
+
+    def _upsert_booking(self, booking: BookingWithId) -> BookingId:
+        """
+        :return: ID that the booking is stored under.
+        """
+
+        booking_id = self._aliases.get(booking.id, booking.id)
+        slot = get_booking_slot_key(booking)
+
+        duplicate_id = self._bookings_ids_by_slot.get(slot)
+        if duplicate_id is not None and duplicate_id != booking_id:
+            # The same booking under another ID, the stored one is kept
+            self._remove_booking(booking_id)
+            for alias in self._aliases_by_booking_id.pop(booking_id, set()):
+                self._add_alias(alias, duplicate_id)
+            self._add_alias(booking_id, duplicate_id)
+            booking_id = duplicate_id
+
+        self._remove_booking(booking_id)
+
+        if booking.id != booking_id:
+            booking = BookingWithId(
+                id=booking_id,
+                title=booking.title,
+                owner=booking.owner,
+                period=booking.period,
+                room=booking.room,
+            )
+
+        self._bookings[booking_id] = booking
+        self._availability.insert(booking)
+        self._bookings_ids_by_slot[slot] = booking_id
+        self._bookings_ids_by_owner.setdefault(booking.owner.email, set()).add(
+            booking_id
+        )
+
+        return booking_id
+
+    def _remove_booking(self, booking_id: BookingId):
+        """
+        Removes the booking, but keeps its aliases.
+        """
+
+        booking = self._bookings.pop(booking_id, None)
+        if booking is None:
+            return
+
+        self._availability.delete(booking_id)
+        self._bookings_ids_by_slot.pop(get_booking_slot_key(booking), None)
+
+        owner_bookings_ids = self._bookings_ids_by_owner[booking.owner.email]
+        owner_bookings_ids.discard(booking_id)
+        if not owner_bookings_ids:
+            del self._bookings_ids_by_owner[booking.owner.email]
+
+    def _add_alias(self, alias: BookingId, booking_id: BookingId):
+        self._aliases[alias] = booking_id
+        self._aliases_by_booking_id.setdefault(booking_id, set()).add(alias)
+
+    def _get_user_bookings_in_period(
+        self,
+        period: TimePeriod,
+        filter_rooms_emails: list[str] | None,
+        user_email: str,
+    ) -> list[BookingWithId]:
+        rooms_emails = None if filter_rooms_emails is None else set(filter_rooms_emails)
+
+        bookings: list[BookingWithId] = []
+
+        for booking_id in self._bookings_ids_by_owner.get(user_email, ()):
+            booking = self._bookings[booking_id]
+
+            if rooms_emails is not None and booking.room.email not in rooms_emails:
+                continue
+
+            if booking.period.start < period.end and booking.period.end > period.start:
+                bookings.append(booking)
+
+        bookings.sort(key=lambda booking: booking.period.start.timestamp())
+
+        return bookings
+
+
+def get_booking_slot_key(booking: BookingWithId) -> SlotKey:
+    return (
+        booking.room.email,
+        booking.period.start.timestamp(),
+        booking.period.end.timestamp(),
+    )
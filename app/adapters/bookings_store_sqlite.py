@@ -0,0 +1,270 @@
+__all__ = ["SQLiteBookingsStore"]
+
+import sqlite3
+from pathlib import Path
+
+from app.adapters.bookings_store import BookingsStore
+from app.adapters.outlook import RoomsRegistry
+from app.domain.entities import BookingId, BookingWithId, TimePeriod, TimeStamp, User
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    owner_email TEXT NOT NULL,
+    room_email TEXT NOT NULL,
+    starts_at REAL NOT NULL,
+    ends_at REAL NOT NULL
+);
+
+-- Period queries of rooms. It is also unique, so that the same booking
+-- reported under another ID is found and stored only once.
+CREATE UNIQUE INDEX IF NOT EXISTS bookings_room_period
+    ON bookings (room_email, starts_at, ends_at);
+
+-- Period queries of users
+CREATE INDEX IF NOT EXISTS bookings_owner_start
+    ON bookings (owner_email, starts_at);
+
+-- Other IDs of stored bookings
+CREATE TABLE IF NOT EXISTS booking_aliases (
+    alias TEXT PRIMARY KEY,
+    booking_id TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS booking_aliases_booking_id
+    ON booking_aliases (booking_id);
+
+CREATE TABLE IF NOT EXISTS sync_states (
+    room_email TEXT PRIMARY KEY,
+    sync_state TEXT NOT NULL
+);
+"""
+
+BOOKING_COLUMNS = "id, title, owner_email, room_email, starts_at, ends_at"
+
+BookingRow = tuple[str, str, str, str, float, float]
+
+
+class SQLiteBookingsStore(BookingsStore):
+    """
+    Bookings store that is kept in an SQLite database, so the replica
+    (together with the sync states) survives restarts and the sync goes on
+    where it stopped.
+
+    Queries are answered from the indexes in well under a millisecond, so
+    they run right in the event loop. Overlap queries only bound the start
+    of a booking from above, so they are also bounded from below by the
+    longest stored booking duration, which keeps index range scans short.
+    """
+
+    def __init__(self, path: Path | str, rooms_registry: RoomsRegistry):
+        """
+        :param path: Database file, ":memory:" for a temporary database.
+        """
+
+        self._rooms = rooms_registry
+
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        # The replica can always be synced again, no need to wait for fsync
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(SCHEMA)
+
+        (max_duration,) = self._connection.execute(
+            "SELECT MAX(ends_at - starts_at) FROM bookings"
+        ).fetchone()
+        # Only grows, deletes don't make queries wrong, just a bit wider
+        self._max_duration: float = max_duration or 0.0
+
+    def close(self):
+        self._connection.close()
+
+    def upsert_booking(self, booking: BookingWithId):
+        with self._connection:
+            self._upsert_booking(booking)
+
+    def delete_booking(self, booking_id: BookingId):
+        with self._connection:
+            self._delete_bookings([self._resolve_alias(booking_id)])
+
+    def replace_room_bookings(
+        self,
+        room_email: str,
+        period: TimePeriod,
+        bookings: list[BookingWithId],
+    ):
+        start = period.start.timestamp()
+        end = period.end.timestamp()
+
+        with self._connection:
+            # Stale bookings are deleted after the upserts, so that copies of
+            # stored bookings keep the stored IDs
+            stale_ids = {
+                booking_id
+                for (booking_id,) in self._connection.execute(
+                    "SELECT id FROM bookings"
+                    " WHERE room_email = ? AND starts_at < ? AND starts_at >= ?"
+                    " AND ends_at > ?",
+                    (room_email, end, start - self._max_duration, start),
+                )
+            }
+
+            for booking in bookings:
+                stale_ids.discard(self._upsert_booking(booking))
+
+            self._delete_bookings(list(stale_ids))
+
+    def get_booking(self, booking_id: BookingId) -> BookingWithId | None:
+        row = self._connection.execute(
+            f"SELECT {BOOKING_COLUMNS} FROM bookings WHERE id = ?",
+            (self._resolve_alias(booking_id),),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return self._convert_row_to_booking(row)
+
+    def get_bookings_in_period(
+        self,
+        period: TimePeriod,
+        filter_rooms_emails: list[str] | None = None,
+        filter_user_email: str | None = None,
+    ) -> list[BookingWithId]:
+        start = period.start.timestamp()
+        end = period.end.timestamp()
+
+        conditions = ["starts_at < ?", "starts_at >= ?", "ends_at > ?"]
+        parameters: list[str | float] = [end, start - self._max_duration, start]
+
+        if filter_rooms_emails is not None:
+            if not filter_rooms_emails:
+                return []
+
+            placeholders = ", ".join("?" * len(filter_rooms_emails))
+            conditions.append(f"room_email IN ({placeholders})")
+            parameters.extend(filter_rooms_emails)
+
+        if filter_user_email is not None:
+            conditions.append("owner_email = ?")
+            parameters.append(filter_user_email)
+
+        rows = self._connection.execute(
+            f"SELECT {BOOKING_COLUMNS} FROM bookings"
+            f" WHERE {' AND '.join(conditions)}"
+            " ORDER BY starts_at",
+            parameters,
+        )
+
+        bookings: list[BookingWithId] = []
+
+        for row in rows:
+            booking = self._convert_row_to_booking(row)
+            if booking is not None:
+                bookings.append(booking)
+
+        return bookings
+
+    def get_sync_state(self, room_email: str) -> str | None:
+        row = self._connection.execute(
+            "SELECT sync_state FROM sync_states WHERE room_email = ?",
+            (room_email,),
+        ).fetchone()
+
+        return None if row is None else row[0]
+
+    def set_sync_state(self, room_email: str, sync_state: str | None):
+        with self._connection:
+            if sync_state is None:
+                self._connection.execute(
+                    "DELETE FROM sync_states WHERE room_email = ?",
+                    (room_email,),
+                )
+            else:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO sync_states (room_email, sync_state)"
+                    " VALUES (?, ?)",
+                    (room_email, sync_state),
+                )
+
+    def _upsert_booking(self, booking: BookingWithId) -> BookingId:
+        """
+        :return: ID that the booking is stored under.
+        """
+
+        booking_id = self._resolve_alias(booking.id)
+        start = booking.period.start.timestamp()
+        end = booking.period.end.timestamp()
+        self._max_duration = max(self._max_duration, end - start)
+
+        row = self._connection.execute(
+            "SELECT id FROM bookings"
+            " WHERE room_email = ? AND starts_at = ? AND ends_at = ?",
+            (booking.room.email, start, end),
+        ).fetchone()
+
+        if row is not None and row[0] != booking_id:
+            # The same booking under another ID, the stored one is kept
+            (duplicate_id,) = row
+            self._connection.execute("DELETE FROM bookings WHERE id = ?", (booking_id,))
+            self._connection.execute(
+                "UPDATE booking_aliases SET booking_id = ? WHERE booking_id = ?",
+                (duplicate_id, booking_id),
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO booking_aliases (alias, booking_id)"
+                " VALUES (?, ?)",
+                (booking_id, duplicate_id),
+            )
+            booking_id = duplicate_id
+
+        self._connection.execute(
+            f"INSERT OR REPLACE INTO bookings ({BOOKING_COLUMNS})"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                booking_id,
+                booking.title,
+                booking.owner.email,
+                booking.room.email,
+                start,
+                end,
+            ),
+        )
+
+        return BookingId(booking_id)
+
+    def _delete_bookings(self, bookings_ids: list[BookingId]):
+        """
+        Deletes the bookings together with their aliases.
+        """
+
+        parameters = [(booking_id,) for booking_id in bookings_ids]
+        self._connection.executemany("DELETE FROM bookings WHERE id = ?", parameters)
+        self._connection.executemany(
+            "DELETE FROM booking_aliases WHERE booking_id = ?", parameters
+        )
+
+    def _resolve_alias(self, booking_id: BookingId) -> BookingId:
+        row = self._connection.execute(
+            "SELECT booking_id FROM booking_aliases WHERE alias = ?",
+            (booking_id,),
+        ).fetchone()
+
+        return booking_id if row is None else BookingId(row[0])
+
+    def _convert_row_to_booking(self, row: BookingRow) -> BookingWithId | None:
+        booking_id, title, owner_email, room_email, start, end = row
+
+        # Rooms that are not bookable anymore
+        room = self._rooms.get_by_email(room_email)
+        if room is None:
+            return None
+
+        return BookingWithId(
+            id=BookingId(booking_id),
+            title=title,
+            owner=User(id=0, email=owner_email),
+            room=room,
+            period=TimePeriod(start=TimeStamp(start), end=TimeStamp(end)),
+        )
@@ -0,0 +1,139 @@
+__all__ = ["BookingsSync", "SyncLagMetrics"]
+
+import asyncio
+import time
+from datetime import timedelta
+from logging import getLogger
+from typing import NotRequired, TypedDict, Unpack
+
+from app.adapters.bookings_store import BookingsStore
+from app.adapters.ews_scheduler import Priority
+from app.adapters.outlook import OutlookBookings, RoomsRegistry
+from app.domain.entities import Room, TimePeriod, TimeStamp
+
+DEFAULT_SYNC_INTERVAL = timedelta(seconds=30)
+DEFAULT_SYNC_WINDOW = timedelta(days=180)
+
+logger = getLogger(__name__)
+
+
+class SyncLagMetrics(TypedDict):
+    # Seconds since the last successful sync of each room,
+    # None if the room has never been synced by this process.
+    rooms_lag: dict[str, float | None]
+    max_lag: float | None
+    failed_rooms: list[str]
+
+
+class BookingsSyncDict(TypedDict):
+    outlook: OutlookBookings
+    rooms_registry: RoomsRegistry
+    store: BookingsStore
+    interval: NotRequired[timedelta]
+    window: NotRequired[timedelta]
+
+
+class BookingsSync:
+    """
+    Keeps a bookings store up to date with the rooms calendars.
+
+    Every `interval` each room calendar is asked for the item changes since
+    the sync state saved in the store (a no-op round trip when nothing has
+    changed). Single items are applied one by one. Recurring items are only
+    reported as a whole, so the bookings of such rooms are refetched with
+    a calendar view from now to `window` ahead.
+    """
+
+    def __init__(self, **kwargs: Unpack[BookingsSyncDict]):
+        self._outlook = kwargs["outlook"]
+        self._rooms = kwargs["rooms_registry"]
+        self._store = kwargs["store"]
+        self._interval = kwargs.get("interval", DEFAULT_SYNC_INTERVAL)
+        self._window = kwargs.get("window", DEFAULT_SYNC_WINDOW)
+
+        self._last_synced_at: dict[str, float] = {}
+        self._failed_rooms: set[str] = set()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run(self):
+        while True:
+            await self.sync()
+            await asyncio.sleep(self._interval.total_seconds())
+
+    async def sync(self):
+        await asyncio.gather(*map(self.sync_room, self._rooms.get_all()))
+
+    async def sync_room(self, room: Room):
+        sync_state = self._store.get_sync_state(room.email)
+
+        try:
+            # Sync waits for the requests that somebody is waiting for
+            changes = await self._outlook.get_room_changes(
+                room,
+                sync_state,
+                Priority.BACKGROUND,
+            )
+
+            for booking_id in changes.deleted_ids:
+                if self._store.get_booking(booking_id) is None:
+                    # Most likely a recurring item, whose occurrences are
+                    # stored under other IDs.
+                    changes.has_recurring_changes = True
+                self._store.delete_booking(booking_id)
+
+            for booking in changes.updated:
+                self._store.upsert_booking(booking)
+
+            if sync_state is None or changes.has_recurring_changes:
+                now = TimeStamp.now()
+                period = TimePeriod(start=now, end=now + self._window)
+                bookings = await self._outlook.get_room_bookings_in_period(
+                    room,
+                    period,
+                    Priority.BACKGROUND,
+                )
+                self._store.replace_room_bookings(room.email, period, bookings)
+        except Exception as e:
+            logger.warning(f"Error while syncing room {room.email}: {e}")
+            self._failed_rooms.add(room.email)
+            return
+
+        self._store.set_sync_state(room.email, changes.sync_state)
+        self._last_synced_at[room.email] = time.time()
+        self._failed_rooms.discard(room.email)
+
+    def is_room_synced(self, room_email: str) -> bool:
+        return self._store.get_sync_state(room_email) is not None
+
+    def get_lag_metrics(self) -> SyncLagMetrics:
+        now = time.time()
+
+        rooms_lag: dict[str, float | None] = {}
+        for room in self._rooms.get_all():
+            last_synced_at = self._last_synced_at.get(room.email)
+            rooms_lag[room.email] = (
+                None if last_synced_at is None else now - last_synced_at
+            )
+
+        lags = [lag for lag in rooms_lag.values() if lag is not None]
+
+        return SyncLagMetrics(
+            rooms_lag=rooms_lag,
+            max_lag=max(lags, default=None),
+            failed_rooms=sorted(self._failed_rooms),
+        )
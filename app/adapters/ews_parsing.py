@@ -0,0 +1,60 @@
+__all__ = ["parse_find_item_ids", "parse_response"]
+
+from typing import Any
+
+import exchangelib
+import exchangelib.services
+import exchangelib.util
+
+# The only module that calls private methods of exchangelib services:
+# public `parse()` doesn't support the paging container of FindItem.
+# exchangelib is pinned in pyproject.toml, and test/ews_parsing_test.py
+# checks these calls against the pinned version.
+
+
+def parse_response(
+    service: exchangelib.services.common.EWSService,
+    body: bytes,
+) -> list[Any]:
+    """
+    :return: Objects (e.g. items) or exceptions of the response messages,
+        in the order of the request.
+    :raises ErrorServerBusy: And other errors of SOAP faults.
+    """
+
+    return list(service.parse(body))
+
+
+def parse_find_item_ids(
+    service: exchangelib.services.FindItem,
+    body: bytes,
+) -> list[str]:
+    """
+    :return: IDs of the items found, in the order of the response.
+    :raises ErrorServerBusy: And other errors of SOAP faults or of the
+        response message.
+    """
+
+    _, soap_body = service._get_soap_parts(  # type: ignore
+        response=exchangelib.util.DummyResponse(content=body)
+    )
+
+    items_ids: list[str] = []
+
+    for message in service._get_soap_messages(body=soap_body):  # type: ignore
+        root_folder: Any
+        root_folder, _ = service._get_page(message)  # type: ignore
+
+        if isinstance(root_folder, Exception):
+            raise root_folder
+
+        if root_folder is None:
+            continue
+
+        container = root_folder.find(f"{{{exchangelib.util.TNS}}}Items")
+        for element in [] if container is None else container:
+            item_id = element.find(f"{{{exchangelib.util.TNS}}}ItemId")
+            if item_id is not None and item_id.get("Id"):
+                items_ids.append(item_id.get("Id"))
+
+    return items_ids
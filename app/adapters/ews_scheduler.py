@@ -0,0 +1,269 @@
+__all__ = ["EWSScheduler", "Priority", "SchedulerMetrics", "QueueWaitMetrics"]
+
+import asyncio
+import collections
+import collections.abc
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from logging import getLogger
+from typing import NotRequired, TypedDict, TypeVar, Unpack
+
+import exchangelib.errors
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONCURRENT_REQUESTS = 10
+DEFAULT_MAX_CONCURRENT_MAILBOX_REQUESTS = 3
+DEFAULT_MAX_THROTTLING_RETRIES = 3
+# Used when Exchange doesn't say how long to back off for
+DEFAULT_THROTTLING_BACK_OFF = 1.0
+
+logger = getLogger(__name__)
+
+
+class Priority(IntEnum):
+    # Somebody is waiting for the response
+    INTERACTIVE = 0
+    # Background sync, waits for interactive requests
+    BACKGROUND = 1
+
+
+class QueueWaitMetrics(TypedDict):
+    requests: int
+    # Seconds
+    average_wait: float
+    max_wait: float
+
+
+class SchedulerMetrics(TypedDict):
+    in_flight: int
+    queued: int
+    # Current concurrency limit, lowered on throttling
+    limit: int
+    throttled: int
+    queue_wait: dict[str, QueueWaitMetrics]
+
+
+class Waiter:
+    def __init__(self, mailbox: str, future: asyncio.Future):
+        self.mailbox = mailbox
+        self.future = future
+
+
+class WaitStats:
+    def __init__(self):
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def add(self, wait: float):
+        self.requests += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+class EWSSchedulerDict(TypedDict):
+    max_concurrent_requests: NotRequired[int]
+    max_concurrent_mailbox_requests: NotRequired[int]
+    max_throttling_retries: NotRequired[int]
+
+
+class EWSScheduler:
+    """
+    Decides when requests to Exchange may be sent.
+
+    At most `max_concurrent_requests` requests are in flight, and at most
+    `max_concurrent_mailbox_requests` of them target the same mailbox, so
+    that scanning many rooms doesn't starve everything else and a single
+    mailbox isn't throttled. Waiting requests are started in the order of
+    their priority, then in the order they came in.
+
+    The global limit follows AIMD: it is halved every time Exchange responds
+    with ErrorServerBusy (and nothing is sent until the back off that
+    Exchange asked for has passed), and grows back by one for every `limit`
+    successful requests. Throttled requests are retried.
+    """
+
+    def __init__(self, **kwargs: Unpack[EWSSchedulerDict]):
+        self._max_limit = kwargs.get(
+            "max_concurrent_requests",
+            DEFAULT_MAX_CONCURRENT_REQUESTS,
+        )
+        self._max_mailbox_requests = kwargs.get(
+            "max_concurrent_mailbox_requests",
+            DEFAULT_MAX_CONCURRENT_MAILBOX_REQUESTS,
+        )
+        self._max_retries = kwargs.get(
+            "max_throttling_retries",
+            DEFAULT_MAX_THROTTLING_RETRIES,
+        )
+
+        self._limit = float(self._max_limit)
+        self._in_flight = 0
+        self._mailboxes_in_flight: collections.Counter[str] = collections.Counter()
+        self._paused_until = 0.0
+        self._resume_handle: asyncio.TimerHandle | None = None
+
+        # (priority, sequence number, waiter)
+        self._queue: list[tuple[int, int, Waiter]] = []
+        self._sequence = itertools.count()
+
+        self._throttled = 0
+        self._wait_stats = {priority: WaitStats() for priority in Priority}
+
+    @property
+    def max_concurrent_requests(self) -> int:
+        return self._max_limit
+
+    async def run(
+        self,
+        mailbox: str,
+        priority: Priority,
+        func: collections.abc.Callable[[], collections.abc.Awaitable[T]],
+    ) -> T:
+        """
+        Runs `func` once a slot is free for the mailbox. `func` is called
+        again if Exchange asks to back off.
+
+        :param mailbox: Email of the mailbox that the request targets.
+        """
+
+        for attempt in range(self._max_retries + 1):
+            await self._acquire(mailbox, priority)
+            try:
+                result = await func()
+            except exchangelib.errors.ErrorServerBusy as e:
+                self._release(mailbox)
+                self._on_throttled(e.back_off)
+                if attempt == self._max_retries:
+                    raise
+                continue
+            except BaseException:
+                self._release(mailbox)
+                raise
+
+            self._release(mailbox)
+            self._on_success()
+            return result
+
+        raise AssertionError("unreachable")
+
+    def get_metrics(self) -> SchedulerMetrics:
+        return SchedulerMetrics(
+            in_flight=self._in_flight,
+            queued=len(self._queue),
+            limit=int(self._limit),
+            throttled=self._throttled,
+            queue_wait={
+                priority.name.lower(): QueueWaitMetrics(
+                    requests=stats.requests,
+                    average_wait=stats.total_wait / stats.requests
+                    if stats.requests
+                    else 0.0,
+                    max_wait=stats.max_wait,
+                )
+                for priority, stats in self._wait_stats.items()
+            },
+        )
+
+    async def _acquire(self, mailbox: str, priority: Priority):
+        queued_at = time.monotonic()
+
+        if not self._queue and self._can_start(mailbox):
+            self._start(mailbox)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(
+                self._queue,
+                (priority, next(self._sequence), Waiter(mailbox, future)),
+            )
+            # The queue may only hold requests to busy mailboxes
+            self._dispatch()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # The slot was granted right before the cancellation
+                    self._release(mailbox)
+                else:
+                    self._queue = [
+                        entry for entry in self._queue if entry[2].future is not future
+                    ]
+                    heapq.heapify(self._queue)
+                raise
+
+        self._wait_stats[priority].add(time.monotonic() - queued_at)
+
+    def _release(self, mailbox: str):
+        self._in_flight -= 1
+        self._mailboxes_in_flight[mailbox] -= 1
+        if not self._mailboxes_in_flight[mailbox]:
+            del self._mailboxes_in_flight[mailbox]
+
+        self._dispatch()
+
+    def _can_start(self, mailbox: str) -> bool:
+        return (
+            time.monotonic() >= self._paused_until
+            and self._in_flight < int(self._limit)
+            and self._mailboxes_in_flight[mailbox] < self._max_mailbox_requests
+        )
+
+    def _start(self, mailbox: str):
+        self._in_flight += 1
+        self._mailboxes_in_flight[mailbox] += 1
+
+    def _dispatch(self):
+        if not self._queue:
+            return
+
+        started: list[Waiter] = []
+        blocked: list[tuple[int, int, Waiter]] = []
+
+        # Waiters of busy mailboxes are skipped, so that they don't block
+        # requests to other mailboxes behind them.
+        while self._queue and self._in_flight < int(self._limit):
+            entry = heapq.heappop(self._queue)
+            waiter = entry[2]
+
+            if waiter.future.done():
+                continue
+
+            if not self._can_start(waiter.mailbox):
+                blocked.append(entry)
+                continue
+
+            self._start(waiter.mailbox)
+            started.append(waiter)
+
+        for entry in blocked:
+            heapq.heappush(self._queue, entry)
+
+        for waiter in started:
+            waiter.future.set_result(None)
+
+    def _on_throttled(self, back_off: float | None):
+        self._throttled += 1
+        self._limit = max(1.0, self._limit / 2)
+
+        back_off = back_off or DEFAULT_THROTTLING_BACK_OFF
+        self._paused_until = max(self._paused_until, time.monotonic() + back_off)
+
+        logger.warning(
+            f"Exchange is throttling requests, backing off for {back_off}s,"
+            f" concurrency limit is {int(self._limit)}"
+        )
+
+        if self._resume_handle is not None:
+            self._resume_handle.cancel()
+        self._resume_handle = asyncio.get_running_loop().call_later(
+            self._paused_until - time.monotonic(),
+            self._dispatch,
+        )
+
+    def _on_success(self):
+        if self._limit < self._max_limit:
+            self._limit = min(float(self._max_limit), self._limit + 1 / self._limit)
+            self._dispatch()
@@ -0,0 +1,144 @@
+__all__ = [
+    "IntegrationKey",
+    "IntegrationKeysIndex",
+    "IntegrationMetrics",
+    "create_salt",
+    "get_api_key_prefix",
+    "get_rate_window_start",
+    "hash_api_key",
+]
+
+import hashlib
+import hmac
+import secrets
+import threading
+from typing import TypedDict
+
+from app.domain.entities import Integration
+
+# Keys are looked up by their first characters, so they must be much longer
+API_KEY_PREFIX_LENGTH = 8
+SALT_SIZE = 16
+# Seconds that requests of an integration are counted in for its rate
+RATE_WINDOW = 60.0
+
+
+class IntegrationMetrics(TypedDict):
+    requests: int
+    # Requests in the current rate window
+    window_requests: int
+
+
+def get_api_key_prefix(api_key: str) -> str:
+    return api_key[:API_KEY_PREFIX_LENGTH]
+
+
+def create_salt() -> bytes:
+    return secrets.token_bytes(SALT_SIZE)
+
+
+def hash_api_key(api_key: str, salt: bytes) -> bytes:
+    return hmac.new(salt, api_key.encode(), hashlib.sha256).digest()
+
+
+def get_rate_window_start(now: float) -> float:
+    return now - now % RATE_WINDOW
+
+
+class IntegrationKey:
+    """
+    Salted digest of an API key, together with the request counters of the
+    integration it belongs to.
+    """
+
+    __slots__ = (
+        "integration",
+        "salt",
+        "digest",
+        "requests",
+        "window_start",
+        "window_requests",
+    )
+
+    def __init__(self, integration: Integration, api_key: str):
+        self.integration = integration
+        self.salt = create_salt()
+        self.digest = hash_api_key(api_key, self.salt)
+        self.requests = 0
+        self.window_start = 0.0
+        self.window_requests = 0
+
+    def matches(self, api_key: str) -> bool:
+        return hmac.compare_digest(hash_api_key(api_key, self.salt), self.digest)
+
+    def count_request(self, now: float):
+        window_start = get_rate_window_start(now)
+        if window_start != self.window_start:
+            self.window_start = window_start
+            self.window_requests = 0
+
+        self.requests += 1
+        self.window_requests += 1
+
+
+class IntegrationKeysIndex:
+    """
+    API keys of integrations, indexed by their prefixes. A key is checked
+    only against the digests of the keys with the same prefix (usually
+    one), so authentication costs the same however many integrations
+    there are. Digests are compared in constant time, and raw keys are not
+    kept.
+    """
+
+    def __init__(self, integrations_by_api_keys: dict[str, str]):
+        """
+        :param integrations_by_api_keys: Names of integrations by their keys.
+        """
+
+        self._keys_by_prefix: dict[str, list[IntegrationKey]] = {}
+        for api_key, name in integrations_by_api_keys.items():
+            self._keys_by_prefix.setdefault(get_api_key_prefix(api_key), []).append(
+                IntegrationKey(Integration(name=name), api_key)
+            )
+
+        # Counters may be updated from executor threads
+        self._lock = threading.Lock()
+
+    def find(self, api_key: str, now: float) -> Integration | None:
+        """
+        Finds the integration of the key and counts the request to it.
+        """
+
+        candidates = self._keys_by_prefix.get(get_api_key_prefix(api_key), [])
+
+        # Every candidate is checked, so that the time doesn't tell which
+        # of them matched
+        matched: IntegrationKey | None = None
+        for key in candidates:
+            if key.matches(api_key):
+                matched = key
+
+        if matched is None:
+            return None
+
+        with self._lock:
+            matched.count_request(now)
+
+        return matched.integration
+
+    def get_metrics(self, now: float) -> dict[str, IntegrationMetrics]:
+        metrics: dict[str, IntegrationMetrics] = {}
+        window_start = get_rate_window_start(now)
+
+        with self._lock:
+            for keys in self._keys_by_prefix.values():
+                for key in keys:
+                    integration_metrics = metrics.setdefault(
+                        key.integration.name,
+                        IntegrationMetrics(requests=0, window_requests=0),
+                    )
+                    integration_metrics["requests"] += key.requests
+                    if key.window_start == window_start:
+                        integration_metrics["window_requests"] += key.window_requests
+
+        return metrics
@@ -0,0 +1,66 @@
+__all__ = ["MetricsLogger"]
+
+import asyncio
+import collections.abc
+import json
+from datetime import timedelta
+from logging import getLogger
+from typing import Any, NotRequired, TypedDict, Unpack
+
+DEFAULT_METRICS_LOG_INTERVAL = timedelta(minutes=5)
+
+logger = getLogger(__name__)
+
+
+class MetricsLoggerDict(TypedDict):
+    interval: NotRequired[timedelta]
+
+
+class MetricsLogger:
+    """
+    Logs metrics of the added sources every `interval`, so that they can be
+    followed in the logs of every worker.
+    """
+
+    def __init__(self, **kwargs: Unpack[MetricsLoggerDict]):
+        self._interval = kwargs.get("interval", DEFAULT_METRICS_LOG_INTERVAL)
+        self._sources: dict[str, collections.abc.Callable[[], Any]] = {}
+
+        self._task: asyncio.Task | None = None
+
+    def add_source(self, name: str, get_metrics: collections.abc.Callable[[], Any]):
+        """
+        :param get_metrics: Returns JSON serializable metrics, e.g. a typed dict.
+        """
+
+        self._sources[name] = get_metrics
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self._interval.total_seconds())
+            self.log()
+
+    def log(self):
+        for name, get_metrics in self._sources.items():
+            try:
+                metrics = json.dumps(get_metrics())
+            except Exception as e:
+                logger.warning(f"Error while getting {name} metrics: {e}")
+                continue
+
+            logger.info(f"{name} metrics: {metrics}")
@@ -1,15 +1,19 @@
-__all__ = ["OutlookBookings", "RoomsRegistry"]
+__all__ = ["OutlookBookings", "RoomsRegistry", "RoomAccountsPool", "RoomChanges"]
 
 import asyncio
 import collections.abc
 import concurrent.futures
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
 from logging import getLogger
-from typing import TypedDict, Unpack
+from typing import Any, NotRequired, TypedDict, TypeVar, Unpack
 
 import exchangelib
+import exchangelib.properties
 import exchangelib.recurrence
 
+from app.adapters.ews_scheduler import EWSScheduler, Priority
 from app.domain.dependencies import BookingsRepo
 from app.domain.entities import (
     Booking,
@@ -23,8 +27,24 @@ from app.domain.entities import (
 )
 
 DEFAULT_BOOKING_TITLE = "Untitled"
+DEFAULT_ROOM_ACCOUNT_MAX_AGE = timedelta(hours=1)
+T = TypeVar("T")
+
+# Items per GetItem/DeleteItem request, EWS throttles larger batches
+BULK_CHUNK_SIZE = 100
 LEGACY_BOOKING_SYSTEM_EMAIL = "TODO"
 
+# Free/busy types that don't prevent a room from being booked
+FREE_BUSY_TYPES = ("Free", "NoData")
+
+# Calendar views can't be paged by offset, so long periods are read in
+# windows of this duration, a request per room and window
+CALENDAR_VIEW_WINDOW = timedelta(days=7)
+# Rooms that `iterate_bookings_in_period` reads at once
+ITERATE_CONCURRENT_ROOMS = 4
+# Pages that `iterate_bookings_in_period` reads ahead of its consumer
+ITERATE_MAX_PENDING_PAGES = 8
+
 logger = getLogger(__name__)
 
 
@@ -64,11 +84,127 @@ class RoomsRegistry:
         return self._rooms
 
 
+class RoomAccountsPool:
+    """
+    Long-lived impersonated accounts of the rooms mailboxes, keyed by email.
+
+    All accounts are created from the same configuration, so they share one
+    protocol and therefore one HTTP connection pool. Accounts also cache
+    their folders, so the calendar folder is looked up only once per account.
+    Accounts older than `max_account_age` are recreated on the next access.
+    """
+
+    _accounts: dict[str, tuple[exchangelib.Account, float]]
+
+    def __init__(
+        self,
+        account_config: exchangelib.Configuration,
+        max_account_age: timedelta = DEFAULT_ROOM_ACCOUNT_MAX_AGE,
+    ):
+        self._account_config = account_config
+        self._max_account_age = max_account_age.total_seconds()
+        self._accounts = {}
+        self._lock = threading.Lock()
+
+    def get(self, email: str) -> exchangelib.Account:
+        with self._lock:
+            stale_entry = self._accounts.get(email)
+
+        if stale_entry is not None:
+            account, created_at = stale_entry
+            if time.monotonic() - created_at < self._max_account_age:
+                return account
+
+        # The account is created outside of the lock, so that a slow
+        # construction doesn't hold up the lookups of other rooms
+        account = exchangelib.Account(
+            primary_smtp_address=email,
+            config=self._account_config,
+            autodiscover=False,
+            access_type=exchangelib.IMPERSONATION,
+        )
+
+        with self._lock:
+            entry = self._accounts.get(email)
+            # Another thread may have created the account in the meantime
+            if entry is not None and entry is not stale_entry:
+                return entry[0]
+
+            self._accounts[email] = (account, time.monotonic())
+
+        return account
+
+    def invalidate(self, email: str):
+        with self._lock:
+            self._accounts.pop(email, None)
+
+    def warm_up_blocking(self, rooms: list[Room]):
+        """
+        Creates accounts for all the given rooms and looks up their calendars
+        ahead of time, so that the first queries don't pay for it.
+        """
+
+        for room in rooms:
+            try:
+                self.get(room.email).calendar
+            except Exception as e:
+                logger.warning(f"Error while warming up account {room.email}: {e}")
+                self.invalidate(room.email)
+
+    def check_health_blocking(self) -> dict[str, bool]:
+        """
+        Checks every pooled account with a cheap GetFolder request and drops
+        the ones that failed, so that they are recreated on the next access.
+
+        :return: Map {"email": is_healthy}
+        """
+
+        with self._lock:
+            accounts = [
+                (email, account) for email, (account, _) in self._accounts.items()
+            ]
+
+        health: dict[str, bool] = {}
+
+        for email, account in accounts:
+            try:
+                account.calendar.refresh()  # type: ignore
+                health[email] = True
+            except Exception as e:
+                logger.warning(f"Pooled account {email} is unhealthy: {e}")
+                self.invalidate(email)
+                health[email] = False
+
+        return health
+
+
+class RoomChanges:
+    """
+    Changes of a room calendar since some sync state.
+    """
+
+    def __init__(
+        self,
+        updated: list[BookingWithId],
+        deleted_ids: list[BookingId],
+        has_recurring_changes: bool,
+        sync_state: str,
+    ):
+        self.updated = updated
+        self.deleted_ids = deleted_ids
+        # Occurrences of recurring items are not reported one by one, so the
+        # room bookings have to be refetched if this flag is set.
+        self.has_recurring_changes = has_recurring_changes
+        self.sync_state = sync_state
+
+
 class BookingsDict(TypedDict):
     account: exchangelib.Account
     account_config: exchangelib.Configuration
     rooms_registry: RoomsRegistry
     executor: concurrent.futures.ThreadPoolExecutor | None
+    scheduler: NotRequired[EWSScheduler]
+    room_accounts: NotRequired[RoomAccountsPool]
 
 
 class OutlookBookings(BookingsRepo):
@@ -76,21 +212,115 @@ class OutlookBookings(BookingsRepo):
         self._account = kwargs["account"]
         self._account_config = kwargs["account_config"]
         self._rooms = kwargs["rooms_registry"]
+        self._room_accounts = kwargs.get(
+            "room_accounts",
+            RoomAccountsPool(self._account_config),
+        )
+
+        self._mailbox = str(self._account.primary_smtp_address)
+
+        # Every request to Exchange goes through the scheduler, it decides
+        # how many of them (and to which mailboxes) may be in flight.
+        self._scheduler = kwargs.get("scheduler", EWSScheduler())
 
         executor = kwargs["executor"]
         if executor is None:
-            executor = concurrent.futures.ThreadPoolExecutor(max_workers=5)
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._scheduler.max_concurrent_requests,
+            )
         self._executor = executor
 
-    async def create_booking(self, booking: Booking) -> BookingId:
-        return await asyncio.get_running_loop().run_in_executor(
+    async def warm_up(self):
+        """
+        Creates accounts of all the rooms ahead of time.
+        """
+
+        await asyncio.get_running_loop().run_in_executor(
             self._executor,
+            self._room_accounts.warm_up_blocking,
+            self._rooms.get_all(),
+        )
+
+    async def check_room_accounts_health(self) -> dict[str, bool]:
+        """
+        Checks the pooled accounts of the rooms, see
+        `RoomAccountsPool.check_health_blocking`.
+        """
+
+        return await self._run_blocking(
+            self._mailbox,
+            Priority.BACKGROUND,
+            self._room_accounts.check_health_blocking,
+        )
+
+    def get_scheduler(self) -> EWSScheduler:
+        return self._scheduler
+
+    async def create_booking(self, booking: Booking) -> BookingId:
+        return await self._run_blocking(
+            self._mailbox,
+            Priority.INTERACTIVE,
             self.create_booking_blocking,
             booking,
         )
 
     def create_booking_blocking(self, booking: Booking) -> BookingId:
-        item = exchangelib.CalendarItem(
+        item = self._create_calendar_item(booking)
+
+        # After this operation the ID will be set
+        item.save(send_meeting_invitations=exchangelib.items.SEND_ONLY_TO_ALL)
+
+        if item.id is None:
+            self._revert_calendar_item(item)
+            raise MissingCalendarItemFieldError("id")
+
+        return item.id
+
+    async def create_bookings(
+        self,
+        bookings: list[Booking],
+    ) -> list[BookingId | Exception]:
+        return await self._run_blocking(
+            self._mailbox,
+            Priority.INTERACTIVE,
+            self.create_bookings_blocking,
+            bookings,
+        )
+
+    def create_bookings_blocking(
+        self,
+        bookings: list[Booking],
+    ) -> list[BookingId | Exception]:
+        if not bookings:
+            return []
+
+        items = [self._create_calendar_item(booking) for booking in bookings]
+
+        # One CreateItem request per chunk instead of one per booking.
+        # Results come in the same order as the items, failed items are
+        # represented by exceptions.
+        results = self._account.bulk_create(
+            folder=self._account.calendar,
+            items=items,
+            message_disposition=exchangelib.items.SAVE_ONLY,
+            send_meeting_invitations=exchangelib.items.SEND_ONLY_TO_ALL,
+        )
+
+        bookings_ids: list[BookingId | Exception] = []
+
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                bookings_ids.append(result)
+            elif result.id is None:  # type: ignore
+                self._revert_calendar_item(item)
+                bookings_ids.append(MissingCalendarItemFieldError("id"))
+            else:
+                bookings_ids.append(result.id)  # type: ignore
+
+        return bookings_ids
+
+    def _create_calendar_item(self, booking: Booking) -> exchangelib.CalendarItem:
+        return exchangelib.CalendarItem(
             account=self._account,
             folder=self._account.calendar,
             start=booking.period.start.datetime_utc(),
@@ -110,26 +340,20 @@ class OutlookBookings(BookingsRepo):
             ],
         )
 
-        # After this operation the ID will be set
-        item.save(send_meeting_invitations=exchangelib.items.SEND_ONLY_TO_ALL)
-
-        if item.id is None:
-            # I'm not sure if such situation is possible, but just in case.
-            #
-            # If after saving a booking id wasn't set somehow
-            # we should undo the booking.
-            try:
-                item.delete()
-            except Exception as e:
-                logger.warning(f"Error while reverting booking: {e}")
-
-            raise MissingCalendarItemFieldError("id")
-
-        return item.id
+    def _revert_calendar_item(self, item: exchangelib.CalendarItem):
+        # I'm not sure if such situation is possible, but just in case.
+        #
+        # If after saving a booking id wasn't set somehow
+        # we should undo the booking.
+        try:
+            item.delete()
+        except Exception as e:
+            logger.warning(f"Error while reverting booking: {e}")
 
     async def delete_booking(self, booking_id: BookingId):
-        return await asyncio.get_running_loop().run_in_executor(
-            self._executor,
+        return await self._run_blocking(
+            self._mailbox,
+            Priority.INTERACTIVE,
             self.delete_booking_blocking,
             booking_id,
         )
@@ -139,38 +363,239 @@ class OutlookBookings(BookingsRepo):
         booking = self._account.calendar.get(id=booking_id)  # type: ignore
         booking.delete()
 
+    async def delete_bookings(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[Exception | None]:
+        return await self._run_in_chunks(self.delete_bookings_blocking, bookings_ids)
+
+    def delete_bookings_blocking(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[Exception | None]:
+        results = self._account.bulk_delete(
+            ids=[(booking_id, None) for booking_id in bookings_ids],
+            chunk_size=BULK_CHUNK_SIZE,
+        )
+
+        return [result if isinstance(result, Exception) else None for result in results]
+
     async def get_bookings_in_period(
         self,
         period: TimePeriod,
         filter_rooms: list[Room] | None = None,
         filter_user_email: str | None = None,
     ) -> list[BookingWithId]:
-        return await asyncio.get_running_loop().run_in_executor(
-            self._executor,
-            self.get_bookings_in_period_blocking,
-            period,
-            filter_rooms,
-            filter_user_email,
+        if filter_rooms is None:
+            filter_rooms = self._rooms.get_all()
+
+        # Every calendar view is a separate EWS round trip, so we fan them out
+        # to the executor.
+        own_bookings, *rooms_bookings = await asyncio.gather(
+            self._run_blocking(
+                self._mailbox,
+                Priority.INTERACTIVE,
+                self._get_own_bookings_in_period_blocking,
+                period,
+            ),
+            *(self.get_room_bookings_in_period(room, period) for room in filter_rooms),
         )
 
+        return merge_bookings(own_bookings, rooms_bookings, filter_user_email)
+
     def get_bookings_in_period_blocking(
         self,
         period: TimePeriod,
         filter_rooms: list[Room] | None = None,
         filter_user_email: str | None = None,
     ) -> list[BookingWithId]:
-        bookings: list[BookingWithId] = []
-        bookings_ids: set[BookingId] = set()
-        bookings_hashes: set[str] = set()
+        if filter_rooms is None:
+            filter_rooms = self._rooms.get_all()
+
+        own_bookings = self._get_own_bookings_in_period_blocking(period)
+        rooms_bookings = [
+            self._get_room_bookings_in_period_blocking(room, period)
+            for room in filter_rooms
+        ]
+
+        return merge_bookings(own_bookings, rooms_bookings, filter_user_email)
+
+    def _get_own_bookings_in_period_blocking(
+        self,
+        period: TimePeriod,
+    ) -> list[BookingWithId]:
+        items = self._account.calendar.view(  # type: ignore
+            start=period.start.datetime_utc(),
+            end=period.end.datetime_utc(),
+        ).only(*CALENDAR_ITEM_FIELDS)
+
+        return self._convert_calendar_items_to_bookings(items)
+
+    async def get_room_bookings_in_period(
+        self,
+        room: Room,
+        period: TimePeriod,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> list[BookingWithId]:
+        return await self._run_blocking(
+            room.email,
+            priority,
+            self._get_room_bookings_in_period_blocking,
+            room,
+            period,
+        )
+
+    def _get_room_bookings_in_period_blocking(
+        self,
+        room: Room,
+        period: TimePeriod,
+    ) -> list[BookingWithId]:
+        logger.info(f"Getting calendar items for room {room.get_name(Language.EN)}")
+
+        account = self._get_ews_account_for_room(room)
+
+        try:
+            items = account.calendar.view(  # type: ignore
+                start=period.start.datetime_utc(),
+                end=period.end.datetime_utc(),
+            ).only(*CALENDAR_ITEM_FIELDS)
+
+            return self._convert_calendar_items_to_bookings(items)
+        except Exception:
+            # The pooled account may be broken, let it be recreated next time
+            self._room_accounts.invalidate(room.email)
+            raise
+
+    async def iterate_bookings_in_period(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+        filter_user_email: str | None = None,
+        priority: Priority = Priority.BACKGROUND,
+    ) -> collections.abc.AsyncIterator[list[BookingWithId]]:
+        """
+        Yields bookings of the rooms page by page, as the pages arrive from
+        EWS. A few rooms are read at once, and only a few pages are read
+        ahead of the consumer, so memory doesn't grow with the period.
+
+        Only the rooms calendars are read, so every booking comes once, but
+        the bookings are not ordered.
+        """
+
+        if filter_rooms is None:
+            filter_rooms = self._rooms.get_all()
+
+        pages: asyncio.Queue[list[BookingWithId]] = asyncio.Queue(
+            ITERATE_MAX_PENDING_PAGES
+        )
+        rooms = iter(filter_rooms)
+
+        async def read_rooms():
+            # Every reader takes the next room that nobody reads yet
+            for room in rooms:
+                async for bookings in self.iterate_room_bookings(
+                    room,
+                    period,
+                    priority,
+                ):
+                    if filter_user_email is not None:
+                        bookings = [
+                            booking
+                            for booking in bookings
+                            if booking.owner.email == filter_user_email
+                        ]
+                    if bookings:
+                        await pages.put(bookings)
+
+        loop = asyncio.get_running_loop()
+        readers_tasks = [
+            loop.create_task(read_rooms())
+            for _ in range(min(ITERATE_CONCURRENT_ROOMS, len(filter_rooms)))
+        ]
+        readers = asyncio.gather(*readers_tasks)
+        # The consumer may stop before the error is raised to it
+        readers.add_done_callback(lambda _: readers.cancelled() or readers.exception())
+
+        try:
+            while True:
+                page = asyncio.ensure_future(pages.get())
+                await asyncio.wait(
+                    (page, readers),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if page.done():
+                    yield page.result()
+                    continue
 
-        def hash_booking_by_period_and_room(booking: Booking) -> str:
-            period = f"{booking.period.start.datetime_utc().isoformat()}::{booking.period.end.datetime_utc().isoformat()}"
-            room = f"::{booking.room.email}"
-            return period + room
+                page.cancel()
+                while not pages.empty():
+                    yield pages.get_nowait()
+
+                # Raises the error of the readers, if any
+                readers.result()
+                return
+        finally:
+            # A failed reader doesn't stop the others, neither does the
+            # consumer that stopped early
+            for task in readers_tasks:
+                task.cancel()
+
+    async def iterate_room_bookings(
+        self,
+        room: Room,
+        period: TimePeriod,
+        priority: Priority = Priority.BACKGROUND,
+    ) -> collections.abc.AsyncIterator[list[BookingWithId]]:
+        """
+        Reads the room calendar window by window, the next window is
+        requested while the bookings of the current one are consumed.
+
+        :return: Bookings that overlap the period, a page per window,
+            ordered by start.
+        """
+
+        windows = split_period(period, CALENDAR_VIEW_WINDOW)
+        if not windows:
+            return
+
+        loop = asyncio.get_running_loop()
+        next_page = loop.create_task(
+            self.get_room_bookings_in_period(room, windows[0], priority)
+        )
+
+        try:
+            for i, window in enumerate(windows):
+                bookings = await next_page
+
+                if i + 1 < len(windows):
+                    next_page = loop.create_task(
+                        self.get_room_bookings_in_period(room, windows[i + 1], priority)
+                    )
 
-        for item in self._account.calendar.view(  # type: ignore
-            start=period.start.datetime_utc(), end=period.end.datetime_utc()
-        ):
+                # Bookings that overlap several windows come with each of
+                # them, they belong to the one they start in
+                page = [
+                    booking
+                    for booking in bookings
+                    if booking.period.start < window.end
+                    and (i == 0 or booking.period.start >= window.start)
+                ]
+                page.sort(key=lambda booking: booking.period.start.timestamp())
+                yield page
+        finally:
+            next_page.cancel()
+            # The consumer may have stopped before the read ahead failed
+            if next_page.done() and not next_page.cancelled():
+                next_page.exception()
+
+    def _convert_calendar_items_to_bookings(
+        self,
+        items: collections.abc.Iterable[exchangelib.CalendarItem],
+    ) -> list[BookingWithId]:
+        bookings: list[BookingWithId] = []
+
+        for item in items:
             try:
                 booking = self._convert_calendar_item_to_booking_with_id(
                     item, self._rooms
@@ -179,26 +604,63 @@ class OutlookBookings(BookingsRepo):
                 logger.warning(f"Invalid calendar item: {e}")
                 continue
 
-            # we don't need to check for id duplicates here
-
             bookings.append(booking)
-            bookings_ids.add(booking.id)
-            bookings_hashes.add(hash_booking_by_period_and_room(booking))
 
-        if filter_rooms is None:
-            filter_rooms = self._rooms.get_all()
+        return bookings
 
-        for room, account in zip(
-            filter_rooms,
-            map(self._get_ews_account_for_room, filter_rooms),
-        ):
-            logger.info(f"Getting calendar items for room {room.get_name(Language.EN)}")
-            items = account.calendar.view(  # type: ignore
-                start=period.start.datetime_utc(),
-                end=period.end.datetime_utc(),
-            ).all()
+    async def get_room_changes(
+        self,
+        room: Room,
+        sync_state: str | None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> RoomChanges:
+        return await self._run_blocking(
+            room.email,
+            priority,
+            self.get_room_changes_blocking,
+            room,
+            sync_state,
+        )
+
+    def get_room_changes_blocking(
+        self,
+        room: Room,
+        sync_state: str | None,
+    ) -> RoomChanges:
+        """
+        Returns changes of the room calendar since the given sync state
+        (or all items of the calendar, if the state is not given).
+        """
+
+        account = self._get_ews_account_for_room(room)
+        folder = account.calendar
+
+        updated: list[BookingWithId] = []
+        deleted_ids: list[BookingId] = []
+        has_recurring_changes = False
+
+        try:
+            # The folder instance is cached by the pooled account,
+            # so it may still hold the state of the previous sync.
+            folder.item_sync_state = sync_state  # type: ignore
+
+            for change_type, item in folder.sync_items(  # type: ignore
+                only_fields=CALENDAR_ITEM_SYNC_FIELDS,
+            ):
+                if change_type == "delete":
+                    deleted_ids.append(BookingId(item.id))
+                    continue
+
+                if change_type not in ("create", "update"):
+                    continue
+
+                if item.type != "Single":
+                    # Sync returns only recurring masters, not their
+                    # occurrences, so the caller has to expand them with
+                    # a calendar view.
+                    has_recurring_changes = True
+                    continue
 
-            for item in items:
                 try:
                     booking = self._convert_calendar_item_to_booking_with_id(
                         item, self._rooms
@@ -207,46 +669,183 @@ class OutlookBookings(BookingsRepo):
                     logger.warning(f"Invalid calendar item: {e}")
                     continue
 
-                if (
-                    filter_user_email is not None
-                    and booking.owner.email != filter_user_email
-                ):
-                    continue
+                updated.append(booking)
+        except Exception:
+            # The pooled account may be broken, let it be recreated next time
+            self._room_accounts.invalidate(room.email)
+            raise
+
+        return RoomChanges(
+            updated=updated,
+            deleted_ids=deleted_ids,
+            has_recurring_changes=has_recurring_changes,
+            sync_state=str(folder.item_sync_state),  # type: ignore
+        )
 
-                if booking.id in bookings_ids:
-                    continue
+    async def get_rooms_busy_periods(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+    ) -> dict[str, list[TimePeriod]]:
+        return await self._run_blocking(
+            self._mailbox,
+            Priority.INTERACTIVE,
+            self.get_rooms_busy_periods_blocking,
+            period,
+            filter_rooms,
+        )
 
-                if hash_booking_by_period_and_room(booking) in bookings_hashes:
-                    continue
+    def get_rooms_busy_periods_blocking(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+    ) -> dict[str, list[TimePeriod]]:
+        if filter_rooms is None:
+            filter_rooms = self._rooms.get_all()
 
-                bookings.append(booking)
-                bookings_ids.add(booking.id)
-                bookings_hashes.add(hash_booking_by_period_and_room(booking))
+        # One batched GetUserAvailability request (exchangelib splits it into
+        # chunks of 100 mailboxes) returns only busy intervals instead of
+        # the full calendar items of every room.
+        views = self._account.protocol.get_free_busy_info(
+            accounts=[(room.email, "Room", False) for room in filter_rooms],
+            start=exchangelib.EWSDateTime.from_datetime(period.start.datetime_utc()),
+            end=exchangelib.EWSDateTime.from_datetime(period.end.datetime_utc()),
+            requested_view="FreeBusy",
+        )
 
-        return bookings
+        return self._convert_free_busy_views(period, filter_rooms, views)
+
+    def _convert_free_busy_views(
+        self,
+        period: TimePeriod,
+        rooms: list[Room],
+        views: collections.abc.Iterable[object],
+    ) -> dict[str, list[TimePeriod]]:
+        busy_periods: dict[str, list[TimePeriod]] = {}
+
+        # Views are returned in the same order as the requested mailboxes
+        for room, view in zip(rooms, views):
+            if isinstance(view, Exception):
+                # We can't tell whether the room is free, so treat it as busy
+                logger.warning(f"Error while getting free/busy of {room.email}: {view}")
+                busy_periods[room.email] = [period]
+                continue
+
+            assert isinstance(view, exchangelib.properties.FreeBusyView)
+
+            busy_periods[room.email] = [
+                TimePeriod(
+                    start=TimeStamp(event.start.timestamp()),
+                    end=TimeStamp(event.end.timestamp()),
+                )
+                for event in view.calendar_events or []  # type: ignore
+                if event.busy_type not in FREE_BUSY_TYPES
+            ]
+
+        return busy_periods
 
     async def get_booking_owner(self, booking_id: BookingId) -> User:
-        return await asyncio.get_running_loop().run_in_executor(
-            self._executor,
+        return await self._run_blocking(
+            self._mailbox,
+            Priority.INTERACTIVE,
             self.get_booking_owner_blocking,
             booking_id,
         )
 
     def get_booking_owner_blocking(self, booking_id: BookingId) -> User:
         # TODO(metafates): assertion magic so that pyright will stop complaining about this
-        calendar_item = self._account.calendar.get(id=booking_id)  # type: ignore
+        calendar_item = (
+            self._account.calendar.all()  # type: ignore
+            .only(*CALENDAR_ITEM_OWNER_FIELDS)
+            .get(id=booking_id)
+        )
         return self._get_calendar_item_owner(calendar_item)
 
+    async def get_bookings_owners(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[User | Exception]:
+        return await self._run_in_chunks(
+            self.get_bookings_owners_blocking,
+            bookings_ids,
+        )
+
+    def get_bookings_owners_blocking(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[User | Exception]:
+        items = self._account.fetch(
+            ids=[(booking_id, None) for booking_id in bookings_ids],
+            folder=self._account.calendar,
+            only_fields=CALENDAR_ITEM_OWNER_FIELDS,
+            chunk_size=BULK_CHUNK_SIZE,
+        )
+
+        owners: list[User | Exception] = []
+
+        for item in items:
+            if isinstance(item, Exception):
+                owners.append(item)
+                continue
+
+            try:
+                owners.append(self._get_calendar_item_owner(item))  # type: ignore
+            except Exception as e:
+                owners.append(e)
+
+        return owners
+
+    async def _run_in_chunks(
+        self,
+        func: collections.abc.Callable[[list[BookingId]], list[T]],
+        bookings_ids: list[BookingId],
+    ) -> list[T]:
+        """
+        Splits the IDs into chunks of `BULK_CHUNK_SIZE` and runs `func` for
+        them in parallel on the executor.
+
+        :return: Results of all the chunks, in the same order as the IDs.
+        """
+
+        chunks_results = await asyncio.gather(
+            *(
+                self._run_blocking(
+                    self._mailbox,
+                    Priority.INTERACTIVE,
+                    func,
+                    bookings_ids[i : i + BULK_CHUNK_SIZE],
+                )
+                for i in range(0, len(bookings_ids), BULK_CHUNK_SIZE)
+            )
+        )
+
+        return [result for chunk_results in chunks_results for result in chunk_results]
+
+    async def _run_blocking(
+        self,
+        mailbox: str,
+        priority: Priority,
+        func: collections.abc.Callable[..., T],
+        *args: Any,
+    ) -> T:
+        """
+        Runs a blocking EWS call on the executor once the scheduler lets
+        a request to `mailbox` through.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        return await self._scheduler.run(
+            mailbox,
+            priority,
+            lambda: loop.run_in_executor(self._executor, func, *args),
+        )
+
     def _get_ews_account_for_room(self, room: Room) -> exchangelib.Account:
         # Just to make sure
         assert self._rooms.get_by_email(room.email) is not None
 
-        return exchangelib.Account(
-            primary_smtp_address=room.email,
-            config=self._account_config,
-            autodiscover=False,
-            access_type=exchangelib.IMPERSONATION,
-        )
+        return self._room_accounts.get(room.email)
 
     def _get_calendar_item_owner(self, item: exchangelib.CalendarItem) -> User:
         # The problem is that old booking services may appear as organizers,
@@ -313,6 +912,104 @@ class OutlookBookings(BookingsRepo):
         )
 
 
+# Fields of calendar items that are read by the converters below. Calendar
+# views request only these fields, so bodies, MIME content and the rest of
+# the item are neither sent by Exchange nor parsed by exchangelib.
+CALENDAR_ITEM_FIELDS = (
+    "subject",
+    "start",
+    "end",
+    "organizer",
+    "required_attendees",
+    "resources",
+)
+
+# Calendar items reported by folder sync also need their type, because
+# recurring items have to be expanded with a calendar view.
+CALENDAR_ITEM_SYNC_FIELDS = CALENDAR_ITEM_FIELDS + ("type",)
+
+# Fields that are read by `OutlookBookings._get_calendar_item_owner`
+CALENDAR_ITEM_OWNER_FIELDS = (
+    "organizer",
+    "required_attendees",
+)
+
+
+# (period, room email), identifies the same booking across calendars
+BookingKey = tuple[TimePeriod, str]
+
+
+def get_booking_key(booking: Booking) -> BookingKey:
+    return (booking.period, booking.room.email)
+
+
+def merge_bookings(
+    own_bookings: list[BookingWithId],
+    rooms_bookings: list[list[BookingWithId]],
+    filter_user_email: str | None = None,
+) -> list[BookingWithId]:
+    """
+    Merges bookings from the service account calendar with bookings from the
+    rooms calendars.
+
+    The same booking appears both in the service account calendar and in the
+    room calendar, but with different IDs, so we also deduplicate bookings by
+    their period and room.
+    """
+
+    bookings: list[BookingWithId] = []
+    bookings_ids: set[BookingId] = set()
+    bookings_keys: set[BookingKey] = set()
+
+    # we don't need to check for id duplicates here
+    for booking in own_bookings:
+        # Bookings of other users are still remembered, so that their room
+        # copies aren't taken for bookings of the user.
+        bookings_ids.add(booking.id)
+        bookings_keys.add(get_booking_key(booking))
+
+        if filter_user_email is None or booking.owner.email == filter_user_email:
+            bookings.append(booking)
+
+    for room_bookings in rooms_bookings:
+        for booking in room_bookings:
+            if (
+                filter_user_email is not None
+                and booking.owner.email != filter_user_email
+            ):
+                continue
+
+            if booking.id in bookings_ids:
+                continue
+
+            key = get_booking_key(booking)
+            if key in bookings_keys:
+                continue
+
+            bookings.append(booking)
+            bookings_ids.add(booking.id)
+            bookings_keys.add(key)
+
+    return bookings
+
+
+def split_period(period: TimePeriod, duration: timedelta) -> list[TimePeriod]:
+    """
+    :return: Consecutive periods of `duration` that cover the period, the
+        last one may be shorter.
+    """
+
+    periods: list[TimePeriod] = []
+    start = period.start
+
+    while start < period.end:
+        end = min(start + duration, period.end)
+        periods.append(TimePeriod(start=start, end=end))
+        start = end
+
+    return periods
+
+
 def get_calendar_item_organizer_email(item: exchangelib.CalendarItem) -> str | None:
     assert item.required_attendees is None or isinstance(
         item.required_attendees,
@@ -0,0 +1,635 @@
+__all__ = ["AsyncOutlookBookings"]
+
+import asyncio
+import collections.abc
+import datetime
+import time
+from logging import getLogger
+from typing import Any, TypeVar, Unpack
+
+import exchangelib
+import exchangelib.errors
+import exchangelib.items
+import exchangelib.properties
+import exchangelib.services
+import httpx
+from exchangelib.fields import FieldPath
+
+from app.adapters.ews_parsing import parse_find_item_ids, parse_response
+from app.adapters.ews_scheduler import Priority
+from app.adapters.outlook import (
+    BULK_CHUNK_SIZE,
+    CALENDAR_ITEM_FIELDS,
+    CALENDAR_ITEM_OWNER_FIELDS,
+    CALENDAR_VIEW_WINDOW,
+    BookingsDict,
+    MissingCalendarItemFieldError,
+    OutlookBookings,
+    merge_bookings,
+    split_period,
+)
+from app.domain.entities import Booking, BookingId, Room, TimePeriod, User
+from app.domain.entities.booking import BookingWithId
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Mailboxes per GetUserAvailability request, more are rejected by EWS
+FREE_BUSY_CHUNK_SIZE = 100
+
+# Services that only read, they may be sent again if the connection fails
+# before the response. Others (e.g. CreateItem) could be applied twice.
+IDEMPOTENT_SERVICES = (
+    exchangelib.services.FindItem,
+    exchangelib.services.GetItem,
+    exchangelib.services.GetUserAvailability,
+)
+
+# Seconds to wait for a connection or for a response
+HTTP_TIMEOUT = 30.0
+# Seconds that idle connections are kept alive for, Exchange closes them
+# after a couple of minutes
+HTTP_KEEPALIVE_EXPIRY = 60.0
+
+# Access tokens are renewed this many seconds before they expire
+ACCESS_TOKEN_RENEWAL_MARGIN = 5 * 60
+
+logger = getLogger(__name__)
+
+
+class AsyncOutlookBookings(OutlookBookings):
+    """
+    Outlook bookings that talk to EWS right from the event loop.
+
+    exchangelib is only used to build SOAP requests and to parse responses,
+    the requests themselves are sent over a pool of kept alive connections,
+    so as many of them are in flight at once as the scheduler allows instead
+    of as many as there are executor threads. Calendar items are converted
+    to bookings exactly like in `OutlookBookings`.
+
+    Methods that aren't overridden here (e.g. folder sync) still run
+    exchangelib on the executor.
+    """
+
+    def __init__(self, **kwargs: Unpack[BookingsDict]):
+        super().__init__(**kwargs)
+
+        self._endpoint = self._account.protocol.service_endpoint
+        self._http = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            transport=httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=self._scheduler.max_concurrent_requests,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+                # Failed connects are retried, nothing has been sent then
+                retries=1,
+            ),
+        )
+
+        self._access_token: str | None = None
+        self._access_token_expires_at = 0.0
+        self._access_token_lock = asyncio.Lock()
+
+    async def warm_up(self):
+        await super().warm_up()
+        await self._get_access_token()
+
+    async def close(self):
+        await self._http.aclose()
+
+    async def create_booking(self, booking: Booking) -> BookingId:
+        (result,) = await self.create_bookings([booking])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def create_bookings(
+        self,
+        bookings: list[Booking],
+    ) -> list[BookingId | Exception]:
+        return await self._gather_in_chunks(
+            self._create_bookings_chunk,
+            bookings,
+            BULK_CHUNK_SIZE,
+        )
+
+    async def _create_bookings_chunk(
+        self,
+        bookings: list[Booking],
+    ) -> list[BookingId | Exception]:
+        service = exchangelib.services.CreateItem(account=self._account)
+        payload = service.get_payload(
+            items=[self._create_calendar_item(booking) for booking in bookings],
+            folder=get_calendar_folder_id(self._account),
+            message_disposition=exchangelib.items.SAVE_ONLY,
+            send_meeting_invitations=exchangelib.items.SEND_ONLY_TO_ALL,
+        )
+
+        results = await self._call(
+            service,
+            payload,
+            lambda body: parse_response(service, body),
+        )
+
+        bookings_ids: list[BookingId | Exception] = []
+
+        for result in results:
+            if isinstance(result, Exception):
+                bookings_ids.append(result)
+            elif getattr(result, "id", None) is None:
+                # Unlike `create_booking_blocking` we have nothing to revert
+                # the booking by, so it's only reported.
+                logger.warning("Created calendar item has no ID")
+                bookings_ids.append(MissingCalendarItemFieldError("id"))
+            else:
+                bookings_ids.append(result.id)  # type: ignore
+
+        return bookings_ids
+
+    async def delete_booking(self, booking_id: BookingId):
+        (result,) = await self.delete_bookings([booking_id])
+        if result is not None:
+            raise result
+
+    async def delete_bookings(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[Exception | None]:
+        return await self._gather_in_chunks(
+            self._delete_bookings_chunk,
+            bookings_ids,
+            BULK_CHUNK_SIZE,
+        )
+
+    async def _delete_bookings_chunk(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[Exception | None]:
+        service = exchangelib.services.DeleteItem(account=self._account)
+        payload = service.get_payload(
+            items=[(booking_id, None) for booking_id in bookings_ids],
+            delete_type=exchangelib.items.HARD_DELETE,
+            send_meeting_cancellations=exchangelib.items.SEND_TO_NONE,
+            affected_task_occurrences=exchangelib.items.ALL_OCCURRENCES,
+            suppress_read_receipts=True,
+        )
+
+        results = await self._call(
+            service,
+            payload,
+            lambda body: parse_response(service, body),
+        )
+
+        return [result if isinstance(result, Exception) else None for result in results]
+
+    async def get_bookings_in_period(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+        filter_user_email: str | None = None,
+    ) -> list[BookingWithId]:
+        if filter_rooms is None:
+            filter_rooms = self._rooms.get_all()
+
+        own_items, rooms_bookings = await asyncio.gather(
+            self._find_calendar_items(self._account, period),
+            asyncio.gather(
+                *(
+                    self.get_room_bookings_in_period(room, period)
+                    for room in filter_rooms
+                )
+            ),
+        )
+
+        return merge_bookings(
+            self._convert_calendar_items_to_bookings(own_items),
+            rooms_bookings,
+            filter_user_email,
+        )
+
+    async def get_room_bookings_in_period(
+        self,
+        room: Room,
+        period: TimePeriod,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> list[BookingWithId]:
+        # Creating an account may block, e.g. on its protocol
+        account = await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            self._get_ews_account_for_room,
+            room,
+        )
+
+        try:
+            items = await self._find_calendar_items(account, period, priority)
+        except Exception:
+            self._room_accounts.invalidate(room.email)
+            raise
+
+        return self._convert_calendar_items_to_bookings(items)
+
+    async def get_rooms_busy_periods(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+    ) -> dict[str, list[TimePeriod]]:
+        if filter_rooms is None:
+            filter_rooms = self._rooms.get_all()
+
+        async def get_chunk_views(rooms: list[Room]) -> list[Any]:
+            service = exchangelib.services.GetUserAvailability(
+                protocol=self._account.protocol
+            )
+            # Used both for the request time zone context and for parsing
+            service.tzinfo = exchangelib.EWSTimeZone("UTC")
+
+            payload = service.get_payload(
+                mailbox_data=[
+                    exchangelib.properties.MailboxData(
+                        email=room.email,
+                        attendee_type="Room",
+                        exclude_conflicts=False,
+                    )
+                    for room in rooms
+                ],
+                timezone=UTC_TIME_ZONE,
+                free_busy_view_options=exchangelib.properties.FreeBusyViewOptions(
+                    time_window=exchangelib.properties.TimeWindow(
+                        start=to_ews_datetime(period.start.datetime_utc()),
+                        end=to_ews_datetime(period.end.datetime_utc()),
+                    ),
+                    merged_free_busy_interval=30,
+                    requested_view="FreeBusy",
+                ),
+            )
+
+            return await self._call(
+                service,
+                payload,
+                lambda body: parse_response(service, body),
+            )
+
+        views = await self._gather_in_chunks(
+            get_chunk_views,
+            filter_rooms,
+            FREE_BUSY_CHUNK_SIZE,
+        )
+
+        return self._convert_free_busy_views(period, filter_rooms, views)
+
+    async def get_booking_owner(self, booking_id: BookingId) -> User:
+        (owner,) = await self.get_bookings_owners([booking_id])
+        if isinstance(owner, Exception):
+            raise owner
+        return owner
+
+    async def get_bookings_owners(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[User | Exception]:
+        return await self._gather_in_chunks(
+            self._get_bookings_owners_chunk,
+            bookings_ids,
+            BULK_CHUNK_SIZE,
+        )
+
+    async def _get_bookings_owners_chunk(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[User | Exception]:
+        service = exchangelib.services.GetItem(account=self._account)
+        payload = service.get_payload(
+            items=[(booking_id, None) for booking_id in bookings_ids],
+            additional_fields=get_calendar_item_fields_paths(
+                CALENDAR_ITEM_OWNER_FIELDS
+            ),
+            shape=exchangelib.items.ID_ONLY,
+        )
+
+        owners: list[User | Exception] = []
+
+        items = await self._call(
+            service,
+            payload,
+            lambda body: parse_response(service, body),
+        )
+
+        for item in items:
+            if isinstance(item, Exception):
+                owners.append(item)
+                continue
+
+            try:
+                owners.append(self._get_calendar_item_owner(item))  # type: ignore
+            except Exception as e:
+                owners.append(e)
+
+        return owners
+
+    async def _find_calendar_items(
+        self,
+        account: exchangelib.Account,
+        period: TimePeriod,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> list[exchangelib.CalendarItem]:
+        """
+        FindItem doesn't return complex fields (organizer and attendees), so
+        it only finds the IDs of the items, and their fields are read with
+        GetItem in chunks.
+
+        Calendar views can't be paged by offset, so a long period is read in
+        windows of `CALENDAR_VIEW_WINDOW`, a request per window, to keep
+        every response bounded.
+        """
+
+        windows_items_ids = await asyncio.gather(
+            *(
+                self._find_calendar_items_ids_in_window(account, window, priority)
+                for window in split_period(period, CALENDAR_VIEW_WINDOW)
+            )
+        )
+
+        # Items that overlap several windows come with each of them
+        items_ids = list(
+            dict.fromkeys(
+                item_id
+                for window_items_ids in windows_items_ids
+                for item_id in window_items_ids
+            )
+        )
+
+        return await self._gather_in_chunks(
+            lambda chunk: self._get_calendar_items_chunk(account, chunk, priority),
+            items_ids,
+            BULK_CHUNK_SIZE,
+        )
+
+    async def _find_calendar_items_ids_in_window(
+        self,
+        account: exchangelib.Account,
+        window: TimePeriod,
+        priority: Priority,
+    ) -> list[str]:
+        service = exchangelib.services.FindItem(account=account)
+        payload = service.get_payload(
+            folders=[get_calendar_folder_id(account)],
+            additional_fields=None,
+            restriction=None,
+            order_fields=None,
+            query_string=None,
+            shape=exchangelib.items.ID_ONLY,
+            depth=exchangelib.items.SHALLOW,
+            calendar_view=exchangelib.properties.CalendarView(
+                start=to_ews_datetime(window.start.datetime_utc()),
+                end=to_ews_datetime(window.end.datetime_utc()),
+            ),
+            page_size=None,
+        )
+
+        return await self._call(
+            service,
+            payload,
+            lambda body: parse_find_item_ids(service, body),
+            str(account.primary_smtp_address),
+            priority,
+        )
+
+    async def _get_calendar_items_chunk(
+        self,
+        account: exchangelib.Account,
+        items_ids: list[str],
+        priority: Priority,
+    ) -> list[exchangelib.CalendarItem]:
+        service = exchangelib.services.GetItem(account=account)
+        payload = service.get_payload(
+            items=[(item_id, None) for item_id in items_ids],
+            additional_fields=get_calendar_item_fields_paths(CALENDAR_ITEM_FIELDS),
+            shape=exchangelib.items.ID_ONLY,
+        )
+
+        results = await self._call(
+            service,
+            payload,
+            lambda body: parse_response(service, body),
+            str(account.primary_smtp_address),
+            priority,
+        )
+
+        items: list[exchangelib.CalendarItem] = []
+
+        for result in results:
+            if isinstance(result, exchangelib.CalendarItem):
+                items.append(result)
+            elif isinstance(result, Exception):
+                # The item may have been deleted after it was found
+                logger.warning(f"Error while getting calendar item: {result}")
+
+        return items
+
+    async def _call(
+        self,
+        service: exchangelib.services.common.EWSService,
+        payload: Any,
+        parse: collections.abc.Callable[[bytes], R],
+        mailbox: str | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> R:
+        """
+        Sends the request once the scheduler lets it through and parses the
+        response. The response is parsed within the scheduled call, because
+        that's where exchangelib raises ErrorServerBusy from SOAP faults.
+
+        :param mailbox: Email of the mailbox that the request is made in,
+            the service account mailbox by default.
+        """
+
+        if mailbox is None:
+            mailbox = self._mailbox
+
+        async def send() -> R:
+            return parse(await self._post(service, payload, mailbox))
+
+        return await self._scheduler.run(mailbox, priority, send)
+
+    async def _post(
+        self,
+        service: exchangelib.services.common.EWSService,
+        payload: Any,
+        mailbox: str | None = None,
+    ) -> bytes:
+        """
+        Sends the request payload of the service and returns the raw response.
+        SOAP faults are not raised here, they are raised when parsing.
+
+        :param mailbox: Email of the mailbox that the request is made in,
+            lets Exchange route the request right to its server.
+        """
+
+        envelope = service.wrap(
+            content=payload,
+            api_version=self._account.version.api_version,
+        )
+
+        headers = {
+            "Content-Type": "text/xml; charset=utf-8",
+            "Accept": "text/xml",
+        }
+        if mailbox is not None:
+            headers["X-AnchorMailbox"] = mailbox
+
+        for attempt in range(2):
+            headers["Authorization"] = f"Bearer {await self._get_access_token()}"
+
+            response = await post(
+                self._http,
+                self._endpoint,
+                envelope,
+                headers,
+                idempotent=isinstance(service, IDEMPOTENT_SERVICES),
+            )
+
+            if response.status_code == 401 and attempt == 0:
+                # The token may have been revoked before it expired
+                self._access_token_expires_at = 0.0
+                continue
+
+            if response.status_code in (429, 503):
+                raise exchangelib.errors.ErrorServerBusy(
+                    f"EWS response status {response.status_code}",
+                    back_off=get_retry_after(response.headers),
+                )
+
+            # SOAP faults come with 500
+            if response.status_code not in (200, 500):
+                raise exchangelib.errors.TransportError(
+                    f"Unexpected EWS response status {response.status_code}"
+                )
+
+            return response.content
+
+        raise exchangelib.errors.UnauthorizedError("EWS access token is rejected")
+
+    async def _get_access_token(self) -> str:
+        async with self._access_token_lock:
+            if (
+                self._access_token is None
+                or time.time()
+                > self._access_token_expires_at - ACCESS_TOKEN_RENEWAL_MARGIN
+            ):
+                (
+                    self._access_token,
+                    self._access_token_expires_at,
+                ) = await asyncio.get_running_loop().run_in_executor(
+                    self._executor,
+                    self._get_access_token_blocking,
+                    self._access_token is not None,
+                )
+
+            return self._access_token
+
+    def _get_access_token_blocking(self, renew: bool) -> tuple[str, float]:
+        protocol = self._account.protocol
+
+        # These are resolved by exchangelib with blocking requests on first
+        # access and are cached afterwards, so we make sure that it doesn't
+        # happen in the event loop.
+        self._account.version  # type: ignore
+        self._account.calendar  # type: ignore
+
+        session = protocol.get_session()
+        if renew:
+            session = protocol.renew_session(session)
+
+        try:
+            token = session.token  # type: ignore
+        finally:
+            protocol.release_session(session)
+
+        return token["access_token"], token.get("expires_at", time.time() + 60 * 60)
+
+    async def _gather_in_chunks(
+        self,
+        func: collections.abc.Callable[
+            [list[T]], collections.abc.Coroutine[Any, Any, list[R]]
+        ],
+        items: list[T],
+        chunk_size: int,
+    ) -> list[R]:
+        chunks_results = await asyncio.gather(
+            *(func(items[i : i + chunk_size]) for i in range(0, len(items), chunk_size))
+        )
+
+        return [result for chunk_results in chunks_results for result in chunk_results]
+
+
+UTC_TIME_ZONE = exchangelib.properties.TimeZone(
+    bias=0,
+    standard_time=exchangelib.properties.StandardTime(
+        bias=0,
+        time=datetime.time(0),
+        occurrence=1,
+        iso_month=1,
+        weekday=1,
+    ),
+    daylight_time=exchangelib.properties.DaylightTime(
+        bias=0,
+        time=datetime.time(0),
+        occurrence=1,
+        iso_month=1,
+        weekday=1,
+    ),
+)
+
+
+def get_calendar_folder_id(
+    account: exchangelib.Account,
+) -> exchangelib.properties.DistinguishedFolderId:
+    return exchangelib.properties.DistinguishedFolderId(
+        id="calendar",
+        mailbox=exchangelib.properties.Mailbox(
+            email_address=account.primary_smtp_address
+        ),
+    )
+
+
+async def post(
+    client: httpx.AsyncClient,
+    url: str,
+    content: bytes,
+    headers: dict[str, str],
+    idempotent: bool,
+) -> httpx.Response:
+    """
+    :param idempotent: Whether the request may be sent again, if the
+        connection breaks before the response. Others (e.g. CreateItem)
+        could be applied twice, so their errors are raised.
+    """
+
+    try:
+        return await client.post(url, content=content, headers=headers)
+    except (httpx.RemoteProtocolError, httpx.ReadError) as e:
+        # Exchange may close a kept alive connection at any moment
+        if not idempotent:
+            raise
+        logger.info(f"EWS connection failed, sending the request again: {e}")
+
+    return await client.post(url, content=content, headers=headers)
+
+
+def get_retry_after(headers: collections.abc.Mapping[str, str]) -> float | None:
+    try:
+        return float(headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+def get_calendar_item_fields_paths(fields: tuple[str, ...]) -> set[FieldPath]:
+    return {
+        FieldPath(field=exchangelib.CalendarItem.get_field_by_fieldname(field))
+        for field in fields
+    }
+
+
+def to_ews_datetime(value: datetime.datetime) -> exchangelib.EWSDateTime:
+    return exchangelib.EWSDateTime.from_datetime(value)
@@ -0,0 +1,62 @@
+__all__ = ["RoomAccountsHealthCheck"]
+
+import asyncio
+from datetime import timedelta
+from logging import getLogger
+from typing import NotRequired, TypedDict, Unpack
+
+from app.adapters.outlook import OutlookBookings
+
+DEFAULT_HEALTH_CHECK_INTERVAL = timedelta(minutes=15)
+
+logger = getLogger(__name__)
+
+
+class RoomAccountsHealthCheckDict(TypedDict):
+    outlook: OutlookBookings
+    interval: NotRequired[timedelta]
+
+
+class RoomAccountsHealthCheck:
+    """
+    Checks the pooled accounts of the rooms every `interval`, so that broken
+    ones are recreated before a request needs them.
+    """
+
+    def __init__(self, **kwargs: Unpack[RoomAccountsHealthCheckDict]):
+        self._outlook = kwargs["outlook"]
+        self._interval = kwargs.get("interval", DEFAULT_HEALTH_CHECK_INTERVAL)
+
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run(self):
+        while True:
+            # Accounts have just been created by the warm-up
+            await asyncio.sleep(self._interval.total_seconds())
+            await self.check()
+
+    async def check(self):
+        try:
+            health = await self._outlook.check_room_accounts_health()
+        except Exception as e:
+            logger.warning(f"Error while checking room accounts: {e}")
+            return
+
+        unhealthy = [email for email, is_healthy in health.items() if not is_healthy]
+        if unhealthy:
+            logger.info(f"Dropped unhealthy room accounts: {', '.join(unhealthy)}")
@@ -0,0 +1,97 @@
+__all__ = ["RoomCatalogue", "RoomDetails"]
+
+import bisect
+import collections.abc
+
+from app.adapters.outlook import RoomsRegistry
+from app.domain.entities import Room, RoomType
+
+
+class RoomDetails:
+    __slots__ = ("_id", "_type", "_capacity")
+
+    def __init__(self, id: str, type: RoomType, capacity: int):
+        self._id = id
+        self._type = type
+        self._capacity = capacity
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def type(self) -> RoomType:
+        return self._type
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+
+class RoomCatalogue(RoomsRegistry):
+    """
+    Rooms registry that also knows the ID, type and capacity of every room.
+
+    Rooms of every type are kept sorted by capacity, so the rooms with
+    enough seats are found by a binary search instead of checking every
+    room.
+    """
+
+    def __init__(self, rooms: list[tuple[Room, RoomDetails]]):
+        super().__init__([room for room, _ in rooms])
+
+        self._details_by_email: dict[str, RoomDetails] = {}
+        self._rooms_by_id: dict[str, Room] = {}
+        # Order of the rooms in the catalogue, results are returned in it
+        self._positions: dict[str, int] = {}
+        # Type -> (ascending capacities, rooms with these capacities)
+        self._capacity_index: dict[RoomType, tuple[list[int], list[Room]]] = {}
+
+        for position, (room, details) in enumerate(rooms):
+            self._details_by_email[room.email] = details
+            self._rooms_by_id[details.id] = room
+            self._positions[room.email] = position
+
+        for room, details in sorted(rooms, key=lambda item: item[1].capacity):
+            capacities, rooms_of_type = self._capacity_index.setdefault(
+                details.type, ([], [])
+            )
+            capacities.append(details.capacity)
+            rooms_of_type.append(room)
+
+    def get_by_id(self, room_id: str) -> Room | None:
+        return self._rooms_by_id.get(room_id)
+
+    def get_details(self, room: Room) -> RoomDetails:
+        return self._details_by_email[room.email]
+
+    def find(
+        self,
+        min_capacity: int | None = None,
+        types: collections.abc.Iterable[RoomType] | None = None,
+    ) -> list[Room]:
+        """
+        :return: Rooms of any of the `types` with at least `min_capacity`
+            seats, in the order of the catalogue.
+        """
+
+        if types is None:
+            types = self._capacity_index.keys()
+
+        rooms: list[Room] = []
+
+        for room_type in set(types):
+            entry = self._capacity_index.get(room_type)
+            if entry is None:
+                continue
+
+            capacities, rooms_of_type = entry
+            start = (
+                0
+                if min_capacity is None
+                else bisect.bisect_left(capacities, min_capacity)
+            )
+            rooms.extend(rooms_of_type[start:])
+
+        rooms.sort(key=lambda room: self._positions[room.email])
+        return rooms
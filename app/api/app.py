@@ -2,6 +2,7 @@ __all__ = ["init_app"]
 
 from fastapi import FastAPI
 
+from .booking.router import integration_router as booking_integration_router
 from .booking.router import router as booking_router
 from .iam.router import router as iam_router
 
@@ -9,3 +10,4 @@ from .iam.router import router as iam_router
 def init_app(app: FastAPI):
     app.include_router(iam_router, prefix="/auth")
     app.include_router(booking_router, prefix="")
+    app.include_router(booking_integration_router, prefix="")
@@ -0,0 +1,70 @@
+__all__ = ["SerializedRooms", "create_room_schema"]
+
+import hashlib
+
+from app.adapters.room_catalogue import RoomCatalogue
+from app.domain.entities import Language
+from app.domain.entities import Room as RoomEntity
+
+from .schemas import Room
+
+
+class SerializedRooms:
+    """
+    JSON of every room of the catalogue in every language, serialized once
+    when the catalogue is loaded. Responses are joined from these bytes
+    instead of building and validating models on every request.
+    """
+
+    def __init__(self, catalogue: RoomCatalogue):
+        # Language -> room email -> JSON of the room
+        self._rooms_json: dict[Language, dict[str, bytes]] = {}
+        # Language -> (JSON of all the rooms, its ETag)
+        self._all_rooms_json: dict[Language, tuple[bytes, str]] = {}
+
+        for language in Language:
+            rooms_json = {
+                room.email: self._serialize_room(catalogue, room, language)
+                for room in catalogue.get_all()
+            }
+            self._rooms_json[language] = rooms_json
+
+            body = self._join(list(rooms_json.values()))
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            self._all_rooms_json[language] = (body, etag)
+
+    def get_all(self, language: Language) -> tuple[bytes, str]:
+        """
+        :return: JSON list of all the rooms and its strong ETag.
+        """
+
+        return self._all_rooms_json[language]
+
+    def get_list(self, rooms: list[RoomEntity], language: Language) -> bytes:
+        rooms_json = self._rooms_json[language]
+        return self._join([rooms_json[room.email] for room in rooms])
+
+    def _serialize_room(
+        self,
+        catalogue: RoomCatalogue,
+        room: RoomEntity,
+        language: Language,
+    ) -> bytes:
+        return create_room_schema(catalogue, room, language).json().encode()
+
+    def _join(self, rooms_json: list[bytes]) -> bytes:
+        return b"[" + b",".join(rooms_json) + b"]"
+
+
+def create_room_schema(
+    catalogue: RoomCatalogue,
+    room: RoomEntity,
+    language: Language,
+) -> Room:
+    details = catalogue.get_details(room)
+    return Room(
+        name=room.get_name(language),
+        id=details.id,
+        type=details.type,
+        capacity=details.capacity,
+    )
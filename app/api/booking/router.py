@@ -1,17 +1,68 @@
-from fastapi import APIRouter, Depends, status
+import base64
+import collections.abc
+import json
+from datetime import timedelta
+from typing import Annotated
 
-from app.api.dependencies import locale
-from app.api.iam.dependencies import authenticated_user
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 
+from app.adapters.outlook import RoomsRegistry
+from app.adapters.room_catalogue import RoomCatalogue
+from app.api.dependencies import (
+    bookings_export_repo,
+    bookings_repo,
+    language,
+    locale,
+    room_catalogue,
+    rooms_registry,
+    serialized_rooms,
+)
+from app.api.iam.dependencies import authenticated_integration, authenticated_user
+from app.api.iam.schemas import User as UserSchema
+from app.domain.dependencies import BookingsRepo
+from app.domain.entities import Booking as BookingEntity
+from app.domain.entities import (
+    BookingId,
+    BookingWithId,
+    Language,
+    TimePeriod,
+    TimeStamp,
+    User,
+)
+from app.domain.use_cases import booking as booking_use_cases
+
+from .rooms import SerializedRooms, create_room_schema
 from .schemas import (
+    BatchBookingResult,
+    BatchBookRoomsRequest,
     Booking,
+    BookingsFilter,
+    BookingsPage,
     BookRoomError,
     BookRoomRequest,
     GetFreeRoomsRequest,
+    GetRoomsOccupancyRequest,
     QueryBookingsRequest,
     Room,
+    RoomOccupancy,
+    RoomsOccupancy,
+    StreamBookingsRequest,
 )
 
+MAX_OCCUPANCY_SLOTS = 20_000
+
+# Bookings queries without a bound cover this much time from the other
+# bound (or from now, if there are no bounds)
+DEFAULT_QUERY_PERIOD = timedelta(days=90)
+MAX_QUERY_PERIOD = timedelta(days=366)
+
+# "My bookings" are the ones from now until this much time ahead
+MY_BOOKINGS_PERIOD = timedelta(days=90)
+
+# Occupancy rows hold 0/1 bytes, this turns them into "0"/"1" characters
+OCCUPANCY_CHARS = bytes.maketrans(b"\x00\x01", b"01")
+
 unauthorized_responses: dict[int | str, dict[str, str]] = {
     status.HTTP_401_UNAUTHORIZED: {
         "description": "API token was not provided, is invalid or has been expired",
@@ -25,14 +76,42 @@ router = APIRouter(
     responses=unauthorized_responses,
 )
 
+integration_router = APIRouter(
+    tags=["Booking"],
+    dependencies=[Depends(authenticated_integration)],
+    responses=unauthorized_responses,
+)
+
 
 @router.get(
     "/rooms",
     name="Get all bookable rooms",
     operation_id="get_rooms",
+    response_model=list[Room],
+    responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "Rooms haven't changed since the response with"
+            " the ETag from If-None-Match",
+        },
+    },
 )
-async def get_rooms() -> list[Room]:
-    raise NotImplementedError
+async def get_rooms(
+    rooms_json: Annotated[SerializedRooms, Depends(serialized_rooms)],
+    language: Annotated[Language, Depends(language)],
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    body, etag = rooms_json.get_all(language)
+    headers = {
+        "ETag": etag,
+        # The list depends on the language, clients should check the ETag
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Language",
+    }
+
+    if if_none_match is not None and is_etag_matching(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(body, media_type="application/json", headers=headers)
 
 
 @router.post(
@@ -41,9 +120,99 @@ async def get_rooms() -> list[Room]:
     operation_id="get_free_rooms",
     description="Returns a list of rooms that are available for booking at the"
     " specified time period.",
+    response_model=list[Room],
+    responses={
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "The time period is empty",
+        },
+    },
 )
-async def get_free_rooms(req: GetFreeRoomsRequest) -> list[Room]:
-    raise NotImplementedError
+async def get_free_rooms(
+    req: GetFreeRoomsRequest,
+    repo: Annotated[BookingsRepo, Depends(bookings_repo)],
+    catalogue: Annotated[RoomCatalogue, Depends(room_catalogue)],
+    rooms_json: Annotated[SerializedRooms, Depends(serialized_rooms)],
+    language: Annotated[Language, Depends(language)],
+) -> Response:
+    # Timestamps, so that naive and aware datetimes can be compared
+    start = req.start.timestamp()
+    end = req.end.timestamp()
+
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The time period is empty",
+        )
+
+    rooms = catalogue.find(min_capacity=req.min_capacity, types=req.type_in)
+    free_rooms = (
+        await booking_use_cases.get_free_rooms(
+            repo,
+            TimePeriod(start=TimeStamp(start), end=TimeStamp(end)),
+            rooms,
+        )
+        if rooms
+        else []
+    )
+
+    return Response(
+        rooms_json.get_list(free_rooms, language),
+        media_type="application/json",
+    )
+
+
+@router.post(
+    "/rooms/occupancy",
+    name="Get rooms occupancy",
+    operation_id="get_rooms_occupancy",
+    description="Splits the specified time period into equal slots and returns"
+    " for every room whether it is busy during each of them.",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "The time period is empty or contains too many slots",
+        },
+    },
+)
+async def get_rooms_occupancy(
+    req: GetRoomsOccupancyRequest,
+    repo: Annotated[BookingsRepo, Depends(bookings_repo)],
+    rooms: Annotated[RoomsRegistry, Depends(rooms_registry)],
+) -> RoomsOccupancy:
+    # Timestamps, so that naive and aware datetimes can be compared
+    start = req.start.timestamp()
+    end = req.end.timestamp()
+    slot_duration = timedelta(minutes=req.slot_minutes)
+
+    if (
+        end <= start
+        or (end - start) / slot_duration.total_seconds() > MAX_OCCUPANCY_SLOTS
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The time period is empty or contains too many slots",
+        )
+
+    period = TimePeriod(start=TimeStamp(start), end=TimeStamp(end))
+
+    all_rooms = rooms.get_all()
+    grid = await booking_use_cases.get_rooms_occupancy(
+        repo,
+        period,
+        slot_duration,
+        all_rooms,
+    )
+
+    return RoomsOccupancy(
+        slots_starts=[slot.start.datetime_utc() for slot in grid.get_slots()],
+        slot_minutes=req.slot_minutes,
+        rooms=[
+            RoomOccupancy(
+                room_email=room.email,
+                occupancy=grid.get_row(room.email).translate(OCCUPANCY_CHARS).decode(),
+            )
+            for room in all_rooms
+        ],
+    )
 
 
 @router.post(
@@ -72,17 +241,93 @@ async def book_room(room_id: str, req: BookRoomRequest) -> Booking:
     operation_id="get_my_bookings",
     description="Returns a list of bookings for the requesting user.",
 )
-async def get_my_bookings() -> list[Booking]:
-    raise NotImplementedError
+async def get_my_bookings(
+    user: Annotated[UserSchema, Depends(authenticated_user)],
+    repo: Annotated[BookingsRepo, Depends(bookings_repo)],
+    catalogue: Annotated[RoomCatalogue, Depends(room_catalogue)],
+    language: Annotated[Language, Depends(language)],
+) -> list[Booking]:
+    now = TimeStamp.now()
+    bookings = await booking_use_cases.get_user_bookings(
+        repo,
+        User(id=0, email=user.email_address),
+        TimePeriod(start=now, end=now + MY_BOOKINGS_PERIOD),
+    )
+
+    return [create_booking_schema(booking, catalogue, language) for booking in bookings]
 
 
 @router.post(
     "/bookings/query",
     name="Query bookings",
     operation_id="query_bookings",
+    description="Returns a page of the bookings that match the filter, ordered"
+    f" by start. The period of the filter is at most {MAX_QUERY_PERIOD.days}"
+    f" days, a missing bound is {DEFAULT_QUERY_PERIOD.days} days away from"
+    " the other one (or from now).",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "The time period is empty or too long, or the cursor"
+            " is invalid",
+        },
+    },
 )
-async def query_bookings(req: QueryBookingsRequest) -> list[Booking]:
-    raise NotImplementedError
+async def query_bookings(
+    req: QueryBookingsRequest,
+    repo: Annotated[BookingsRepo, Depends(bookings_repo)],
+    catalogue: Annotated[RoomCatalogue, Depends(room_catalogue)],
+    language: Annotated[Language, Depends(language)],
+) -> BookingsPage:
+    bookings, next_cursor = await booking_use_cases.query_bookings(
+        repo,
+        create_bookings_query(req.filter, catalogue),
+        req.limit,
+        None if req.cursor is None else decode_cursor(req.cursor),
+    )
+
+    return BookingsPage(
+        bookings=[
+            create_booking_schema(booking, catalogue, language) for booking in bookings
+        ],
+        next_cursor=None if next_cursor is None else encode_cursor(next_cursor),
+    )
+
+
+@router.post(
+    "/bookings/query/stream",
+    name="Export bookings",
+    operation_id="stream_bookings",
+    description="Returns all the bookings that match the filter as NDJSON, one"
+    " booking per line, as they are read from Exchange and in no particular"
+    " order. The period of the filter is limited like in `query_bookings`.",
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            "description": "Bookings, one JSON object per line",
+            "content": {"application/x-ndjson": {}},
+        },
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "The time period is empty or too long",
+        },
+    },
+)
+async def stream_bookings(
+    req: StreamBookingsRequest,
+    repo: Annotated[BookingsRepo, Depends(bookings_export_repo)],
+    catalogue: Annotated[RoomCatalogue, Depends(room_catalogue)],
+    language: Annotated[Language, Depends(language)],
+) -> StreamingResponse:
+    query = create_bookings_query(req.filter, catalogue)
+
+    async def lines() -> collections.abc.AsyncIterator[bytes]:
+        async for bookings in booking_use_cases.stream_bookings(repo, query):
+            yield b"".join(
+                create_booking_schema(booking, catalogue, language).json().encode()
+                + b"\n"
+                for booking in bookings
+            )
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @router.delete(
@@ -100,3 +345,150 @@ async def query_bookings(req: QueryBookingsRequest) -> list[Booking]:
 )
 async def delete_booking(booking_id: str) -> None:
     raise NotImplementedError
+
+
+@integration_router.post(
+    "/integrations/bookings/batch",
+    name="Book rooms in batch",
+    operation_id="book_rooms_batch",
+    description="Creates many bookings at once on behalf of their owners."
+    " Returns a result for every requested booking, in the same order.",
+)
+async def book_rooms_batch(
+    req: BatchBookRoomsRequest,
+    repo: Annotated[BookingsRepo, Depends(bookings_repo)],
+    catalogue: Annotated[RoomCatalogue, Depends(room_catalogue)],
+) -> list[BatchBookingResult]:
+    results: list[BatchBookingResult] = []
+    bookings: list[BookingEntity] = []
+    # Positions of the bookings that are sent to the repository
+    positions: list[int] = []
+
+    for item in req.bookings:
+        room = catalogue.get_by_id(item.room_id)
+
+        if room is None:
+            results.append(BatchBookingResult(error="Unknown room"))
+            continue
+
+        # Timestamps, so that naive and aware datetimes can be compared
+        start = item.start.timestamp()
+        end = item.end.timestamp()
+
+        if end <= start:
+            results.append(BatchBookingResult(error="Invalid time period"))
+            continue
+
+        positions.append(len(results))
+        results.append(BatchBookingResult())
+        bookings.append(
+            BookingEntity(
+                title=item.title,
+                period=TimePeriod(start=TimeStamp(start), end=TimeStamp(end)),
+                room=room,
+                owner=User(id=0, email=item.owner_email),
+            )
+        )
+
+    created: list[BookingId | Exception] = (
+        await repo.create_bookings(bookings) if bookings else []
+    )
+
+    for position, result in zip(positions, created):
+        if isinstance(result, Exception):
+            results[position] = BatchBookingResult(error=str(result) or "Error")
+        else:
+            results[position] = BatchBookingResult(booking_id=result)
+
+    return results
+
+
+def is_etag_matching(if_none_match: str, etag: str) -> bool:
+    """
+    Weak comparison, as If-None-Match requires.
+    """
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def create_bookings_query(
+    bookings_filter: BookingsFilter,
+    catalogue: RoomCatalogue,
+) -> booking_use_cases.BookingsQuery:
+    # Timestamps, so that naive and aware datetimes may be mixed
+    start = (
+        None
+        if bookings_filter.started_at_or_after is None
+        else bookings_filter.started_at_or_after.timestamp()
+    )
+    end = (
+        None
+        if bookings_filter.ended_at_or_before is None
+        else bookings_filter.ended_at_or_before.timestamp()
+    )
+    if start is None:
+        start = (
+            TimeStamp.now().timestamp()
+            if end is None
+            else end - DEFAULT_QUERY_PERIOD.total_seconds()
+        )
+    if end is None:
+        end = start + DEFAULT_QUERY_PERIOD.total_seconds()
+
+    if end <= start or end - start > MAX_QUERY_PERIOD.total_seconds():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The time period is empty or too long",
+        )
+
+    rooms = None
+    if bookings_filter.room_id_in is not None:
+        rooms = [
+            room
+            for room_id in bookings_filter.room_id_in
+            if (room := catalogue.get_by_id(room_id)) is not None
+        ]
+
+    return booking_use_cases.BookingsQuery(
+        period=TimePeriod(start=TimeStamp(start), end=TimeStamp(end)),
+        rooms=rooms,
+        owners_emails=bookings_filter.owner_email_in,
+    )
+
+
+def create_booking_schema(
+    booking: BookingWithId,
+    catalogue: RoomCatalogue,
+    language: Language,
+) -> Booking:
+    return Booking(
+        id=booking.id,
+        title=booking.title,
+        start=booking.period.start.datetime_utc(),
+        end=booking.period.end.datetime_utc(),
+        room=create_room_schema(catalogue, booking.room, language),
+        owner_email=booking.owner.email,
+    )
+
+
+def encode_cursor(cursor: booking_use_cases.BookingsCursor) -> str:
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> booking_use_cases.BookingsCursor:
+    try:
+        start, booking_id = json.loads(base64.urlsafe_b64decode(cursor))
+        if not isinstance(start, int | float) or not isinstance(booking_id, str):
+            raise ValueError
+        return float(start), BookingId(booking_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
@@ -1,12 +1,8 @@
 from datetime import datetime
-from enum import StrEnum
 
 from pydantic import BaseModel, Field
 
-
-class RoomType(StrEnum):
-    MEETING_ROOM = "MEETING_ROOM"
-    AUDITORIUM = "AUDITORIUM"
+from app.domain.entities import RoomType
 
 
 class Room(BaseModel):
@@ -61,6 +57,57 @@ class BookingsFilter(BaseModel):
 class GetFreeRoomsRequest(BaseModel):
     start: datetime
     end: datetime
+    min_capacity: int | None = Field(
+        None,
+        ge=1,
+        description="When specified, only rooms with at least this many seats"
+        " will be returned.",
+    )
+    type_in: list[RoomType] | None = Field(
+        None,
+        description="When specified, only rooms of the types from the list"
+        " will be returned.",
+    )
+
+
+class GetRoomsOccupancyRequest(BaseModel):
+    start: datetime
+    end: datetime
+    slot_minutes: int = Field(
+        30,
+        ge=5,
+        description="Duration of every slot of the grid in minutes.",
+    )
+
+
+class RoomOccupancy(BaseModel):
+    room_email: str
+    occupancy: str = Field(
+        description='One character per slot: "1" if the room is busy during'
+        ' the slot, "0" if it is free.',
+    )
+
+
+class RoomsOccupancy(BaseModel):
+    slots_starts: list[datetime]
+    slot_minutes: int
+    rooms: list[RoomOccupancy]
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "slots_starts": [
+                    "2023-09-01T09:00:00+00:00",
+                    "2023-09-01T09:30:00+00:00",
+                    "2023-09-01T10:00:00+00:00",
+                ],
+                "slot_minutes": 30,
+                "rooms": [
+                    {"room_email": "room1@example.com", "occupancy": "011"},
+                    {"room_email": "room2@example.com", "occupancy": "000"},
+                ],
+            }
+        }
 
 
 class BookRoomRequest(BaseModel):
@@ -78,5 +125,58 @@ class BookRoomError(BaseModel):
     message: str
 
 
+MAX_BATCH_BOOKINGS = 500
+
+
+class BatchBookingItem(BaseModel):
+    room_id: str
+    title: str
+    start: datetime
+    end: datetime
+    owner_email: str
+
+
+class BatchBookRoomsRequest(BaseModel):
+    bookings: list[BatchBookingItem] = Field(..., max_items=MAX_BATCH_BOOKINGS)
+
+
+class BatchBookingResult(BaseModel):
+    booking_id: str | None = Field(
+        default=None,
+        description="ID of the created booking, absent if it wasn't created.",
+    )
+    error: str | None = Field(
+        default=None,
+        description="Why the booking wasn't created.",
+    )
+
+
+MAX_QUERY_LIMIT = 1_000
+
+
 class QueryBookingsRequest(BaseModel):
     filter: BookingsFilter
+    limit: int = Field(
+        100,
+        ge=1,
+        le=MAX_QUERY_LIMIT,
+        description="Maximum number of bookings in the response.",
+    )
+    cursor: str | None = Field(
+        None,
+        description="`next_cursor` of the previous response, to get the next"
+        " page of bookings.",
+    )
+
+
+class StreamBookingsRequest(BaseModel):
+    filter: BookingsFilter
+
+
+class BookingsPage(BaseModel):
+    bookings: list[Booking]
+    next_cursor: str | None = Field(
+        None,
+        description="Pass it in the next request to get the next page, absent"
+        " if there are no more bookings.",
+    )
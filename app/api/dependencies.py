@@ -1,10 +1,29 @@
 from typing import Annotated
 
-from fastapi import Header
+import exchangelib
+from fastapi import Depends, Header, HTTPException, status
 
 from app.adapters.auth_in_memory import InMemoryAuthRepo
+from app.adapters.auth_sqlite import SQLiteAuthRepo
+from app.adapters.auth_sweeper import RefreshTokensSweeper
+from app.adapters.bookings_cache import CachedBookings
+from app.adapters.bookings_coalescing import CoalescingBookings
+from app.adapters.bookings_replica import ReplicaBookings
+from app.adapters.bookings_store import BookingsStore, InMemoryBookingsStore
+from app.adapters.bookings_store_sqlite import SQLiteBookingsStore
+from app.adapters.bookings_sync import BookingsSync
+from app.adapters.ews_scheduler import EWSScheduler
+from app.adapters.metrics_logger import MetricsLogger
+from app.adapters.outlook import OutlookBookings, RoomsRegistry
+from app.adapters.outlook_async import AsyncOutlookBookings
+from app.adapters.room_accounts_health import RoomAccountsHealthCheck
+from app.adapters.room_catalogue import RoomCatalogue, RoomDetails
+from app.api.booking.rooms import SerializedRooms
+from app.config import config
 from app.domain.dependencies.bookings_repo import BookingsRepo
 from app.domain.dependencies.iam_repo import AuthRepo
+from app.domain.entities import Language, Room
+from app.domain.use_cases.iam import VerifiedTokenCache
 
 DEFAULT_LOCALE = "en-US"
 
@@ -24,12 +43,202 @@ def locale(
     return accept_language
 
 
-in_memory_auth_repo = InMemoryAuthRepo()
+def language(locale: Annotated[str, Depends(locale)]) -> Language:
+    """
+    Language of the first locale that the client accepts, English if it
+    is not supported.
+    """
+
+    primary_tag = locale.split(",", 1)[0].split(";", 1)[0].split("-", 1)[0]
+    try:
+        return Language(primary_tag.strip().lower())
+    except ValueError:
+        return Language.EN
+
+
+def create_auth_repo() -> AuthRepo:
+    if config.auth_database_path is None:
+        return InMemoryAuthRepo(
+            max_refresh_tokens_per_user=config.max_refresh_tokens_per_user,
+        )
+
+    return SQLiteAuthRepo(
+        path=config.auth_database_path,
+        pool_size=config.auth_database_pool_size,
+        max_refresh_tokens_per_user=config.max_refresh_tokens_per_user,
+    )
+
+
+auth_repo_instance = create_auth_repo()
+refresh_tokens_sweeper = RefreshTokensSweeper(
+    repo=auth_repo_instance,
+    interval=config.refresh_tokens_sweep_interval,
+)
+# Metrics sources are added next to the components
+metrics_logger = MetricsLogger(interval=config.metrics_log_interval)
+
+if isinstance(auth_repo_instance, InMemoryAuthRepo):
+    metrics_logger.add_source("Auth store", auth_repo_instance.get_metrics)
 
 
 def auth_repo() -> AuthRepo:
-    return in_memory_auth_repo
+    return auth_repo_instance
+
+
+verified_token_cache_instance = VerifiedTokenCache(
+    max_size=config.verified_tokens_cache_size,
+)
+metrics_logger.add_source(
+    "Verified tokens cache", verified_token_cache_instance.get_metrics
+)
+
+
+def verified_token_cache() -> VerifiedTokenCache:
+    return verified_token_cache_instance
+
+
+rooms_registry_instance = RoomCatalogue(
+    [
+        (
+            Room(room.email, room.name_en, room.name_ru),
+            RoomDetails(
+                id=room.id or room.email.split("@", 1)[0],
+                type=room.type,
+                capacity=room.capacity,
+            ),
+        )
+        for room in config.rooms
+    ]
+)
+
+
+def rooms_registry() -> RoomsRegistry:
+    return rooms_registry_instance
+
+
+def room_catalogue() -> RoomCatalogue:
+    return rooms_registry_instance
+
+
+serialized_rooms_instance = SerializedRooms(rooms_registry_instance)
+
+
+def serialized_rooms() -> SerializedRooms:
+    return serialized_rooms_instance
+
+
+def create_outlook_bookings() -> OutlookBookings | None:
+    if config.exchange_email is None:
+        return None
+
+    credentials = exchangelib.OAuth2Credentials(
+        client_id=config.exchange_client_id,
+        client_secret=config.exchange_client_secret,
+        tenant_id=config.exchange_tenant_id,
+        identity=exchangelib.Identity(primary_smtp_address=config.exchange_email),
+    )
+
+    account_config = exchangelib.Configuration(
+        server=config.exchange_server,
+        credentials=credentials,
+        auth_type=exchangelib.OAUTH2,
+    )
+
+    account = exchangelib.Account(
+        primary_smtp_address=config.exchange_email,
+        config=account_config,
+        autodiscover=False,
+        access_type=exchangelib.DELEGATE,
+    )
+
+    scheduler = EWSScheduler(
+        max_concurrent_requests=config.exchange_max_concurrent_requests,
+        max_concurrent_mailbox_requests=config.exchange_max_concurrent_mailbox_requests,
+    )
+    metrics_logger.add_source("EWS scheduler", scheduler.get_metrics)
+
+    if config.exchange_async_transport:
+        return AsyncOutlookBookings(
+            account=account,
+            account_config=account_config,
+            rooms_registry=rooms_registry_instance,
+            executor=None,
+            scheduler=scheduler,
+        )
+
+    return OutlookBookings(
+        account=account,
+        account_config=account_config,
+        rooms_registry=rooms_registry_instance,
+        executor=None,
+        scheduler=scheduler,
+    )
+
+
+outlook_bookings = create_outlook_bookings()
+bookings_store: BookingsStore = (
+    InMemoryBookingsStore()
+    if config.bookings_store_path is None
+    else SQLiteBookingsStore(config.bookings_store_path, rooms_registry_instance)
+)
+bookings_sync: BookingsSync | None = None
+bookings_repo_instance: BookingsRepo | None = None
+room_accounts_health_check: RoomAccountsHealthCheck | None = None
+
+if outlook_bookings is not None:
+    room_accounts_health_check = RoomAccountsHealthCheck(
+        outlook=outlook_bookings,
+        interval=config.exchange_accounts_health_check_interval,
+    )
+
+    # Concurrent queries of the same window reach Exchange only once
+    coalescing_bookings = CoalescingBookings(
+        bookings_repo=outlook_bookings,
+        rooms_registry=rooms_registry_instance,
+    )
+    metrics_logger.add_source("Bookings coalescing", coalescing_bookings.get_metrics)
+
+    if config.bookings_sync_enabled:
+        bookings_sync = BookingsSync(
+            outlook=outlook_bookings,
+            rooms_registry=rooms_registry_instance,
+            store=bookings_store,
+            interval=config.bookings_sync_interval,
+        )
+        bookings_repo_instance = ReplicaBookings(
+            bookings_repo=coalescing_bookings,
+            rooms_registry=rooms_registry_instance,
+            store=bookings_store,
+            sync=bookings_sync,
+        )
+        metrics_logger.add_source("Bookings sync", bookings_sync.get_lag_metrics)
+    else:
+        bookings_repo_instance = CachedBookings(
+            bookings_repo=coalescing_bookings,
+            rooms_registry=rooms_registry_instance,
+            max_staleness=config.bookings_cache_max_staleness,
+        )
 
 
 def bookings_repo() -> BookingsRepo:
-    ...
+    if bookings_repo_instance is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Bookings are not configured",
+        )
+    return bookings_repo_instance
+
+
+def bookings_export_repo() -> BookingsRepo:
+    """
+    Exports read Exchange directly: they usually reach beyond the synced
+    window of the replica, and they shouldn't evict what is cached for
+    interactive requests.
+    """
+
+    if outlook_bookings is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Bookings are not configured",
+        )
+    return outlook_bookings
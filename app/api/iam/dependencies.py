@@ -4,11 +4,15 @@ from typing import Annotated
 from fastapi import Depends
 from fastapi.security import APIKeyHeader
 
-from app.api.dependencies import auth_repo
+from app.api.dependencies import auth_repo, verified_token_cache
 from app.domain.dependencies.iam_repo import AuthRepo
 from app.domain.entities.iam import Integration
 from app.domain.exceptions import InvalidCredentialsError
-from app.domain.use_cases.iam import authorize_integration, authorize_user
+from app.domain.use_cases.iam import (
+    VerifiedTokenCache,
+    authorize_integration,
+    authorize_user,
+)
 
 from .exceptions import InvalidCredentialsHTTPError
 from .schemas import User
@@ -37,9 +41,10 @@ def integration_token(token: Annotated[str, Depends(auth_scheme_integration)]) -
 async def authenticated_user(
     token: Annotated[str, Depends(bearer_token)],
     repo: Annotated[AuthRepo, Depends(auth_repo)],  # TODO
+    cache: Annotated[VerifiedTokenCache, Depends(verified_token_cache)],
 ) -> User:
     try:
-        user = await authorize_user(token, repo)
+        user = await authorize_user(token, repo, cache)
         return User(email_address=user.email)
     except InvalidCredentialsError as exc:
         raise InvalidCredentialsHTTPError(exc.detail)
@@ -3,11 +3,12 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, Request, Response
 from pydantic import BaseModel
 
-from app.api.dependencies import auth_repo
+from app.api.dependencies import auth_repo, verified_token_cache
 from app.domain.dependencies.iam_repo import AuthRepo
 from app.domain.entities.iam import Integration, RefreshTokenInfo
 from app.domain.exceptions import InvalidCredentialsError
 from app.domain.use_cases.iam import (
+    VerifiedTokenCache,
     login_user,
     logout_user_by_refresh_token,
     refresh_tokens_pair,
@@ -50,6 +51,7 @@ async def logout(
     request: Request,
     response: Response,
     repo: Annotated[AuthRepo, Depends(auth_repo)],
+    cache: Annotated[VerifiedTokenCache, Depends(verified_token_cache)],
 ):
     refresh_token = request.cookies.get(REFRESH_TOKEN_COOKIE_KEY)
 
@@ -60,6 +62,7 @@ async def logout(
         await logout_user_by_refresh_token(
             refresh_token=refresh_token,
             repo=repo,
+            cache=cache,
         )
         response.delete_cookie("refresh_token")
     except InvalidCredentialsError as exc:
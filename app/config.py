@@ -1,9 +1,12 @@
-__all__ = ["Environment", "Config", "config"]
+__all__ = ["Environment", "RoomSettings", "Config", "config"]
 
 from datetime import timedelta
 from enum import StrEnum
+from pathlib import Path
 
-from pydantic import AnyHttpUrl, BaseSettings, Field
+from pydantic import AnyHttpUrl, BaseModel, BaseSettings, Field
+
+from app.domain.entities import RoomType
 
 
 class Environment(StrEnum):
@@ -12,6 +15,17 @@ class Environment(StrEnum):
     TESTING = "TEST"
 
 
+class RoomSettings(BaseModel):
+    email: str
+    name_en: str
+    name_ru: str
+    # The part of the email before "@", if it is not specified
+    id: str | None = None
+    type: RoomType = RoomType.MEETING_ROOM
+    # Number of seats, 0 if it is not known
+    capacity: int = 0
+
+
 class Config(BaseSettings):
     app_title: str = "Room Booking Service"
     app_version: str = "0.1.0"
@@ -24,10 +38,56 @@ class Config(BaseSettings):
     secret_key: str = Field(default=...)
     access_token_lifetime: timedelta = timedelta(minutes=15)
     refresh_token_lifetime: timedelta = timedelta(days=30)
+    # Older refresh tokens of a user are revoked beyond this number
+    max_refresh_tokens_per_user: int = 10
+    refresh_tokens_sweep_interval: timedelta = timedelta(minutes=10)
+    # SQLite database of users and sessions, shared by all the workers.
+    # Otherwise, they are kept in memory of each worker.
+    auth_database_path: Path | None = None
+    auth_database_pool_size: int = 4
+    # Users of at most this many verified access tokens are kept in memory
+    verified_tokens_cache_size: int = 10_000
 
-    # Map {"name": "api_key"}
+    # Map {"api_key": "name"}. Keys are matched by their first 8 characters
+    # before their digests are compared, so they should be long and random.
     authorized_integrations: dict[str, str] = Field(default_factory=lambda: {})
 
+    # Exchange service account that bookings are made on behalf of.
+    # Bookings API is not available, if it is not configured.
+    exchange_server: str = "outlook.office365.com"
+    exchange_email: str | None = None
+    exchange_tenant_id: str | None = None
+    exchange_client_id: str | None = None
+    exchange_client_secret: str | None = None
+    # Send EWS requests from the event loop instead of exchangelib threads
+    exchange_async_transport: bool = False
+    # At most this many EWS requests are in flight, fewer while Exchange
+    # is throttling us
+    exchange_max_concurrent_requests: int = 20
+    # ... and at most this many of them to the same mailbox
+    exchange_max_concurrent_mailbox_requests: int = 3
+    # Pooled accounts of the rooms are checked this often, the broken ones
+    # are recreated
+    exchange_accounts_health_check_interval: timedelta = timedelta(minutes=15)
+
+    rooms: list[RoomSettings] = []
+
+    # Keep a local replica of the rooms calendars up to date in background.
+    # Otherwise, bookings are cached for `bookings_cache_max_staleness`.
+    bookings_sync_enabled: bool = True
+    bookings_sync_interval: timedelta = timedelta(seconds=30)
+    # SQLite database that the replica is kept in, so that it survives
+    # restarts. Otherwise, the replica is kept in memory.
+    bookings_store_path: Path | None = None
+    # Where the in-memory replica is saved on shutdown and restored from
+    # on startup
+    bookings_snapshot_path: Path | None = None
+    bookings_cache_max_staleness: timedelta = timedelta(minutes=1)
+
+    # Metrics of the background sync, caches and schedulers are logged this
+    # often
+    metrics_log_interval: timedelta = timedelta(minutes=5)
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,3 +1,4 @@
+import collections.abc
 from abc import ABC, abstractmethod
 
 from app.domain.entities import Booking, BookingId, Room, TimePeriod, User
@@ -9,10 +10,36 @@ class BookingsRepo(ABC):
     async def create_booking(self, booking: Booking) -> BookingId:
         pass
 
+    @abstractmethod
+    async def create_bookings(
+        self,
+        bookings: list[Booking],
+    ) -> list[BookingId | Exception]:
+        """
+        Creates many bookings at once.
+
+        :return: For every booking (in the same order) either its ID or the
+            error that prevented it from being created.
+        """
+        pass
+
     @abstractmethod
     async def delete_booking(self, booking_id: BookingId):
         pass
 
+    @abstractmethod
+    async def delete_bookings(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[Exception | None]:
+        """
+        Deletes many bookings at once.
+
+        :return: For every booking (in the same order) None if it was deleted
+            or the error that prevented it from being deleted.
+        """
+        pass
+
     @abstractmethod
     async def get_bookings_in_period(
         self,
@@ -22,6 +49,46 @@ class BookingsRepo(ABC):
     ) -> list[BookingWithId]:
         pass
 
+    async def iterate_bookings_in_period(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+        filter_user_email: str | None = None,
+    ) -> collections.abc.AsyncIterator[list[BookingWithId]]:
+        """
+        Yields the bookings of `get_bookings_in_period` page by page, in no
+        particular order. Repositories that can read them lazily override
+        it, by default they are yielded as one page.
+        """
+
+        yield await self.get_bookings_in_period(
+            period,
+            filter_rooms,
+            filter_user_email,
+        )
+
+    @abstractmethod
+    async def get_rooms_busy_periods(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+    ) -> dict[str, list[TimePeriod]]:
+        """
+        :return: Map {"room_email": [busy_period, ...]}
+        """
+        pass
+
     @abstractmethod
     async def get_booking_owner(self, booking_id: BookingId) -> User:
         pass
+
+    @abstractmethod
+    async def get_bookings_owners(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[User | Exception]:
+        """
+        :return: For every booking (in the same order) either its owner or
+            the error that prevented it from being found.
+        """
+        pass
@@ -28,8 +28,38 @@ class AuthRepo(ABC):
 
     @abstractmethod
     async def delete_refresh_token(self, token: str) -> None:
+        """
+        :raises NotFoundError: If there is no such token.
+        """
+        pass
+
+    @abstractmethod
+    async def rotate_refresh_token(
+        self,
+        token: str,
+        new_token: str,
+        now: TimeStamp,
+        expires_at: TimeStamp,
+    ) -> RefreshTokenInfo | None:
+        """
+        Atomically deletes the token and, unless it has expired by `now`,
+        creates a new token of the same user.
+
+        :return: The new token or None if the old one is not found or has
+            expired.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_expired_refresh_tokens(self, now: TimeStamp) -> int:
+        """
+        :return: Number of deleted tokens.
+        """
         pass
 
     @abstractmethod
     async def get_integration_by_api_key(self, api_key: str) -> Integration | None:
+        """
+        Also counts the request to the found integration.
+        """
         pass
@@ -1,3 +1,4 @@
+from .availability import *
 from .booking import *
 from .common import *
 from .iam import *
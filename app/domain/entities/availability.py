@@ -0,0 +1,286 @@
+__all__ = ["RoomSchedule", "Availability", "OccupancyGrid"]
+
+import math
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from typing import Iterable
+
+from .booking import BookingId, BookingWithId
+from .common import TimePeriod, TimeStamp
+
+
+class RoomSchedule:
+    """
+    Busy periods of one room, sorted by their start.
+
+    Alongside the periods it keeps the running maximum of their ends, so
+    "is there a period that overlaps [start, end)" is answered with one
+    binary search: among the periods that start before `end` the one that
+    ends last must end after `start`.
+    """
+
+    def __init__(self):
+        self._starts: list[float] = []
+        self._ends: list[float] = []
+        self._ids: list[BookingId] = []
+        # _max_ends[i] == max(_ends[:i + 1])
+        self._max_ends: list[float] = []
+        self._periods_by_id: dict[BookingId, tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, booking_id: BookingId) -> bool:
+        return booking_id in self._periods_by_id
+
+    def insert(self, booking_id: BookingId, period: TimePeriod):
+        if booking_id in self._periods_by_id:
+            self.delete(booking_id)
+
+        start = period.start.timestamp()
+        end = period.end.timestamp()
+
+        index = bisect_right(self._starts, start)
+
+        self._starts.insert(index, start)
+        self._ends.insert(index, end)
+        self._ids.insert(index, booking_id)
+        self._max_ends.insert(index, end)
+        self._periods_by_id[booking_id] = (start, end)
+
+        if index > 0 and self._max_ends[index - 1] > end:
+            self._max_ends[index] = self._max_ends[index - 1]
+
+        # Running maximum is non-decreasing, so we can stop as soon as
+        # it is not affected by the inserted end anymore.
+        for i in range(index + 1, len(self._max_ends)):
+            if self._max_ends[i] >= end:
+                break
+            self._max_ends[i] = end
+
+    def delete(self, booking_id: BookingId):
+        period = self._periods_by_id.pop(booking_id, None)
+        if period is None:
+            return
+
+        start, _ = period
+
+        index = bisect_left(self._starts, start)
+        while self._ids[index] != booking_id:
+            index += 1
+
+        del self._starts[index]
+        del self._ends[index]
+        del self._ids[index]
+        del self._max_ends[index]
+
+        max_end = self._max_ends[index - 1] if index > 0 else float("-inf")
+        for i in range(index, len(self._max_ends)):
+            max_end = max(max_end, self._ends[i])
+            if self._max_ends[i] == max_end:
+                break
+            self._max_ends[i] = max_end
+
+    def is_busy(self, period: TimePeriod) -> bool:
+        index = bisect_left(self._starts, period.end.timestamp())
+        return index > 0 and self._max_ends[index - 1] > period.start.timestamp()
+
+    def get_overlapping(self, period: TimePeriod) -> list[BookingId]:
+        start = period.start.timestamp()
+        end = period.end.timestamp()
+
+        overlapping: list[BookingId] = []
+
+        i = bisect_left(self._starts, end) - 1
+        while i >= 0 and self._max_ends[i] > start:
+            if self._ends[i] > start:
+                overlapping.append(self._ids[i])
+            i -= 1
+
+        overlapping.reverse()
+        return overlapping
+
+    def get_next_free_slot(
+        self,
+        after: TimeStamp,
+        duration: timedelta,
+    ) -> TimeStamp:
+        """
+        :return: The earliest moment (not before `after`) from which the room
+            is free for at least `duration`.
+        """
+
+        start = after.timestamp()
+        length = duration.total_seconds()
+
+        while True:
+            index = bisect_left(self._starts, start + length)
+            # Every slot that starts before the end of the latest period
+            # among the ones that start before the slot end overlaps it.
+            if index == 0 or self._max_ends[index - 1] <= start:
+                return TimeStamp(start)
+            start = self._max_ends[index - 1]
+
+
+class Availability:
+    """
+    Busy periods of many rooms, keyed by room email.
+    """
+
+    def __init__(self):
+        self._schedules: dict[str, RoomSchedule] = {}
+        self._rooms_emails_by_booking_id: dict[BookingId, str] = {}
+
+    @staticmethod
+    def from_bookings(bookings: list[BookingWithId]) -> "Availability":
+        availability = Availability()
+        for booking in bookings:
+            availability.insert(booking)
+        return availability
+
+    def insert(self, booking: BookingWithId):
+        self.delete(booking.id)
+
+        schedule = self._schedules.get(booking.room.email)
+        if schedule is None:
+            schedule = self._schedules[booking.room.email] = RoomSchedule()
+
+        schedule.insert(booking.id, booking.period)
+        self._rooms_emails_by_booking_id[booking.id] = booking.room.email
+
+    def delete(self, booking_id: BookingId):
+        room_email = self._rooms_emails_by_booking_id.pop(booking_id, None)
+        if room_email is not None:
+            self._schedules[room_email].delete(booking_id)
+
+    def get_rooms_emails(self) -> list[str]:
+        return list(self._schedules)
+
+    def get_schedule(self, room_email: str) -> RoomSchedule | None:
+        return self._schedules.get(room_email)
+
+    def is_room_busy(self, room_email: str, period: TimePeriod) -> bool:
+        schedule = self._schedules.get(room_email)
+        return schedule is not None and schedule.is_busy(period)
+
+    def get_free_rooms(
+        self,
+        period: TimePeriod,
+        rooms_emails: list[str],
+    ) -> list[str]:
+        free_rooms_emails: list[str] = []
+
+        for room_email in rooms_emails:
+            schedule = self._schedules.get(room_email)
+            if schedule is None or not schedule.is_busy(period):
+                free_rooms_emails.append(room_email)
+
+        return free_rooms_emails
+
+    def get_next_free_slot(
+        self,
+        room_email: str,
+        after: TimeStamp,
+        duration: timedelta,
+    ) -> TimeStamp:
+        schedule = self._schedules.get(room_email)
+        if schedule is None:
+            return after
+        return schedule.get_next_free_slot(after, duration)
+
+
+class OccupancyGrid:
+    """
+    Occupancy of many rooms in equal consecutive time slots.
+
+    Every room is a row of bytes, one byte per slot (1 if the room is busy
+    during the slot). A busy period marks all its slots with one slice
+    assignment, so filling the grid costs a constant number of operations
+    per booking no matter how many slots it covers.
+    """
+
+    def __init__(
+        self,
+        period: TimePeriod,
+        slot_duration: timedelta,
+        rooms_emails: list[str],
+    ):
+        self._start = period.start.timestamp()
+        self._slot_duration = slot_duration.total_seconds()
+        self._slots_count = math.ceil(
+            (period.end.timestamp() - self._start) / self._slot_duration
+        )
+        self._rows = {
+            room_email: bytearray(self._slots_count) for room_email in rooms_emails
+        }
+        self._busy = memoryview(b"\x01" * self._slots_count)
+
+    @staticmethod
+    def from_bookings(
+        period: TimePeriod,
+        slot_duration: timedelta,
+        rooms_emails: list[str],
+        bookings: list[BookingWithId],
+    ) -> "OccupancyGrid":
+        grid = OccupancyGrid(period, slot_duration, rooms_emails)
+        grid.add_many((booking.room.email, booking.period) for booking in bookings)
+        return grid
+
+    @property
+    def slots_count(self) -> int:
+        return self._slots_count
+
+    def add(self, room_email: str, period: TimePeriod):
+        self.add_many([(room_email, period)])
+
+    def add_many(self, periods: Iterable[tuple[str, TimePeriod]]):
+        """
+        :param periods: Pairs of room email and its busy period.
+        """
+
+        # It is the hot loop of the whole grid, so everything it touches
+        # is bound to locals.
+        rows = self._rows
+        busy = self._busy
+        start = self._start
+        slot_duration = self._slot_duration
+        slots_count = self._slots_count
+        floor = math.floor
+        ceil = math.ceil
+
+        for room_email, period in periods:
+            row = rows.get(room_email)
+            if row is None:
+                continue
+
+            first = floor((period.start.timestamp() - start) / slot_duration)
+            last = ceil((period.end.timestamp() - start) / slot_duration)
+
+            if first < 0:
+                first = 0
+            if last > slots_count:
+                last = slots_count
+
+            if first < last:
+                row[first:last] = busy[: last - first]
+
+    def get_slots(self) -> list[TimePeriod]:
+        return [
+            TimePeriod(
+                TimeStamp(self._start + i * self._slot_duration),
+                TimeStamp(self._start + (i + 1) * self._slot_duration),
+            )
+            for i in range(self._slots_count)
+        ]
+
+    def get_row(self, room_email: str) -> bytes:
+        """
+        :return: One byte per slot, 1 if the room is busy during the slot.
+        """
+        return bytes(self._rows[room_email])
+
+    def is_busy(self, room_email: str, slot: int) -> bool:
+        return self._rows[room_email][slot] == 1
+
+    def get_free_rooms(self, slot: int) -> list[str]:
+        return [email for email, row in self._rows.items() if row[slot] == 0]
@@ -1,7 +1,8 @@
-__all__ = ["Room", "Booking", "BookingWithId", "BookingId"]
+__all__ = ["Room", "RoomType", "Booking", "BookingWithId", "BookingId"]
 
 
 from datetime import UTC, datetime
+from enum import StrEnum
 from typing import TypedDict, Unpack, assert_never
 
 from .common import Language, TimePeriod
@@ -10,7 +11,14 @@ from .iam import User
 BookingId = str
 
 
+class RoomType(StrEnum):
+    MEETING_ROOM = "MEETING_ROOM"
+    AUDITORIUM = "AUDITORIUM"
+
+
 class Room:
+    __slots__ = ("_email", "_name_en", "_name_ru")
+
     def __init__(
         self,
         email: str,
@@ -21,6 +29,18 @@ class Room:
         self._name_en = name_en
         self._name_ru = name_ru
 
+    def __eq__(self, other):
+        if other.__class__ is not Room:
+            return NotImplemented
+        return (
+            self._email == other._email
+            and self._name_en == other._name_en
+            and self._name_ru == other._name_ru
+        )
+
+    def __hash__(self):
+        return hash(self._email)
+
     @property
     def email(self):
         return self._email
@@ -43,6 +63,8 @@ class BookingDict(TypedDict):
 
 
 class Booking:
+    __slots__ = ("_title", "_period", "_room", "_owner")
+
     def __init__(
         self,
         **kwargs: Unpack[BookingDict],
@@ -52,6 +74,17 @@ class Booking:
         self._room = kwargs["room"]
         self._owner = kwargs["owner"]
 
+    def __eq__(self, other):
+        if other.__class__ is not Booking:
+            return NotImplemented
+        return self._get_key() == other._get_key()
+
+    def __hash__(self):
+        return hash(self._get_key())
+
+    def _get_key(self) -> tuple:
+        return (self._title, self._period, self._room, self._owner)
+
     @property
     def title(self):
         return self._title
@@ -74,6 +107,8 @@ class BookingWithIdDict(BookingDict):
 
 
 class BookingWithId(Booking):
+    __slots__ = ("_id",)
+
     def __init__(
         self,
         **kwargs: Unpack[BookingWithIdDict],
@@ -81,6 +116,17 @@ class BookingWithId(Booking):
         super().__init__(**kwargs)
         self._id = kwargs["id"]
 
+    def __eq__(self, other):
+        if other.__class__ is not BookingWithId:
+            return NotImplemented
+        return self._get_key() == other._get_key()
+
+    def __hash__(self):
+        return hash(self._get_key())
+
+    def _get_key(self) -> tuple:
+        return (self._id, *super()._get_key())
+
     @property
     def id(self):
         return self._id
@@ -9,57 +9,59 @@ class Language(StrEnum):
 
 # Moment in time
 class TimeStamp:
+    __slots__ = ("_timestamp",)
+
     def __init__(self, timestamp: float):
         """
         :param timestamp: POSIX timestamp (number of seconds from epoch).
         """
         self._timestamp = timestamp
 
+    # Operators return NotImplemented for foreign operands, so Python raises
+    # the usual TypeError itself and the fast path stays a plain comparison.
+
     def __add__(self, other):
         if not isinstance(other, timedelta):
-            raise TypeError(
-                "unsupported operand type(s) for +: 'TimeStamp' and '{}'".format(
-                    type(other)
-                )
-            )
+            return NotImplemented
         return TimeStamp(self._timestamp + other.total_seconds())
 
     def __le__(self, other):
-        if not isinstance(other, TimeStamp):
-            raise TypeError(
-                "unsupported operand type(s) for <=: 'TimeStamp' and '{}'".format(
-                    type(other)
-                )
-            )
+        if other.__class__ is not TimeStamp:
+            return NotImplemented
         return self._timestamp <= other._timestamp
 
     def __ge__(self, other):
-        if not isinstance(other, TimeStamp):
-            raise TypeError(
-                "unsupported operand type(s) for >=: 'TimeStamp' and '{}'".format(
-                    type(other)
-                )
-            )
+        if other.__class__ is not TimeStamp:
+            return NotImplemented
         return self._timestamp >= other._timestamp
 
     def __lt__(self, other):
-        if not isinstance(other, TimeStamp):
-            raise TypeError(
-                "unsupported operand type(s) for <: 'TimeStamp' and '{}'".format(
-                    type(other)
-                )
-            )
+        if other.__class__ is not TimeStamp:
+            return NotImplemented
         return self._timestamp < other._timestamp
 
     def __gt__(self, other):
-        if not isinstance(other, TimeStamp):
-            raise TypeError(
-                "unsupported operand type(s) for >: 'TimeStamp' and '{}'".format(
-                    type(other)
-                )
-            )
+        if other.__class__ is not TimeStamp:
+            return NotImplemented
         return self._timestamp > other._timestamp
 
+    def __eq__(self, other):
+        if other.__class__ is not TimeStamp:
+            return NotImplemented
+        return self._timestamp == other._timestamp
+
+    def __hash__(self):
+        return hash(self._timestamp)
+
+    def __repr__(self):
+        return f"TimeStamp({self._timestamp!r})"
+
+    def timestamp(self) -> float:
+        """
+        :return: POSIX timestamp (number of seconds from epoch).
+        """
+        return self._timestamp
+
     def datetime_utc(self) -> datetime:
         return datetime.fromtimestamp(self._timestamp, tz=timezone.utc)
 
@@ -70,12 +72,25 @@ class TimeStamp:
 
 # Period in time
 class TimePeriod:
+    __slots__ = ("_start", "_end")
+
     def __init__(self, start: TimeStamp, end: TimeStamp):
         if end < start:
             raise Exception("end must not be before start")
         self._start = start
         self._end = end
 
+    def __eq__(self, other):
+        if other.__class__ is not TimePeriod:
+            return NotImplemented
+        return self._start == other._start and self._end == other._end
+
+    def __hash__(self):
+        return hash((self._start, self._end))
+
+    def __repr__(self):
+        return f"TimePeriod({self._start!r}, {self._end!r})"
+
     @property
     def start(self) -> TimeStamp:
         return self._start
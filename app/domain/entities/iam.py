@@ -9,10 +9,20 @@ from app.domain.entities.common import TimeStamp
 
 
 class User:
+    __slots__ = ("_id", "_email")
+
     def __init__(self, id: int, email: str):
         self._id = id
         self._email = email
 
+    def __eq__(self, other):
+        if other.__class__ is not User:
+            return NotImplemented
+        return self._id == other._id and self._email == other._email
+
+    def __hash__(self):
+        return hash((self._id, self._email))
+
     @property
     def id(self) -> int:
         return self._id
@@ -23,6 +33,8 @@ class User:
 
 
 class Integration:
+    __slots__ = ("_name",)
+
     def __init__(self, name: str) -> None:
         self._name = name
 
@@ -32,6 +44,8 @@ class Integration:
 
 
 class RefreshTokenInfo:
+    __slots__ = ("_token", "_user_id", "_expires_at")
+
     def __init__(self, token: str, user_id: int, expires_at: TimeStamp) -> None:
         self._token = token
         self._user_id = user_id
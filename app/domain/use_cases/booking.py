@@ -1,5 +1,59 @@
+import collections.abc
+from datetime import timedelta
+from typing import NotRequired, TypedDict, Unpack
+
 from app.domain.dependencies.bookings_repo import BookingsRepo
-from app.domain.entities import BookingId, Room, User
+from app.domain.entities import (
+    BookingId,
+    BookingWithId,
+    OccupancyGrid,
+    Room,
+    TimePeriod,
+    TimeStamp,
+    User,
+)
+
+# Bookings queries fetch their period in chunks of this duration, so that
+# a page doesn't need the bookings of the whole period
+QUERY_CHUNK_DURATION = timedelta(days=7)
+
+# Start (POSIX timestamp) and ID of the last booking of a page
+BookingsCursor = tuple[float, BookingId]
+
+
+class BookingsQueryDict(TypedDict):
+    period: TimePeriod
+    rooms: NotRequired[list[Room] | None]
+    owners_emails: NotRequired[list[str] | None]
+
+
+class BookingsQuery:
+    """
+    Bookings that start and end within the period, of any of the rooms and
+    any of the owners (every room and owner, if they are not specified).
+    """
+
+    __slots__ = ("_period", "_rooms", "_owners_emails")
+
+    def __init__(self, **kwargs: Unpack[BookingsQueryDict]):
+        self._period = kwargs["period"]
+        self._rooms = kwargs.get("rooms")
+        owners_emails = kwargs.get("owners_emails")
+        self._owners_emails = (
+            None if owners_emails is None else sorted(set(owners_emails))
+        )
+
+    @property
+    def period(self) -> TimePeriod:
+        return self._period
+
+    @property
+    def rooms(self) -> list[Room] | None:
+        return self._rooms
+
+    @property
+    def owners_emails(self) -> list[str] | None:
+        return self._owners_emails
 
 
 async def book_room_for_user(
@@ -23,3 +77,175 @@ async def delete_booking_by_user(
     #   Yes -> raise exception "invalid"
     #   No  -> OK, delete booking
     ...
+
+
+async def get_user_bookings(
+    repo: BookingsRepo,
+    user: User,
+    period: TimePeriod,
+) -> list[BookingWithId]:
+    """
+    :return: Bookings of the user that overlap the period, from the earliest.
+    """
+
+    bookings = await repo.get_bookings_in_period(period, filter_user_email=user.email)
+    bookings.sort(key=lambda booking: booking.period.start.timestamp())
+    return bookings
+
+
+async def get_free_rooms(
+    repo: BookingsRepo,
+    period: TimePeriod,
+    rooms: list[Room],
+) -> list[Room]:
+    busy_periods = await repo.get_rooms_busy_periods(period, filter_rooms=rooms)
+
+    def is_free(room: Room) -> bool:
+        for busy_period in busy_periods.get(room.email, []):
+            if busy_period.start < period.end and busy_period.end > period.start:
+                return False
+        return True
+
+    return list(filter(is_free, rooms))
+
+
+async def get_rooms_occupancy(
+    repo: BookingsRepo,
+    period: TimePeriod,
+    slot_duration: timedelta,
+    rooms: list[Room],
+) -> OccupancyGrid:
+    bookings = await repo.get_bookings_in_period(period, filter_rooms=rooms)
+
+    return OccupancyGrid.from_bookings(
+        period,
+        slot_duration,
+        [room.email for room in rooms],
+        bookings,
+    )
+
+
+async def query_bookings(
+    repo: BookingsRepo,
+    query: BookingsQuery,
+    limit: int,
+    after: BookingsCursor | None = None,
+) -> tuple[list[BookingWithId], BookingsCursor | None]:
+    """
+    Returns a page of the bookings of the query, ordered by start and ID.
+
+    Only the listed rooms are asked for, and every owner is asked for
+    separately, so that the repository can use its owner index. The
+    period is narrowed down to what is left after the cursor and fetched
+    chunk by chunk until the page is full, the remaining predicates are
+    checked on every chunk as it comes.
+
+    :param after: Cursor of the previous page.
+    :return: The page and the cursor of the next one, None if there are
+        no more bookings. The next page may be empty.
+    """
+
+    page: list[BookingWithId] = []
+
+    async for booking in iterate_bookings(repo, query, after):
+        page.append(booking)
+        if len(page) == limit:
+            last = page[-1]
+            return page, (last.period.start.timestamp(), last.id)
+
+    return page, None
+
+
+async def iterate_bookings(
+    repo: BookingsRepo,
+    query: BookingsQuery,
+    after: BookingsCursor | None = None,
+) -> collections.abc.AsyncIterator[BookingWithId]:
+    """
+    :return: Bookings of the query after the cursor, ordered by start and
+        ID, fetched lazily.
+    """
+
+    if query.rooms is not None and not query.rooms:
+        return
+
+    # The repository may return bookings of other rooms, e.g. the ones from
+    # the calendar of the service account
+    rooms_emails = None if query.rooms is None else {room.email for room in query.rooms}
+
+    start = query.period.start
+    if after is not None and after[0] > start.timestamp():
+        start = TimeStamp(after[0])
+    end = query.period.end
+
+    while start < end:
+        chunk = TimePeriod(start=start, end=min(start + QUERY_CHUNK_DURATION, end))
+
+        if query.owners_emails is None:
+            bookings = await repo.get_bookings_in_period(chunk, query.rooms)
+        else:
+            bookings = []
+            for owner_email in query.owners_emails:
+                bookings.extend(
+                    await repo.get_bookings_in_period(chunk, query.rooms, owner_email)
+                )
+
+        # Bookings that overlap the chunk, but start before it, belong to
+        # one of the previous chunks
+        bookings = [
+            booking
+            for booking in bookings
+            if chunk.start <= booking.period.start < chunk.end
+            and booking.period.end <= end
+            and (rooms_emails is None or booking.room.email in rooms_emails)
+        ]
+        bookings.sort(
+            key=lambda booking: (booking.period.start.timestamp(), booking.id)
+        )
+
+        for booking in bookings:
+            if after is None or (booking.period.start.timestamp(), booking.id) > after:
+                yield booking
+
+        start = chunk.end
+
+
+async def stream_bookings(
+    repo: BookingsRepo,
+    query: BookingsQuery,
+) -> collections.abc.AsyncIterator[list[BookingWithId]]:
+    """
+    Yields the bookings of the query page by page, as the repository reads
+    them and in no particular order. Unlike `query_bookings`, only the
+    current page is held, so the whole period may be exported at once.
+    """
+
+    if query.rooms is not None and not query.rooms:
+        return
+
+    owners_emails = query.owners_emails
+    if owners_emails is not None and not owners_emails:
+        return
+
+    # The repository may return bookings of other rooms, as in
+    # `iterate_bookings`
+    rooms_emails = None if query.rooms is None else {room.email for room in query.rooms}
+
+    async for bookings in repo.iterate_bookings_in_period(
+        query.period,
+        query.rooms,
+        # The repository filters by one owner at most
+        owners_emails[0]
+        if owners_emails is not None and len(owners_emails) == 1
+        else None,
+    ):
+        page = [
+            booking
+            for booking in bookings
+            if query.period.start <= booking.period.start
+            and booking.period.end <= query.period.end
+            and (rooms_emails is None or booking.room.email in rooms_emails)
+            and (owners_emails is None or booking.owner.email in owners_emails)
+        ]
+        if page:
+            yield page
@@ -1,4 +1,8 @@
+import collections
+import hashlib
 import secrets
+import threading
+from typing import TypedDict
 
 import jwt
 
@@ -10,6 +14,103 @@ from app.domain.exceptions import InvalidCredentialsError, NotFoundError
 
 JWT_ALGORITHM = "HS256"
 
+DEFAULT_VERIFIED_TOKENS_CACHE_SIZE = 10_000
+
+
+class VerifiedTokenCacheMetrics(TypedDict):
+    hits: int
+    misses: int
+    hit_ratio: float
+    size: int
+
+
+class VerifiedTokenCache:
+    """
+    Users of the access tokens that have already been verified, kept until
+    the tokens expire. A page load makes several requests with the same
+    token, and only the first of them has to decode it and look the user
+    up in the repository.
+
+    Tokens are keyed by their SHA-256 digest, so they are not kept in
+    memory. At most `max_size` tokens are kept, the least recently used
+    ones are evicted first. Entries of a user are dropped when they log
+    out, so that the cache doesn't keep their sessions alive.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_VERIFIED_TOKENS_CACHE_SIZE):
+        self._max_size = max_size
+        # Digest of a token -> (expires at, user), least recently used first
+        self._entries: collections.OrderedDict[
+            bytes, tuple[float, User]
+        ] = collections.OrderedDict()
+        # User ID -> digests of the user's tokens, so that logouts don't scan
+        # the whole cache
+        self._keys_by_user_id: dict[int, set[bytes]] = {}
+        # Coroutines can't interleave within the methods, but the cache may
+        # also be used from executor threads.
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, access_token: str, now: TimeStamp) -> User | None:
+        key = self._get_key(access_token)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] <= now.timestamp():
+                if entry is not None:
+                    self._delete_entry(key)
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, access_token: str, user: User, expires_at: TimeStamp):
+        key = self._get_key(access_token)
+
+        with self._lock:
+            if key in self._entries:
+                self._delete_entry(key)
+
+            self._entries[key] = (expires_at.timestamp(), user)
+            self._keys_by_user_id.setdefault(user.id, set()).add(key)
+
+            while len(self._entries) > self._max_size:
+                self._delete_entry(next(iter(self._entries)))
+
+    def discard_user(self, user_id: int):
+        with self._lock:
+            for key in self._keys_by_user_id.pop(user_id, ()):
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user_id.clear()
+
+    def get_metrics(self) -> VerifiedTokenCacheMetrics:
+        requests = self._hits + self._misses
+        return VerifiedTokenCacheMetrics(
+            hits=self._hits,
+            misses=self._misses,
+            hit_ratio=self._hits / requests if requests else 0.0,
+            size=len(self._entries),
+        )
+
+    def _delete_entry(self, key: bytes):
+        _, user = self._entries.pop(key)
+
+        user_keys = self._keys_by_user_id[user.id]
+        user_keys.discard(key)
+        if not user_keys:
+            del self._keys_by_user_id[user.id]
+
+    def _get_key(self, access_token: str) -> bytes:
+        return hashlib.sha256(access_token.encode()).digest()
+
 
 async def authorize_integration(
     integration_api_key: str,
@@ -42,7 +143,21 @@ async def login_user(user_id: int, repo: AuthRepo) -> tuple[str, RefreshTokenInf
     return access_token, refresh_token_info
 
 
-async def authorize_user(access_token: str, repo: AuthRepo) -> User:
+async def authorize_user(
+    access_token: str,
+    repo: AuthRepo,
+    cache: VerifiedTokenCache | None = None,
+) -> User:
+    """
+    :param cache: Users of the tokens verified before, the user is stored
+        in it until the token expires.
+    """
+
+    if cache is not None:
+        user = cache.get(access_token, TimeStamp.now())
+        if user is not None:
+            return user
+
     try:
         payload = jwt.decode(
             access_token,
@@ -62,49 +177,60 @@ async def authorize_user(access_token: str, repo: AuthRepo) -> User:
     if user is None:
         raise InvalidCredentialsError
 
+    if cache is not None and isinstance(expires_at := payload.get("exp"), int):
+        cache.put(access_token, user, TimeStamp(expires_at))
+
     return user
 
 
-async def logout_user_by_refresh_token(refresh_token: str, repo: AuthRepo) -> None:
+async def logout_user_by_refresh_token(
+    refresh_token: str,
+    repo: AuthRepo,
+    cache: VerifiedTokenCache | None = None,
+) -> None:
+    """
+    :param cache: Users of verified tokens, the entries of the user are
+        dropped from it.
+    """
+
+    refresh_token_info = await repo.get_refresh_token_info(refresh_token)
+
     try:
         await repo.delete_refresh_token(refresh_token)
     except NotFoundError:
         raise InvalidCredentialsError
 
+    if cache is not None and refresh_token_info is not None:
+        cache.discard_user(refresh_token_info.user_id)
+
 
 async def refresh_tokens_pair(
     refresh_token: str,
     repo: AuthRepo,
 ) -> tuple[str, RefreshTokenInfo]:
     """
-    Removes the old RT and creates a new pair of AT and RT.
-
-    TODO: Wrap repository operations into one transaction.
+    Removes the old RT and creates a new pair of AT and RT. The RT is
+    rotated in one repository operation, so it can't be used twice by
+    concurrent requests.
 
     :raises InvalidCredentialsException: If RT is invalid or has been expired.
     """
 
-    refresh_token_info = await repo.get_refresh_token_info(refresh_token)
-    if refresh_token_info is None:
-        raise InvalidCredentialsError
-
-    await repo.delete_refresh_token(refresh_token)
-
     now = TimeStamp.now()
 
-    if now >= refresh_token_info.expires_at:
+    new_refresh_token_info = await repo.rotate_refresh_token(
+        token=refresh_token,
+        new_token=create_refresh_token(),
+        now=now,
+        expires_at=now + config.refresh_token_lifetime,
+    )
+    if new_refresh_token_info is None:
         raise InvalidCredentialsError
 
-    new_refresh_token = create_refresh_token()
     new_access_token = create_jwt_token(
-        sub=refresh_token_info.user_id,
+        sub=new_refresh_token_info.user_id,
         exp=now + config.access_token_lifetime,
     )
-    new_refresh_token_info = await repo.create_refresh_token(
-        token=new_refresh_token,
-        user_id=refresh_token_info.user_id,
-        expires_at=now + config.refresh_token_lifetime,
-    )
 
     return new_access_token, new_refresh_token_info
 
@@ -112,7 +238,8 @@ async def refresh_tokens_pair(
 def create_jwt_token(sub: int, exp: TimeStamp) -> str:
     return jwt.encode(
         {
-            "sub": sub,
+            # Registered claims are strings, newer PyJWT rejects other types
+            "sub": str(sub),
             "exp": exp.datetime_utc(),
         },
         config.secret_key,
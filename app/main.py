@@ -1,7 +1,21 @@
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
+from app.adapters.auth_sqlite import SQLiteAuthRepo
+from app.adapters.bookings_store import InMemoryBookingsStore
+from app.adapters.bookings_store_sqlite import SQLiteBookingsStore
+from app.adapters.outlook_async import AsyncOutlookBookings
 from app.api.app import init_app
+from app.api.dependencies import (
+    auth_repo_instance,
+    bookings_store,
+    bookings_sync,
+    metrics_logger,
+    outlook_bookings,
+    refresh_tokens_sweeper,
+    room_accounts_health_check,
+    rooms_registry_instance,
+)
 from app.config import Environment, config
 
 DEBUG = config.environment == Environment.DEVELOPMENT
@@ -31,9 +45,49 @@ init_app(app)
 @app.on_event("startup")
 async def startup():
     # Wire-up all dependencies here
-    ...
+    refresh_tokens_sweeper.start()
+    metrics_logger.start()
+
+    if outlook_bookings is not None:
+        await outlook_bookings.warm_up()
+
+    if room_accounts_health_check is not None:
+        room_accounts_health_check.start()
+
+    if bookings_sync is not None:
+        snapshot_path = config.bookings_snapshot_path
+        if (
+            isinstance(bookings_store, InMemoryBookingsStore)
+            and snapshot_path is not None
+            and snapshot_path.exists()
+        ):
+            bookings_store.load(snapshot_path, rooms_registry_instance)
+
+        bookings_sync.start()
 
 
 @app.on_event("shutdown")
 async def shutdown():
-    ...
+    await refresh_tokens_sweeper.stop()
+    await metrics_logger.stop()
+
+    if room_accounts_health_check is not None:
+        await room_accounts_health_check.stop()
+
+    if isinstance(auth_repo_instance, SQLiteAuthRepo):
+        auth_repo_instance.close()
+
+    if bookings_sync is not None:
+        await bookings_sync.stop()
+
+        if (
+            isinstance(bookings_store, InMemoryBookingsStore)
+            and config.bookings_snapshot_path is not None
+        ):
+            bookings_store.dump(config.bookings_snapshot_path)
+
+    if isinstance(bookings_store, SQLiteBookingsStore):
+        bookings_store.close()
+
+    if isinstance(outlook_bookings, AsyncOutlookBookings):
+        await outlook_bookings.close()
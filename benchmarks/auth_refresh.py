@@ -0,0 +1,62 @@
+"""
+Measures throughput of the `/auth/refresh` use case (`refresh_tokens_pair`)
+with many clients refreshing their sessions concurrently, against the
+in-memory and the SQLite auth repositories.
+
+Usage: SECRET_KEY=... python -m benchmarks.auth_refresh [clients] [refreshes]
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.adapters.auth_in_memory import InMemoryAuthRepo
+from app.adapters.auth_sqlite import SQLiteAuthRepo
+from app.domain.dependencies.iam_repo import AuthRepo
+from app.domain.use_cases.iam import login_user, refresh_tokens_pair
+
+
+async def refresh_session(repo: AuthRepo, email: str, refreshes: int):
+    user = await repo.upsert_user(email)
+    _, refresh_token_info = await login_user(user.id, repo)
+
+    for _ in range(refreshes):
+        _, refresh_token_info = await refresh_tokens_pair(
+            refresh_token_info.token,
+            repo,
+        )
+
+
+async def measure(repo: AuthRepo, clients: int, refreshes: int) -> float:
+    started_at = time.perf_counter()
+    await asyncio.gather(
+        *(
+            refresh_session(repo, f"student{i}@example.com", refreshes)
+            for i in range(clients)
+        )
+    )
+    elapsed = time.perf_counter() - started_at
+
+    return clients * refreshes / elapsed
+
+
+def main(clients: int, refreshes: int):
+    in_memory_rate = asyncio.run(measure(InMemoryAuthRepo(), clients, refreshes))
+
+    with tempfile.TemporaryDirectory() as directory:
+        repo = SQLiteAuthRepo(path=Path(directory) / "auth.sqlite3")
+        sqlite_rate = asyncio.run(measure(repo, clients, refreshes))
+        repo.close()
+
+    print(f"Clients: {clients}, refreshes per client: {refreshes}")
+    print(f"In-memory: {in_memory_rate:10.0f} refreshes/s")
+    print(f"SQLite:    {sqlite_rate:10.0f} refreshes/s")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    )
@@ -0,0 +1,113 @@
+"""
+Measures login throughput (`upsert_user` of existing and new users) of the
+in-memory auth repository with an email index against the linear scan over
+all users that it did before. Also creates users from many threads at once
+and checks that no ID is given out twice.
+
+Usage: SECRET_KEY=... python -m benchmarks.auth_repo [users_count]
+"""
+
+import asyncio
+import concurrent.futures
+import random
+import sys
+import time
+
+from app.adapters.auth_in_memory import InMemoryAuthRepo
+from app.domain.entities import User
+
+LINEAR_LOGINS = 1_000
+THREADS = 8
+
+
+class LinearUsers:
+    def __init__(self):
+        self._id_counter = 1
+        self._users_by_id: dict[int, User] = {}
+
+    async def upsert_user(self, email: str) -> User:
+        for user in self._users_by_id.values():
+            if user.email == email:
+                return user
+
+        user = User(id=self._id_counter, email=email)
+        self._users_by_id[self._id_counter] = user
+        self._id_counter += 1
+        return user
+
+
+async def fill(repo: InMemoryAuthRepo, count: int):
+    for i in range(count):
+        await repo.upsert_user(f"student{i}@example.com")
+
+
+def fill_linear(repo: LinearUsers, count: int):
+    # Filling it through `upsert_user` would take quadratic time
+    for i in range(count):
+        repo._users_by_id[i + 1] = User(id=i + 1, email=f"student{i}@example.com")
+    repo._id_counter = count + 1
+
+
+async def measure_logins(
+    repo: InMemoryAuthRepo | LinearUsers,
+    users_count: int,
+    logins: int,
+) -> float:
+    rng = random.Random(42)
+    emails = [f"student{rng.randrange(users_count)}@example.com" for _ in range(logins)]
+
+    started_at = time.perf_counter()
+    for email in emails:
+        await repo.upsert_user(email)
+    elapsed = time.perf_counter() - started_at
+
+    return logins / elapsed
+
+
+def create_users_concurrently(count: int) -> bool:
+    """
+    :return: Whether every user got its own ID.
+    """
+
+    repo = InMemoryAuthRepo()
+
+    def create(thread: int) -> list[int]:
+        return [
+            asyncio.run(repo.upsert_user(f"thread{thread}-{i}@example.com")).id
+            for i in range(count // THREADS)
+        ]
+
+    with concurrent.futures.ThreadPoolExecutor(THREADS) as executor:
+        ids = [
+            user_id for ids in executor.map(create, range(THREADS)) for user_id in ids
+        ]
+
+    return len(set(ids)) == len(ids)
+
+
+async def run(users_count: int):
+    linear = LinearUsers()
+    fill_linear(linear, users_count)
+    linear_rate = await measure_logins(linear, users_count, LINEAR_LOGINS)
+
+    indexed = InMemoryAuthRepo()
+    started_at = time.perf_counter()
+    await fill(indexed, users_count)
+    fill_time = time.perf_counter() - started_at
+    indexed_rate = await measure_logins(indexed, users_count, users_count)
+
+    print(f"Users: {users_count}")
+    print(f"Linear scan:  {linear_rate:12.0f} logins/s")
+    print(
+        f"Email index:  {indexed_rate:12.0f} logins/s"
+        f" (created all users in {fill_time * 1000:.0f} ms)"
+    )
+
+
+def main(users_count: int):
+    asyncio.run(run(users_count))
+    print(f"Unique IDs from {THREADS} threads: {create_users_concurrently(20_000)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
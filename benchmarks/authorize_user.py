@@ -0,0 +1,75 @@
+"""
+Measures the overhead that authentication (`authorize_user`) adds to every
+request, with and without the cache of verified access tokens. Clients
+send several requests with the same token, like a page load does.
+
+Usage: SECRET_KEY=... python -m benchmarks.authorize_user [clients] [requests]
+"""
+
+import asyncio
+import random
+import sys
+import time
+
+from app.adapters.auth_in_memory import InMemoryAuthRepo
+from app.domain.use_cases.iam import VerifiedTokenCache, authorize_user, login_user
+
+
+async def create_tokens(repo: InMemoryAuthRepo, clients: int) -> list[str]:
+    tokens: list[str] = []
+
+    for i in range(clients):
+        user = await repo.upsert_user(f"student{i}@example.com")
+        access_token, _ = await login_user(user.id, repo)
+        tokens.append(access_token)
+
+    return tokens
+
+
+async def measure(
+    repo: InMemoryAuthRepo,
+    tokens: list[str],
+    requests: int,
+    cache: VerifiedTokenCache | None,
+) -> float:
+    """
+    :return: Microseconds per request.
+    """
+
+    rng = random.Random(42)
+    requests_tokens = [rng.choice(tokens) for _ in range(requests)]
+
+    started_at = time.perf_counter()
+    for token in requests_tokens:
+        await authorize_user(token, repo, cache)
+    elapsed = time.perf_counter() - started_at
+
+    return elapsed / requests * 1_000_000
+
+
+async def run(clients: int, requests: int):
+    repo = InMemoryAuthRepo()
+    tokens = await create_tokens(repo, clients)
+
+    uncached = await measure(repo, tokens, requests, None)
+    cache = VerifiedTokenCache()
+    cached = await measure(repo, tokens, requests, cache)
+    metrics = cache.get_metrics()
+
+    print(f"Clients: {clients}, requests: {requests}")
+    print(f"Without cache: {uncached:8.1f} us/request")
+    print(
+        f"With cache:    {cached:8.1f} us/request"
+        f" (hit ratio {metrics['hit_ratio']:.3f})"
+    )
+
+
+def main(clients: int, requests: int):
+    asyncio.run(run(clients, requests))
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100_000,
+    )
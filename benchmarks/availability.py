@@ -0,0 +1,117 @@
+"""
+Compares the availability engine (`Availability`) with a linear scan over
+a flat list of bookings, which is what we had before.
+
+Usage: python -m benchmarks.availability [bookings_count] [rooms_count]
+"""
+
+import random
+import sys
+import timeit
+from datetime import timedelta
+
+from app.domain.entities import (
+    Availability,
+    BookingId,
+    BookingWithId,
+    Room,
+    TimePeriod,
+    TimeStamp,
+    User,
+)
+
+SEMESTER_START = 1_693_526_400  # 2023-09-01
+HOUR = 60 * 60
+QUERIES_COUNT = 1000
+
+
+def generate_bookings(
+    rooms: list[Room],
+    bookings_count: int,
+    rng: random.Random,
+) -> list[BookingWithId]:
+    owner = User(id=0, email="user@example.com")
+    bookings: list[BookingWithId] = []
+
+    for i in range(bookings_count):
+        start = SEMESTER_START + rng.randrange(120 * 24) * HOUR
+        bookings.append(
+            BookingWithId(
+                id=BookingId(f"booking-{i}"),
+                title="Lecture",
+                owner=owner,
+                room=rng.choice(rooms),
+                period=TimePeriod(
+                    TimeStamp(start),
+                    TimeStamp(start + rng.randrange(1, 4) * HOUR),
+                ),
+            )
+        )
+
+    return bookings
+
+
+def free_rooms_linear_scan(
+    bookings: list[BookingWithId],
+    rooms: list[Room],
+    period: TimePeriod,
+) -> list[str]:
+    busy_rooms_emails = {
+        booking.room.email
+        for booking in bookings
+        if booking.period.start < period.end and booking.period.end > period.start
+    }
+    return [room.email for room in rooms if room.email not in busy_rooms_emails]
+
+
+def main(bookings_count: int, rooms_count: int):
+    rng = random.Random(42)
+
+    rooms = [
+        Room(f"room{i}@example.com", f"Room #{i}", f"Комната #{i}")
+        for i in range(rooms_count)
+    ]
+    rooms_emails = [room.email for room in rooms]
+    bookings = generate_bookings(rooms, bookings_count, rng)
+
+    queries: list[TimePeriod] = []
+    for _ in range(QUERIES_COUNT):
+        start = SEMESTER_START + rng.randrange(120 * 24 * 2) * HOUR / 2
+        queries.append(TimePeriod(TimeStamp(start), TimeStamp(start + HOUR)))
+
+    build_time = timeit.timeit(lambda: Availability.from_bookings(bookings), number=1)
+    availability = Availability.from_bookings(bookings)
+
+    for query in queries[:10]:
+        assert availability.get_free_rooms(
+            query, rooms_emails
+        ) == free_rooms_linear_scan(bookings, rooms, query)
+
+    def query_engine():
+        for query in queries:
+            availability.get_free_rooms(query, rooms_emails)
+
+    def query_linear_scan():
+        for query in queries[:10]:
+            free_rooms_linear_scan(bookings, rooms, query)
+
+    def query_next_free_slot():
+        for query, room_email in zip(queries, rooms_emails * QUERIES_COUNT):
+            availability.get_next_free_slot(room_email, query.start, timedelta(hours=2))
+
+    engine_time = timeit.timeit(query_engine, number=1) / len(queries)
+    linear_scan_time = timeit.timeit(query_linear_scan, number=1) / 10
+    next_free_slot_time = timeit.timeit(query_next_free_slot, number=1) / len(queries)
+
+    print(f"Bookings: {bookings_count}, rooms: {rooms_count}")
+    print(f"Build (incremental inserts):    {build_time * 1000:10.2f} ms")
+    print(f"Free rooms, linear scan:        {linear_scan_time * 1e6:10.2f} us/query")
+    print(f"Free rooms, availability:       {engine_time * 1e6:10.2f} us/query")
+    print(f"Next free slot of a room:       {next_free_slot_time * 1e6:10.2f} us/query")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+    )
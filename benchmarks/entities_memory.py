@@ -0,0 +1,105 @@
+"""
+Measures memory and allocation time of bookings with the slotted domain
+entities against the same entities with per-instance `__dict__`, which is
+what we had before.
+
+Usage: python -m benchmarks.entities_memory [bookings_count]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from app.domain.entities import BookingWithId, Room, TimePeriod, TimeStamp, User
+
+from .availability import HOUR, SEMESTER_START
+
+
+class DictTimeStamp:
+    def __init__(self, timestamp: float):
+        self._timestamp = timestamp
+
+
+class DictTimePeriod:
+    def __init__(self, start: DictTimeStamp, end: DictTimeStamp):
+        self._start = start
+        self._end = end
+
+
+class DictBookingWithId:
+    def __init__(self, **kwargs):
+        self._title = kwargs["title"]
+        self._period = kwargs["period"]
+        self._room = kwargs["room"]
+        self._owner = kwargs["owner"]
+        self._id = kwargs["id"]
+
+
+def create_slotted(count: int, room: Room, owner: User) -> list:
+    return [
+        BookingWithId(
+            id=f"booking-{i}",
+            title="Lecture",
+            owner=owner,
+            room=room,
+            period=TimePeriod(
+                TimeStamp(SEMESTER_START + i * HOUR),
+                TimeStamp(SEMESTER_START + i * HOUR + HOUR),
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def create_dict_based(count: int, room: Room, owner: User) -> list:
+    return [
+        DictBookingWithId(
+            id=f"booking-{i}",
+            title="Lecture",
+            owner=owner,
+            room=room,
+            period=DictTimePeriod(
+                DictTimeStamp(SEMESTER_START + i * HOUR),
+                DictTimeStamp(SEMESTER_START + i * HOUR + HOUR),
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def measure(create, count: int) -> tuple[int, float]:
+    room = Room("room@example.com", "Room", "Комната")
+    owner = User(id=0, email="user@example.com")
+
+    started_at = time.perf_counter()
+    bookings = create(count, room, owner)
+    elapsed = time.perf_counter() - started_at
+    del bookings
+
+    # Timed separately, tracing slows allocations down a lot
+    tracemalloc.start()
+    bookings = create(count, room, owner)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del bookings
+
+    return size, elapsed
+
+
+def main(count: int):
+    dict_size, dict_time = measure(create_dict_based, count)
+    slotted_size, slotted_time = measure(create_slotted, count)
+
+    print(f"Bookings: {count} (memory includes the IDs strings)")
+    print(
+        f"__dict__ entities: {dict_size / count:8.1f} B/booking,"
+        f" {dict_time * 1000:8.2f} ms"
+    )
+    print(
+        f"Slotted entities:  {slotted_size / count:8.1f} B/booking,"
+        f" {slotted_time * 1000:8.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,45 @@
+"""
+Measures the time to authenticate an integration by its API key against
+the number of configured integrations, with the keys indexed by their
+prefixes.
+
+Usage: python -m benchmarks.integration_keys [lookups]
+"""
+
+import secrets
+import sys
+import time
+
+from app.adapters.integration_keys import IntegrationKeysIndex
+
+INTEGRATIONS_COUNTS = (1, 10, 100, 1_000, 10_000)
+
+
+def measure(integrations_count: int, lookups: int) -> float:
+    """
+    :return: Microseconds per lookup.
+    """
+
+    api_keys = [secrets.token_urlsafe(32) for _ in range(integrations_count)]
+    index = IntegrationKeysIndex(
+        {api_key: f"integration{i}" for i, api_key in enumerate(api_keys)}
+    )
+
+    started_at = time.perf_counter()
+    for i in range(lookups):
+        index.find(api_keys[i % integrations_count], time.time())
+    elapsed = time.perf_counter() - started_at
+
+    return elapsed / lookups * 1_000_000
+
+
+def main(lookups: int):
+    for integrations_count in INTEGRATIONS_COUNTS:
+        print(
+            f"Integrations: {integrations_count:6}"
+            f"  {measure(integrations_count, lookups):6.2f} us/lookup"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,95 @@
+"""
+Compares `merge_bookings` with the previous deduplication, which keyed
+bookings by strings built from ISO-formatted periods and room emails.
+
+Usage: python -m benchmarks.merge_bookings [bookings_count] [rooms_count]
+"""
+
+import random
+import sys
+import timeit
+
+from app.adapters.outlook import merge_bookings
+from app.domain.entities import Booking, BookingId, BookingWithId, Room
+
+from .availability import generate_bookings
+
+
+def merge_bookings_by_strings(
+    own_bookings: list[BookingWithId],
+    rooms_bookings: list[list[BookingWithId]],
+) -> list[BookingWithId]:
+    bookings: list[BookingWithId] = []
+    bookings_ids: set[BookingId] = set()
+    bookings_hashes: set[str] = set()
+
+    def hash_booking_by_period_and_room(booking: Booking) -> str:
+        period = f"{booking.period.start.datetime_utc().isoformat()}::{booking.period.end.datetime_utc().isoformat()}"
+        room = f"::{booking.room.email}"
+        return period + room
+
+    for booking in own_bookings:
+        bookings.append(booking)
+        bookings_ids.add(booking.id)
+        bookings_hashes.add(hash_booking_by_period_and_room(booking))
+
+    for room_bookings in rooms_bookings:
+        for booking in room_bookings:
+            if booking.id in bookings_ids:
+                continue
+
+            if hash_booking_by_period_and_room(booking) in bookings_hashes:
+                continue
+
+            bookings.append(booking)
+            bookings_ids.add(booking.id)
+            bookings_hashes.add(hash_booking_by_period_and_room(booking))
+
+    return bookings
+
+
+def main(bookings_count: int, rooms_count: int):
+    rng = random.Random(42)
+
+    rooms = [
+        Room(f"room{i}@example.com", f"Room #{i}", f"Комната #{i}")
+        for i in range(rooms_count)
+    ]
+    rooms_bookings_flat = generate_bookings(rooms, bookings_count, rng)
+
+    # Half of the bookings were created by the service account, so they are
+    # also present in its calendar under other IDs.
+    own_bookings = [
+        BookingWithId(
+            id=BookingId(f"own-{booking.id}"),
+            title=booking.title,
+            owner=booking.owner,
+            room=booking.room,
+            period=booking.period,
+        )
+        for booking in rooms_bookings_flat[::2]
+    ]
+
+    rooms_bookings: dict[str, list[BookingWithId]] = {room.email: [] for room in rooms}
+    for booking in rooms_bookings_flat:
+        rooms_bookings[booking.room.email].append(booking)
+
+    args = (own_bookings, list(rooms_bookings.values()))
+
+    assert [booking.id for booking in merge_bookings(*args)] == [
+        booking.id for booking in merge_bookings_by_strings(*args)
+    ]
+
+    strings_time = timeit.timeit(lambda: merge_bookings_by_strings(*args), number=5) / 5
+    tuples_time = timeit.timeit(lambda: merge_bookings(*args), number=5) / 5
+
+    print(f"Bookings: {bookings_count} + {len(own_bookings)} own, rooms: {rooms_count}")
+    print(f"String keys:      {strings_time * 1000:10.2f} ms")
+    print(f"Structural keys:  {tuples_time * 1000:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+    )
@@ -0,0 +1,75 @@
+"""
+Builds the room×slot occupancy grid of a whole semester and compares it with
+checking every slot against the bookings one by one.
+
+Usage: python -m benchmarks.occupancy [bookings_count] [rooms_count]
+"""
+
+import random
+import sys
+import timeit
+from datetime import timedelta
+
+from app.domain.entities import Availability, OccupancyGrid, Room, TimePeriod, TimeStamp
+
+from .availability import HOUR, SEMESTER_START, generate_bookings
+
+SEMESTER_DAYS = 120
+SLOT_DURATION = timedelta(minutes=30)
+
+
+def main(bookings_count: int, rooms_count: int):
+    rng = random.Random(42)
+
+    rooms = [
+        Room(f"room{i}@example.com", f"Room #{i}", f"Комната #{i}")
+        for i in range(rooms_count)
+    ]
+    rooms_emails = [room.email for room in rooms]
+    bookings = generate_bookings(rooms, bookings_count, rng)
+
+    semester = TimePeriod(
+        TimeStamp(SEMESTER_START),
+        TimeStamp(SEMESTER_START + SEMESTER_DAYS * 24 * HOUR),
+    )
+
+    def build_grid() -> OccupancyGrid:
+        return OccupancyGrid.from_bookings(
+            semester, SLOT_DURATION, rooms_emails, bookings
+        )
+
+    grid = build_grid()
+    slots = grid.get_slots()
+    availability = Availability.from_bookings(bookings)
+
+    def query_slots(count: int):
+        for slot in slots[:count]:
+            availability.get_free_rooms(slot, rooms_emails)
+
+    for i, slot in enumerate(slots[:100]):
+        assert grid.get_free_rooms(i) == availability.get_free_rooms(slot, rooms_emails)
+
+    grid_time = timeit.timeit(build_grid, number=5) / 5
+    encode_time = (
+        timeit.timeit(
+            lambda: [
+                grid.get_row(email).translate(bytes.maketrans(b"\x00\x01", b"01"))
+                for email in rooms_emails
+            ],
+            number=5,
+        )
+        / 5
+    )
+    slots_time = timeit.timeit(lambda: query_slots(500), number=1) / 500 * len(slots)
+
+    print(f"Bookings: {bookings_count}, rooms: {rooms_count}, slots: {len(slots)}")
+    print(f"Free rooms slot by slot:        {slots_time * 1000:10.2f} ms")
+    print(f"Occupancy grid:                 {grid_time * 1000:10.2f} ms")
+    print(f"Encoding grid rows:             {encode_time * 1000:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+    )
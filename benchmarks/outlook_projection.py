@@ -0,0 +1,90 @@
+"""
+Compares the size and the parse time of an EWS GetItem response with full
+calendar items against the same response projected to the fields that
+`OutlookBookings` requests (`CALENDAR_ITEM_FIELDS`).
+
+The full response is built from a recorded GetItem response of one calendar
+item (`data/get_item_calendar_item.xml`), repeated `items_count` times.
+
+Usage: python -m benchmarks.outlook_projection [items_count]
+"""
+
+import copy
+import sys
+import timeit
+from pathlib import Path
+
+import exchangelib
+from exchangelib.util import to_xml
+from lxml import etree
+
+from app.adapters.outlook import CALENDAR_ITEM_FIELDS
+
+RECORDED_RESPONSE_PATH = Path(__file__).parent / "data" / "get_item_calendar_item.xml"
+
+CALENDAR_ITEM_TAG = exchangelib.CalendarItem.response_tag()
+
+# Item IDs are always returned, no matter which fields are requested
+PROJECTED_TAGS = {exchangelib.CalendarItem.get_field_by_fieldname("_id").response_tag()}
+PROJECTED_TAGS.update(
+    exchangelib.CalendarItem.get_field_by_fieldname(field).response_tag()
+    for field in CALENDAR_ITEM_FIELDS
+)
+
+
+def build_response(items_count: int, projected: bool) -> bytes:
+    root = etree.parse(RECORDED_RESPONSE_PATH).getroot()
+
+    recorded_item = next(root.iter(CALENDAR_ITEM_TAG))
+    items = recorded_item.getparent()
+    assert items is not None
+    items.remove(recorded_item)
+
+    if projected:
+        for child in list(recorded_item):
+            if child.tag not in PROJECTED_TAGS:
+                recorded_item.remove(child)
+
+    for _ in range(items_count):
+        items.append(copy.deepcopy(recorded_item))
+
+    return etree.tostring(root, xml_declaration=True, encoding="utf-8")
+
+
+def parse_response(response: bytes) -> list[exchangelib.CalendarItem]:
+    root = to_xml(response)
+    return [
+        exchangelib.CalendarItem.from_xml(elem=elem, account=None)
+        for elem in root.iter(CALENDAR_ITEM_TAG)
+    ]
+
+
+def main(items_count: int):
+    full = build_response(items_count, projected=False)
+    projected = build_response(items_count, projected=True)
+
+    repeat = 5
+    full_time = min(
+        timeit.repeat(lambda: parse_response(full), number=1, repeat=repeat)
+    )
+    projected_time = min(
+        timeit.repeat(lambda: parse_response(projected), number=1, repeat=repeat)
+    )
+
+    print(f"Calendar items: {items_count}")
+    print(
+        f"Full payload:      {len(full) / 1024:10.1f} KiB,"
+        f" parsed in {full_time * 1000:8.1f} ms"
+    )
+    print(
+        f"Projected payload: {len(projected) / 1024:10.1f} KiB,"
+        f" parsed in {projected_time * 1000:8.1f} ms"
+    )
+    print(
+        f"Reduction: payload x{len(full) / len(projected):.1f},"
+        f" parse time x{full_time / projected_time:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
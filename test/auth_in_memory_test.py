@@ -0,0 +1,94 @@
+import asyncio
+import concurrent.futures
+from datetime import timedelta
+
+from app.adapters.auth_in_memory import InMemoryAuthRepo
+from app.adapters.auth_sweeper import RefreshTokensSweeper
+from app.domain.entities import TimeStamp
+
+
+def test_concurrently_created_users_get_unique_ids():
+    repo = InMemoryAuthRepo()
+    emails = [f"student{i}@example.com" for i in range(200)]
+
+    def upsert_users(thread: int) -> list[int]:
+        async def run() -> list[int]:
+            # Every thread creates all the users, in its own order
+            ordered_emails = emails[thread:] + emails[:thread]
+            users = await asyncio.gather(*map(repo.upsert_user, ordered_emails))
+            return [user.id for user in sorted(users, key=lambda user: user.email)]
+
+        return asyncio.run(run())
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(upsert_users, range(8)))
+
+    # Every thread got the same user for the same email
+    assert all(result == results[0] for result in results)
+    assert len(set(results[0])) == len(emails)
+    assert repo.get_metrics()["users"] == len(emails)
+
+
+def test_expired_refresh_tokens_are_swept_from_the_heap():
+    async def run():
+        repo = InMemoryAuthRepo()
+        now = TimeStamp.now()
+        user = await repo.upsert_user("user@example.com")
+
+        await repo.create_refresh_token("live", user.id, now + timedelta(days=1))
+        for i in range(3):
+            await repo.create_refresh_token(
+                f"expired-{i}", user.id, TimeStamp(now.timestamp() - i - 1)
+            )
+        # Deleted tokens stay in the heap until they are swept
+        await repo.create_refresh_token("deleted", user.id, TimeStamp(now.timestamp()))
+        await repo.delete_refresh_token("deleted")
+
+        assert repo.get_metrics()["expiry_heap_entries"] == 5
+        assert await repo.delete_expired_refresh_tokens(now) == 3
+
+        metrics = repo.get_metrics()
+        assert metrics["refresh_tokens"] == 1
+        assert metrics["expiry_heap_entries"] == 1
+        assert await repo.get_refresh_token_info("live") is not None
+        assert await repo.get_refresh_token_info("expired-0") is None
+
+    asyncio.run(run())
+
+
+def test_oldest_refresh_tokens_of_user_are_revoked():
+    async def run():
+        repo = InMemoryAuthRepo(max_refresh_tokens_per_user=2)
+        expires_at = TimeStamp.now() + timedelta(days=1)
+        user = await repo.upsert_user("user@example.com")
+
+        for token in ("a", "b", "c"):
+            await repo.create_refresh_token(token, user.id, expires_at)
+
+        assert await repo.get_refresh_token_info("a") is None
+        assert repo.get_metrics()["refresh_tokens"] == 2
+
+    asyncio.run(run())
+
+
+def test_sweeper_runs_until_stopped():
+    async def run():
+        repo = InMemoryAuthRepo()
+        sweeper = RefreshTokensSweeper(repo=repo, interval=timedelta(seconds=0.01))
+        user = await repo.upsert_user("user@example.com")
+        expired_at = TimeStamp(TimeStamp.now().timestamp() - 1)
+
+        sweeper.start()
+        await repo.create_refresh_token("a", user.id, expired_at)
+        await asyncio.sleep(0.05)
+        assert await repo.get_refresh_token_info("a") is None
+
+        await sweeper.stop()
+        await repo.create_refresh_token("b", user.id, expired_at)
+        await asyncio.sleep(0.05)
+        assert await repo.get_refresh_token_info("b") is not None
+
+        # Stopping twice is fine
+        await sweeper.stop()
+
+    asyncio.run(run())
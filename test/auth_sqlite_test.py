@@ -0,0 +1,92 @@
+import asyncio
+import sqlite3
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from app.adapters.auth_sqlite import SQLiteAuthRepo
+from app.domain.entities import TimeStamp
+
+
+def test_rotated_refresh_token_can_not_be_reused(tmp_path: Path):
+    async def run():
+        repo = SQLiteAuthRepo(path=tmp_path / "auth.db")
+        now = TimeStamp.now()
+        expires_at = now + timedelta(days=1)
+        user = await repo.upsert_user("user@example.com")
+        await repo.create_refresh_token("old", user.id, expires_at)
+
+        results = await asyncio.gather(
+            repo.rotate_refresh_token("old", "new-1", now, expires_at),
+            repo.rotate_refresh_token("old", "new-2", now, expires_at),
+        )
+
+        # Only one of the concurrent rotations wins
+        assert sorted(result is None for result in results) == [False, True]
+        assert await repo.get_refresh_token_info("old") is None
+        assert await repo.rotate_refresh_token("old", "new-3", now, expires_at) is None
+        assert await repo.get_refresh_token_info("new-3") is None
+
+        repo.close()
+
+    asyncio.run(run())
+
+
+def test_expired_refresh_token_is_not_rotated(tmp_path: Path):
+    async def run():
+        repo = SQLiteAuthRepo(path=tmp_path / "auth.db")
+        now = TimeStamp.now()
+        user = await repo.upsert_user("user@example.com")
+        await repo.create_refresh_token("old", user.id, TimeStamp(now.timestamp() - 1))
+
+        assert (
+            await repo.rotate_refresh_token("old", "new", now, now + timedelta(days=1))
+            is None
+        )
+        assert await repo.get_refresh_token_info("new") is None
+
+        repo.close()
+
+    asyncio.run(run())
+
+
+def test_oldest_refresh_tokens_of_user_are_revoked(tmp_path: Path):
+    async def run():
+        repo = SQLiteAuthRepo(path=tmp_path / "auth.db", max_refresh_tokens_per_user=2)
+        expires_at = TimeStamp.now() + timedelta(days=1)
+        user = await repo.upsert_user("user@example.com")
+        other_user = await repo.upsert_user("other@example.com")
+
+        await repo.create_refresh_token("other", other_user.id, expires_at)
+        for token in ("a", "b", "c"):
+            await repo.create_refresh_token(token, user.id, expires_at)
+
+        assert await repo.get_refresh_token_info("a") is None
+        assert await repo.get_refresh_token_info("b") is not None
+        assert await repo.get_refresh_token_info("c") is not None
+        assert await repo.get_refresh_token_info("other") is not None
+
+        repo.close()
+
+    asyncio.run(run())
+
+
+def test_reads_do_not_wait_for_writer(tmp_path: Path):
+    async def run():
+        path = tmp_path / "auth.db"
+        repo = SQLiteAuthRepo(path=path)
+        user = await repo.upsert_user("user@example.com")
+
+        writer = sqlite3.connect(path, isolation_level=None)
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            started_at = time.perf_counter()
+            assert await repo.get_user_by_id(user.id) == user
+            assert time.perf_counter() - started_at < 1
+        finally:
+            writer.execute("ROLLBACK")
+            writer.close()
+
+        repo.close()
+
+    asyncio.run(run())
@@ -0,0 +1,101 @@
+import random
+from datetime import timedelta
+
+from app.domain.entities import (
+    BookingId,
+    OccupancyGrid,
+    RoomSchedule,
+    TimePeriod,
+    TimeStamp,
+)
+
+
+def period(start: float, end: float) -> TimePeriod:
+    return TimePeriod(TimeStamp(start), TimeStamp(end))
+
+
+def is_overlapping(a: tuple[float, float], b: tuple[float, float]) -> bool:
+    return a[0] < b[1] and a[1] > b[0]
+
+
+def test_schedule_matches_brute_force():
+    rng = random.Random(42)
+    schedule = RoomSchedule()
+    periods: dict[BookingId, tuple[float, float]] = {}
+
+    for i in range(2000):
+        if periods and rng.random() < 0.3:
+            booking_id = rng.choice(list(periods))
+            schedule.delete(booking_id)
+            del periods[booking_id]
+        else:
+            start = rng.randrange(0, 1000)
+            end = start + rng.randrange(0, 50)
+            booking_id = BookingId(f"booking-{i}")
+            schedule.insert(booking_id, period(start, end))
+            periods[booking_id] = (start, end)
+
+        start = rng.randrange(0, 1000)
+        query = (start, start + rng.randrange(1, 30))
+
+        expected = {
+            booking_id
+            for booking_id, booking_period in periods.items()
+            if is_overlapping(booking_period, query)
+        }
+
+        assert len(schedule) == len(periods)
+        assert set(schedule.get_overlapping(period(*query))) == expected
+        assert schedule.is_busy(period(*query)) == bool(expected)
+
+
+def test_next_free_slot():
+    schedule = RoomSchedule()
+    schedule.insert(BookingId("a"), period(10, 20))
+    schedule.insert(BookingId("b"), period(22, 30))
+    schedule.insert(BookingId("c"), period(0, 100))
+    schedule.delete(BookingId("c"))
+
+    def next_free_slot(after: float, duration: float) -> float:
+        return schedule.get_next_free_slot(
+            TimeStamp(after), timedelta(seconds=duration)
+        ).timestamp()
+
+    assert next_free_slot(0, 5) == 0
+    assert next_free_slot(0, 15) == 30
+    assert next_free_slot(12, 2) == 20
+    assert next_free_slot(12, 3) == 30
+
+
+def test_occupancy_grid_matches_brute_force():
+    rng = random.Random(42)
+    rooms_emails = [f"room{i}@example.com" for i in range(5)]
+    grid = OccupancyGrid(period(100, 1000), timedelta(seconds=30), rooms_emails)
+    periods: dict[str, list[tuple[float, float]]] = {
+        email: [] for email in rooms_emails
+    }
+
+    for _ in range(200):
+        start = rng.randrange(0, 1100)
+        end = start + rng.randrange(1, 100)
+        room_email = rng.choice(rooms_emails)
+        grid.add(room_email, period(start, end))
+        periods[room_email].append((start, end))
+
+    # Bookings of unknown rooms are ignored
+    grid.add("unknown@example.com", period(100, 1000))
+
+    slots = grid.get_slots()
+    assert grid.slots_count == len(slots) == 30
+
+    for room_email in rooms_emails:
+        row = grid.get_row(room_email)
+        for i, slot in enumerate(slots):
+            expected = any(
+                is_overlapping(
+                    booking_period, (slot.start.timestamp(), slot.end.timestamp())
+                )
+                for booking_period in periods[room_email]
+            )
+            assert row[i] == expected
+            assert grid.is_busy(room_email, i) == expected
@@ -0,0 +1,110 @@
+import asyncio
+
+from fakes import FakeBookings, period, rooms
+
+from app.adapters.bookings_cache import CachedBookings
+from app.adapters.outlook import RoomsRegistry
+from app.domain.entities import Booking, Room, User
+
+
+def new_booking(room: Room, start_hour: int, end_hour: int) -> Booking:
+    return Booking(
+        title="Test booking",
+        period=period(start_hour, end_hour),
+        room=room,
+        owner=User(id=0, email="user@example.com"),
+    )
+
+
+def test_period_queries_are_served_from_cache():
+    async def run():
+        repo = FakeBookings()
+        cache = CachedBookings(bookings_repo=repo, rooms_registry=RoomsRegistry(rooms))
+
+        await repo.create_booking(new_booking(rooms[0], 10, 12))
+
+        assert len(await cache.get_bookings_in_period(period(9, 11))) == 1
+        assert len(await cache.get_bookings_in_period(period(13, 15))) == 0
+        assert len(repo.fetches) == 1
+
+    asyncio.run(run())
+
+
+def test_writes_update_cached_buckets():
+    async def run():
+        repo = FakeBookings()
+        cache = CachedBookings(bookings_repo=repo, rooms_registry=RoomsRegistry(rooms))
+
+        assert await cache.get_bookings_in_period(period(0, 24)) == []
+
+        booking_id = await cache.create_booking(new_booking(rooms[1], 10, 12))
+        bookings = await cache.get_bookings_in_period(period(0, 24))
+        assert [booking.id for booking in bookings] == [booking_id]
+
+        await cache.delete_booking(booking_id)
+        assert await cache.get_bookings_in_period(period(0, 24)) == []
+
+    asyncio.run(run())
+
+
+def test_batch_writes_update_cached_buckets():
+    async def run():
+        repo = FakeBookings()
+        cache = CachedBookings(bookings_repo=repo, rooms_registry=RoomsRegistry(rooms))
+
+        assert await cache.get_bookings_in_period(period(0, 24)) == []
+
+        results = await cache.create_bookings(
+            [
+                new_booking(rooms[0], 10, 12),
+                new_booking(rooms[1], 10, 10),
+                new_booking(rooms[1], 13, 14),
+            ]
+        )
+        assert isinstance(results[1], ValueError)
+
+        bookings = await cache.get_bookings_in_period(period(0, 24))
+        assert {booking.id for booking in bookings} == {results[0], results[2]}
+        assert len(repo.fetches) == 1
+
+    asyncio.run(run())
+
+
+def test_batch_deletes_drop_cached_buckets():
+    async def run():
+        repo = FakeBookings()
+        cache = CachedBookings(bookings_repo=repo, rooms_registry=RoomsRegistry(rooms))
+
+        booking_id = await repo.create_booking(new_booking(rooms[0], 10, 12))
+        assert len(await cache.get_bookings_in_period(period(0, 24))) == 1
+
+        results = await cache.delete_bookings([booking_id, "unknown"])
+        assert results[0] is None
+        assert isinstance(results[1], KeyError)
+
+        assert await cache.get_bookings_in_period(period(0, 24)) == []
+        assert len(repo.fetches) == 2
+
+    asyncio.run(run())
+
+
+def test_least_recently_used_days_are_evicted():
+    async def run():
+        repo = FakeBookings()
+        cache = CachedBookings(
+            bookings_repo=repo,
+            rooms_registry=RoomsRegistry(rooms),
+            max_cached_bookings=3,
+        )
+
+        await repo.create_booking(new_booking(rooms[0], 10, 12))
+        await repo.create_booking(new_booking(rooms[0], 34, 36))
+
+        await cache.get_bookings_in_period(period(0, 24))
+        await cache.get_bookings_in_period(period(24, 48))
+        assert len(repo.fetches) == 2
+
+        await cache.get_bookings_in_period(period(0, 24))
+        assert len(repo.fetches) == 3
+
+    asyncio.run(run())
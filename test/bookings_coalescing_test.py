@@ -0,0 +1,103 @@
+import asyncio
+
+from fakes import FakeBookings, period, rooms
+
+from app.adapters.bookings_coalescing import CoalescingBookings
+from app.adapters.outlook import RoomsRegistry
+from app.domain.entities import Booking, BookingWithId, Room, User
+
+
+def booking(booking_id: str, room: Room, start_hour: int, end_hour: int):
+    return BookingWithId(
+        id=booking_id,
+        title="Test booking",
+        period=period(start_hour, end_hour),
+        room=room,
+        owner=User(id=0, email=f"{booking_id}@example.com"),
+    )
+
+
+bookings = [
+    booking("a", rooms[0], 9, 10),
+    booking("b", rooms[0], 13, 14),
+    booking("c", rooms[1], 9, 10),
+]
+
+
+def test_identical_concurrent_queries_share_one_fetch():
+    async def run():
+        repo = FakeBookings(bookings, delay=0.01)
+        coalescing = CoalescingBookings(
+            bookings_repo=repo,
+            rooms_registry=RoomsRegistry(rooms),
+        )
+
+        results = await asyncio.gather(
+            *(coalescing.get_bookings_in_period(period(8, 12)) for _ in range(10))
+        )
+
+        assert len(repo.fetches) == 1
+        assert all({b.id for b in result} == {"a", "c"} for result in results)
+        assert coalescing.get_metrics() == {"fetches": 1, "coalesced": 9}
+
+        # Nothing is cached once the fetch is done
+        await coalescing.get_bookings_in_period(period(8, 12))
+        assert len(repo.fetches) == 2
+
+    asyncio.run(run())
+
+
+def test_covered_queries_are_sliced_from_the_covering_fetch():
+    async def run():
+        repo = FakeBookings(bookings, delay=0.01)
+        coalescing = CoalescingBookings(
+            bookings_repo=repo,
+            rooms_registry=RoomsRegistry(rooms),
+        )
+
+        whole_day, morning, room, user, busy = await asyncio.gather(
+            coalescing.get_bookings_in_period(period(0, 24)),
+            coalescing.get_bookings_in_period(period(8, 12)),
+            coalescing.get_bookings_in_period(period(0, 24), [rooms[0]]),
+            coalescing.get_bookings_in_period(period(0, 24), None, "b@example.com"),
+            coalescing.get_rooms_busy_periods(period(0, 24), [rooms[1]]),
+        )
+
+        # Busy periods are a separate kind of query
+        assert len(repo.fetches) == 2
+        assert {b.id for b in whole_day} == {"a", "b", "c"}
+        assert {b.id for b in morning} == {"a", "c"}
+        assert {b.id for b in room} == {"a", "b"}
+        assert {b.id for b in user} == {"b"}
+        assert busy == {rooms[1].email: [period(9, 10)]}
+
+    asyncio.run(run())
+
+
+def test_queries_after_writes_do_not_join_earlier_fetches():
+    async def run():
+        repo = FakeBookings(bookings, delay=0.01)
+        coalescing = CoalescingBookings(
+            bookings_repo=repo,
+            rooms_registry=RoomsRegistry(rooms),
+        )
+
+        before = asyncio.create_task(coalescing.get_bookings_in_period(period(8, 12)))
+        await asyncio.sleep(0)
+
+        booking_id = await coalescing.create_booking(
+            Booking(
+                title="Test booking",
+                period=period(10, 11),
+                room=rooms[0],
+                owner=User(id=0, email="user@example.com"),
+            )
+        )
+
+        after = await coalescing.get_bookings_in_period(period(8, 12))
+        await before
+
+        assert len(repo.fetches) == 2
+        assert {b.id for b in after} == {"a", "c", booking_id}
+
+    asyncio.run(run())
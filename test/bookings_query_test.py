@@ -0,0 +1,123 @@
+import asyncio
+
+from fakes import FakeBookings, ServiceCalendarBookings, period, rooms
+
+from app.domain.entities import BookingWithId, Room, TimePeriod, User
+from app.domain.use_cases.booking import BookingsQuery, query_bookings, stream_bookings
+
+
+def booking(booking_id: str, room: Room, owner: str, booked: TimePeriod):
+    return BookingWithId(
+        id=booking_id,
+        title=booking_id,
+        owner=User(id=0, email=owner),
+        room=room,
+        period=booked,
+    )
+
+
+def test_pages_follow_each_other_across_chunks():
+    async def run():
+        repo = FakeBookings(
+            [
+                booking("a", rooms[0], "alice@example.com", period(1, 2)),
+                booking("b", rooms[1], "bob@example.com", period(1, 2)),
+                # Overlaps the end of the first weekly chunk
+                booking("c", rooms[0], "alice@example.com", period(167, 169)),
+                booking("d", rooms[1], "alice@example.com", period(300, 301)),
+                # Ends after the period
+                booking("e", rooms[0], "alice@example.com", period(335, 337)),
+            ]
+        )
+        query = BookingsQuery(period=period(0, 336))
+
+        pages: list[list[str]] = []
+        cursor = None
+        while True:
+            page, cursor = await query_bookings(repo, query, 2, cursor)
+            pages.append([booking.id for booking in page])
+            if cursor is None:
+                break
+
+        assert pages == [["a", "b"], ["c", "d"], []]
+
+    asyncio.run(run())
+
+
+def test_owners_and_rooms_are_asked_for_separately():
+    async def run():
+        repo = FakeBookings(
+            [
+                booking("a", rooms[0], "alice@example.com", period(1, 2)),
+                booking("b", rooms[1], "bob@example.com", period(2, 3)),
+                booking("c", rooms[0], "carol@example.com", period(3, 4)),
+                booking("d", rooms[1], "alice@example.com", period(4, 5)),
+            ]
+        )
+        query = BookingsQuery(
+            period=period(0, 24),
+            rooms=[rooms[1]],
+            owners_emails=["bob@example.com", "alice@example.com"],
+        )
+
+        page, cursor = await query_bookings(repo, query, 10)
+
+        assert [booking.id for booking in page] == ["b", "d"]
+        assert cursor is None
+        assert sorted(email for _, email in repo.fetches) == [
+            "alice@example.com",
+            "bob@example.com",
+        ]
+
+        page, _ = await query_bookings(
+            repo, BookingsQuery(period=period(0, 24), rooms=[]), 10
+        )
+        assert page == []
+
+    asyncio.run(run())
+
+
+def test_streamed_bookings_are_filtered_page_by_page():
+    async def run():
+        repo = FakeBookings(
+            [
+                booking("a", rooms[0], "alice@example.com", period(1, 2)),
+                booking("b", rooms[1], "bob@example.com", period(2, 3)),
+                booking("c", rooms[0], "carol@example.com", period(3, 4)),
+                # Starts before the period
+                booking("d", rooms[1], "alice@example.com", period(0, 5)),
+            ]
+        )
+        query = BookingsQuery(
+            period=period(1, 24),
+            owners_emails=["alice@example.com", "bob@example.com"],
+        )
+
+        pages = [page async for page in stream_bookings(repo, query)]
+
+        assert [sorted(booking.id for booking in page) for page in pages] == [
+            ["a", "b"]
+        ]
+        # Several owners can't be filtered by the repository
+        assert repo.fetches == [(period(1, 24), None)]
+
+    asyncio.run(run())
+
+
+def test_bookings_of_other_rooms_are_filtered_out():
+    async def run():
+        repo = ServiceCalendarBookings(
+            [
+                booking("a", rooms[0], "alice@example.com", period(1, 2)),
+                booking("b", rooms[1], "bob@example.com", period(2, 3)),
+            ]
+        )
+        query = BookingsQuery(period=period(0, 24), rooms=[rooms[1]])
+
+        page, _ = await query_bookings(repo, query, 10)
+        pages = [page async for page in stream_bookings(repo, query)]
+
+        assert [booking.id for booking in page] == ["b"]
+        assert [[booking.id for booking in page] for page in pages] == [["b"]]
+
+    asyncio.run(run())
@@ -0,0 +1,102 @@
+from datetime import timedelta
+from pathlib import Path
+
+from app.adapters.bookings_store_sqlite import SQLiteBookingsStore
+from app.adapters.outlook import RoomsRegistry
+from app.domain.entities import (
+    BookingId,
+    BookingWithId,
+    Room,
+    TimePeriod,
+    TimeStamp,
+    User,
+)
+
+rooms = [
+    Room("room313@example.com", "Room #313", "Комната #313"),
+    Room("room314@example.com", "Room #314", "Комната #314"),
+]
+
+now = TimeStamp.now()
+
+
+def period(start_hour: int, end_hour: int) -> TimePeriod:
+    return TimePeriod(
+        now + timedelta(hours=start_hour), now + timedelta(hours=end_hour)
+    )
+
+
+def new_booking(
+    booking_id: str,
+    room: Room,
+    start_hour: int,
+    end_hour: int,
+    owner_email: str = "user@example.com",
+) -> BookingWithId:
+    return BookingWithId(
+        id=BookingId(booking_id),
+        title="Test booking",
+        period=period(start_hour, end_hour),
+        room=room,
+        owner=User(id=0, email=owner_email),
+    )
+
+
+def get_ids(bookings: list[BookingWithId]) -> set[str]:
+    return {booking.id for booking in bookings}
+
+
+def test_period_queries_use_rooms_and_owners_filters():
+    store = SQLiteBookingsStore(":memory:", RoomsRegistry(rooms))
+
+    store.upsert_booking(new_booking("long", rooms[0], 0, 48))
+    store.upsert_booking(new_booking("a", rooms[0], 50, 51))
+    store.upsert_booking(new_booking("b", rooms[1], 50, 52, "other@example.com"))
+
+    assert get_ids(store.get_bookings_in_period(period(49, 51))) == {"a", "b"}
+    # Starts long before the period, but still overlaps it
+    assert get_ids(store.get_bookings_in_period(period(47, 49))) == {"long"}
+    assert get_ids(store.get_bookings_in_period(period(0, 60), [rooms[1].email])) == {
+        "b"
+    }
+    assert get_ids(
+        store.get_bookings_in_period(period(0, 60), None, "other@example.com")
+    ) == {"b"}
+
+    # Same slot of the same room, reported under another ID
+    store.upsert_booking(new_booking("a-room", rooms[0], 50, 51))
+    booking = store.get_booking(BookingId("a-room"))
+    assert booking is not None and booking.id == "a"
+    assert get_ids(store.get_bookings_in_period(period(49, 51))) == {"a", "b"}
+
+    # Full syncs keep the stored ID too
+    store.replace_room_bookings(
+        rooms[0].email, period(40, 60), [new_booking("a-room", rooms[0], 50, 51)]
+    )
+    assert get_ids(store.get_bookings_in_period(period(49, 51))) == {"a", "b"}
+
+    store.replace_room_bookings(rooms[0].email, period(40, 60), [])
+    assert get_ids(store.get_bookings_in_period(period(0, 60))) == {"b"}
+    assert store.get_booking(BookingId("a-room")) is None
+
+
+def test_bookings_and_sync_states_survive_reopening(tmp_path: Path):
+    path = tmp_path / "bookings.sqlite3"
+
+    store = SQLiteBookingsStore(path, RoomsRegistry(rooms))
+    store.upsert_booking(new_booking("a", rooms[0], 0, 24))
+    store.upsert_booking(new_booking("a-room", rooms[0], 0, 24))
+    store.set_sync_state(rooms[0].email, "state-1")
+    store.close()
+
+    store = SQLiteBookingsStore(path, RoomsRegistry(rooms))
+    assert store.get_sync_state(rooms[0].email) == "state-1"
+    assert get_ids(store.get_bookings_in_period(period(23, 25))) == {"a"}
+
+    booking = store.get_booking(BookingId("a-room"))
+    assert booking is not None and booking.id == "a"
+    assert booking.period == period(0, 24)
+
+    store.delete_booking(BookingId("a-room"))
+    assert store.get_booking(BookingId("a")) is None
+    store.close()
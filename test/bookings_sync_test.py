@@ -0,0 +1,247 @@
+import asyncio
+from datetime import timedelta
+
+from fakes import FakeBookings, ServiceCalendarBookings, period, rooms
+
+from app.adapters.bookings_replica import ReplicaBookings
+from app.adapters.bookings_store import InMemoryBookingsStore
+from app.adapters.bookings_sync import BookingsSync
+from app.adapters.ews_scheduler import Priority
+from app.adapters.outlook import RoomChanges, RoomsRegistry
+from app.domain.entities import (
+    Booking,
+    BookingId,
+    BookingWithId,
+    Room,
+    TimePeriod,
+    TimeStamp,
+    User,
+)
+
+room = Room("room313@example.com", "Room #313", "Комната #313")
+
+
+def new_booking(booking_id: str, start_hour: int) -> BookingWithId:
+    start = TimeStamp.now() + timedelta(hours=start_hour)
+    return BookingWithId(
+        id=BookingId(booking_id),
+        title="Test booking",
+        period=TimePeriod(start, start + timedelta(hours=1)),
+        room=room,
+        owner=User(id=0, email="user@example.com"),
+    )
+
+
+class FakeOutlook:
+    def __init__(self):
+        self.changes: list[RoomChanges] = []
+        self.calendar: list[BookingWithId] = []
+        self.views = 0
+
+    async def get_room_changes(
+        self,
+        room: Room,
+        sync_state: str | None,
+        priority: Priority,
+    ):
+        return self.changes.pop(0)
+
+    async def get_room_bookings_in_period(
+        self,
+        room: Room,
+        period: TimePeriod,
+        priority: Priority,
+    ):
+        self.views += 1
+        return list(self.calendar)
+
+
+def test_room_changes_are_applied_to_store():
+    async def run():
+        outlook = FakeOutlook()
+        store = InMemoryBookingsStore()
+        sync = BookingsSync(
+            outlook=outlook,  # type: ignore
+            rooms_registry=RoomsRegistry([room]),
+            store=store,
+        )
+
+        # The first sync loads the whole room calendar
+        outlook.calendar = [new_booking("a", 1), new_booking("b", 3)]
+        outlook.changes.append(RoomChanges([], [], False, "state-1"))
+        await sync.sync()
+
+        assert sync.is_room_synced(room.email)
+        assert store.get_sync_state(room.email) == "state-1"
+        assert {
+            booking.id
+            for booking in store.get_bookings_in_period(
+                TimePeriod(TimeStamp.now(), TimeStamp.now() + timedelta(days=1))
+            )
+        } == {"a", "b"}
+
+        # Then only changes are applied
+        outlook.changes.append(
+            RoomChanges([new_booking("c", 5)], [BookingId("a")], False, "state-2")
+        )
+        await sync.sync()
+
+        assert outlook.views == 1
+        assert store.get_booking(BookingId("a")) is None
+        assert store.get_booking(BookingId("c")) is not None
+        assert store.get_sync_state(room.email) == "state-2"
+        assert sync.get_lag_metrics()["failed_rooms"] == []
+
+    asyncio.run(run())
+
+
+def test_same_slot_booking_keeps_stored_id():
+    store = InMemoryBookingsStore()
+    booking = new_booking("service-account-id", 1)
+    store.upsert_booking(booking)
+
+    store.upsert_booking(
+        BookingWithId(
+            id=BookingId("room-id"),
+            title="Renamed booking",
+            period=booking.period,
+            room=booking.room,
+            owner=booking.owner,
+        )
+    )
+
+    stored = store.get_booking(BookingId("service-account-id"))
+    assert stored is not None and stored.title == "Renamed booking"
+    assert store.get_booking(BookingId("room-id")) == stored
+    assert [
+        booking.id
+        for booking in store.get_bookings_in_period(
+            TimePeriod(TimeStamp.now(), TimeStamp.now() + timedelta(days=1))
+        )
+    ] == ["service-account-id"]
+
+    # The room reports the deletion under its own ID
+    store.delete_booking(BookingId("room-id"))
+    assert store.get_booking(BookingId("service-account-id")) is None
+
+
+def test_created_booking_keeps_its_id_after_sync():
+    async def run():
+        outlook = FakeOutlook()
+        store = InMemoryBookingsStore()
+        repo = FakeBookings()
+        sync = BookingsSync(
+            outlook=outlook,  # type: ignore
+            rooms_registry=RoomsRegistry([room]),
+            store=store,
+        )
+        replica = ReplicaBookings(
+            bookings_repo=repo,
+            rooms_registry=RoomsRegistry([room]),
+            store=store,
+            sync=sync,
+        )
+        room_copy = new_booking("room-id", 1)
+        user = room_copy.owner
+
+        booking_id = await replica.create_booking(
+            Booking(
+                title=room_copy.title,
+                period=room_copy.period,
+                room=room,
+                owner=user,
+            )
+        )
+
+        # The room calendar has a copy of the booking under another ID
+        outlook.calendar = [room_copy]
+        outlook.changes.append(RoomChanges([], [], False, "state-1"))
+        await sync.sync()
+
+        user_bookings = await replica.get_bookings_in_period(
+            TimePeriod(TimeStamp.now(), TimeStamp.now() + timedelta(days=1)),
+            None,
+            user.email,
+        )
+        assert [booking.id for booking in user_bookings] == [booking_id]
+        assert await replica.get_booking_owner(booking_id) == user
+
+        await replica.delete_booking(booking_id)
+
+        assert repo.bookings == {}
+        assert store.get_booking(booking_id) is None
+        assert store.get_booking(BookingId("room-id")) is None
+
+    asyncio.run(run())
+
+
+def test_user_bookings_are_found_by_owner():
+    store = InMemoryBookingsStore()
+    period = TimePeriod(TimeStamp.now(), TimeStamp.now() + timedelta(days=1))
+
+    store.upsert_booking(new_booking("a", 3))
+    store.upsert_booking(new_booking("b", 1))
+    store.upsert_booking(
+        BookingWithId(
+            id=BookingId("c"),
+            title="Test booking",
+            period=new_booking("c", 2).period,
+            room=room,
+            owner=User(id=0, email="other@example.com"),
+        )
+    )
+
+    bookings = store.get_bookings_in_period(period, None, "user@example.com")
+    assert [booking.id for booking in bookings] == ["b", "a"]
+
+    store.delete_booking(BookingId("b"))
+    bookings = store.get_bookings_in_period(period, [room.email], "user@example.com")
+    assert [booking.id for booking in bookings] == ["a"]
+    assert store.get_bookings_in_period(period, [], "user@example.com") == []
+
+
+def test_unsynced_rooms_do_not_duplicate_synced_ones():
+    async def run():
+        def booking(booking_id: str, room: Room, booked: TimePeriod):
+            return BookingWithId(
+                id=BookingId(booking_id),
+                title="Test booking",
+                period=booked,
+                room=room,
+                owner=User(id=0, email="user@example.com"),
+            )
+
+        store = InMemoryBookingsStore()
+        store.set_sync_state(rooms[0].email, "state-1")
+        store.upsert_booking(booking("a", rooms[0], period(1, 2)))
+
+        # The wrapped repository returns a copy of "a" from the calendar of
+        # the service account, and a booking that the sync has deleted since
+        repo = ServiceCalendarBookings(
+            [
+                booking("service-account-a", rooms[0], period(1, 2)),
+                booking("deleted", rooms[0], period(3, 4)),
+                booking("b", rooms[1], period(2, 3)),
+            ]
+        )
+        replica = ReplicaBookings(
+            bookings_repo=repo,
+            rooms_registry=RoomsRegistry(rooms),
+            store=store,
+            sync=BookingsSync(
+                outlook=FakeOutlook(),  # type: ignore
+                rooms_registry=RoomsRegistry(rooms),
+                store=store,
+            ),
+        )
+
+        bookings = await replica.get_bookings_in_period(period(0, 24))
+        busy_periods = await replica.get_rooms_busy_periods(period(0, 24))
+
+        assert sorted(booking.id for booking in bookings) == ["a", "b"]
+        assert busy_periods == {
+            rooms[0].email: [period(1, 2)],
+            rooms[1].email: [period(2, 3)],
+        }
+
+    asyncio.run(run())
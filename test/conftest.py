@@ -0,0 +1,4 @@
+import os
+
+# app.config can't be imported without a secret key
+os.environ.setdefault("SECRET_KEY", "test-secret-key-that-is-long-enough")
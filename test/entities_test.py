@@ -0,0 +1,35 @@
+import pytest
+
+from app.domain.entities import BookingWithId, Room, TimePeriod, TimeStamp, User
+
+
+def booking(booking_id: str, start: float) -> BookingWithId:
+    return BookingWithId(
+        id=booking_id,
+        title="Lecture",
+        owner=User(id=1, email="user@example.com"),
+        room=Room("room@example.com", "Room", "Комната"),
+        period=TimePeriod(TimeStamp(start), TimeStamp(start + 60)),
+    )
+
+
+def test_entities_are_hashable_values():
+    assert booking("a", 0) == booking("a", 0)
+    assert booking("a", 0) != booking("b", 0)
+    assert booking("a", 0) != booking("a", 1)
+    assert len({booking("a", 0), booking("a", 0), booking("a", 1)}) == 2
+
+
+def test_entities_are_slotted():
+    entity = booking("a", 0)
+    assert not hasattr(entity, "__dict__")
+    with pytest.raises(AttributeError):
+        entity.id = "b"  # type: ignore
+
+
+def test_time_stamp_comparison_with_other_types():
+    with pytest.raises(TypeError):
+        TimeStamp(0) < 0  # type: ignore
+    with pytest.raises(TypeError):
+        TimeStamp(0) + 1  # type: ignore
+    assert TimeStamp(0) != 0
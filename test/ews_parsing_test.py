@@ -0,0 +1,142 @@
+import exchangelib
+import exchangelib.errors
+import exchangelib.items
+import exchangelib.services
+import pytest
+
+from app.adapters.ews_parsing import parse_find_item_ids, parse_response
+
+ENVELOPE = """<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>{body}</s:Body>
+</s:Envelope>"""
+
+FIND_ITEM_RESPONSE = """
+<m:FindItemResponse
+    xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages"
+    xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+  <m:ResponseMessages>
+    <m:FindItemResponseMessage ResponseClass="{response_class}">
+      <m:ResponseCode>{code}</m:ResponseCode>
+      <m:RootFolder TotalItemsInView="2" IncludesLastItemInRange="true">
+        <t:Items>{items}</t:Items>
+      </m:RootFolder>
+    </m:FindItemResponseMessage>
+  </m:ResponseMessages>
+</m:FindItemResponse>"""
+
+FOUND_CALENDAR_ITEM = """
+<t:CalendarItem>
+  <t:ItemId Id="{id}" ChangeKey="key"/>
+</t:CalendarItem>"""
+
+GET_ITEM_RESPONSE = """
+<m:GetItemResponse
+    xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages"
+    xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+  <m:ResponseMessages>
+    <m:GetItemResponseMessage ResponseClass="Success">
+      <m:ResponseCode>NoError</m:ResponseCode>
+      <m:Items>
+        <t:CalendarItem>
+          <t:ItemId Id="first" ChangeKey="key"/>
+          <t:Subject>Lecture</t:Subject>
+        </t:CalendarItem>
+      </m:Items>
+    </m:GetItemResponseMessage>
+    <m:GetItemResponseMessage ResponseClass="Error">
+      <m:MessageText>The specified object was not found in the store.</m:MessageText>
+      <m:ResponseCode>ErrorItemNotFound</m:ResponseCode>
+      <m:DescriptiveLinkKey>0</m:DescriptiveLinkKey>
+      <m:Items/>
+    </m:GetItemResponseMessage>
+  </m:ResponseMessages>
+</m:GetItemResponse>"""
+
+SERVER_BUSY_FAULT = """
+<s:Fault>
+  <faultcode xmlns:a="http://schemas.microsoft.com/exchange/services/2006/types">
+    a:ErrorServerBusy
+  </faultcode>
+  <faultstring xml:lang="en-US">The server cannot service this request right now.</faultstring>
+  <detail>
+    <e:ResponseCode xmlns:e="http://schemas.microsoft.com/exchange/services/2006/errors">
+      ErrorServerBusy
+    </e:ResponseCode>
+    <e:Message xmlns:e="http://schemas.microsoft.com/exchange/services/2006/errors">
+      The server cannot service this request right now.
+    </e:Message>
+  </detail>
+</s:Fault>"""
+
+
+def create_account() -> exchangelib.Account:
+    config = exchangelib.Configuration(
+        service_endpoint="https://outlook.example.com/EWS/Exchange.asmx",
+        credentials=exchangelib.OAuth2Credentials(
+            client_id="client",
+            client_secret="secret",
+            tenant_id="tenant",
+        ),
+        auth_type=exchangelib.OAUTH2,
+        version=exchangelib.Version(build=exchangelib.Build(15, 1)),
+    )
+    return exchangelib.Account(
+        primary_smtp_address="service@example.com",
+        config=config,
+        autodiscover=False,
+        access_type=exchangelib.DELEGATE,
+    )
+
+
+def find_item_response(items: str, code: str = "NoError") -> bytes:
+    return ENVELOPE.format(
+        body=FIND_ITEM_RESPONSE.format(
+            response_class="Success" if code == "NoError" else "Error",
+            code=code,
+            items=items,
+        )
+    ).encode()
+
+
+def test_find_item_ids_are_parsed_in_order():
+    service = exchangelib.services.FindItem(account=create_account())
+    body = find_item_response(
+        FOUND_CALENDAR_ITEM.format(id="first") + FOUND_CALENDAR_ITEM.format(id="second")
+    )
+
+    assert parse_find_item_ids(service, body) == ["first", "second"]
+
+
+def test_empty_find_item_response_has_no_ids():
+    service = exchangelib.services.FindItem(account=create_account())
+
+    assert parse_find_item_ids(service, find_item_response("")) == []
+
+
+def test_find_item_error_message_is_raised():
+    service = exchangelib.services.FindItem(account=create_account())
+
+    with pytest.raises(exchangelib.errors.ErrorFolderNotFound):
+        parse_find_item_ids(service, find_item_response("", code="ErrorFolderNotFound"))
+
+
+def test_soap_faults_are_raised():
+    service = exchangelib.services.FindItem(account=create_account())
+    body = ENVELOPE.format(body=SERVER_BUSY_FAULT).encode()
+
+    with pytest.raises(exchangelib.errors.ErrorServerBusy):
+        parse_find_item_ids(service, body)
+
+
+def test_get_item_messages_are_parsed_to_items_and_errors():
+    service = exchangelib.services.GetItem(account=create_account())
+
+    first, second = parse_response(
+        service, ENVELOPE.format(body=GET_ITEM_RESPONSE).encode()
+    )
+
+    assert isinstance(first, exchangelib.items.CalendarItem)
+    assert first.id == "first"
+    assert first.subject == "Lecture"
+    assert isinstance(second, exchangelib.errors.ErrorItemNotFound)
@@ -0,0 +1,107 @@
+import asyncio
+
+import exchangelib.errors
+
+from app.adapters.ews_scheduler import EWSScheduler, Priority
+
+
+def test_interactive_requests_are_started_before_background_ones():
+    async def run():
+        scheduler = EWSScheduler(max_concurrent_requests=1)
+        started: list[str] = []
+        release = asyncio.Event()
+
+        async def request(name: str):
+            started.append(name)
+            if name == "first":
+                await release.wait()
+
+        first = asyncio.create_task(
+            scheduler.run(
+                "a@example.com", Priority.BACKGROUND, lambda: request("first")
+            )
+        )
+        await asyncio.sleep(0)
+
+        others = [
+            asyncio.create_task(
+                scheduler.run(
+                    f"{name}@example.com",
+                    priority,
+                    lambda name=name: request(name),
+                )
+            )
+            for name, priority in [
+                ("background", Priority.BACKGROUND),
+                ("interactive", Priority.INTERACTIVE),
+            ]
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.get_metrics()["queued"] == 2
+
+        release.set()
+        await asyncio.gather(first, *others)
+
+        assert started == ["first", "interactive", "background"]
+
+    asyncio.run(run())
+
+
+def test_requests_to_one_mailbox_are_capped():
+    async def run():
+        scheduler = EWSScheduler(
+            max_concurrent_requests=10,
+            max_concurrent_mailbox_requests=2,
+        )
+        in_flight: dict[str, int] = {}
+        max_in_flight: dict[str, int] = {}
+
+        async def request(mailbox: str):
+            in_flight[mailbox] = in_flight.get(mailbox, 0) + 1
+            max_in_flight[mailbox] = max(
+                max_in_flight.get(mailbox, 0), in_flight[mailbox]
+            )
+            await asyncio.sleep(0.01)
+            in_flight[mailbox] -= 1
+
+        # Requests to the other mailbox aren't stuck behind the busy one
+        mailboxes = ["room@example.com"] * 6 + ["other@example.com"] * 2
+        await asyncio.gather(
+            *(
+                scheduler.run(
+                    mailbox, Priority.INTERACTIVE, lambda m=mailbox: request(m)
+                )
+                for mailbox in mailboxes
+            )
+        )
+
+        assert max_in_flight == {"room@example.com": 2, "other@example.com": 2}
+
+    asyncio.run(run())
+
+
+def test_throttled_requests_are_retried_with_lower_limit():
+    async def run():
+        scheduler = EWSScheduler(max_concurrent_requests=8)
+        attempts = 0
+
+        async def request() -> str:
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise exchangelib.errors.ErrorServerBusy("Busy", back_off=0.01)
+            return "ok"
+
+        assert (
+            await scheduler.run("a@example.com", Priority.INTERACTIVE, request) == "ok"
+        )
+        assert attempts == 2
+
+        metrics = scheduler.get_metrics()
+        assert metrics["throttled"] == 1
+        # Halved, then grown back by 1 / 4 after the successful retry
+        assert metrics["limit"] == 4
+        assert metrics["in_flight"] == 0
+        assert metrics["queue_wait"]["interactive"]["requests"] == 2
+
+    asyncio.run(run())
@@ -0,0 +1,160 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.domain.dependencies import BookingsRepo
+from app.domain.entities import (
+    Booking,
+    BookingId,
+    BookingWithId,
+    Room,
+    TimePeriod,
+    TimeStamp,
+    User,
+)
+
+rooms = [
+    Room("room313@example.com", "Room #313", "Комната #313"),
+    Room("room314@example.com", "Room #314", "Комната #314"),
+]
+
+day = datetime(2023, 6, 27, tzinfo=timezone.utc)
+
+
+def period(start_hour: int, end_hour: int) -> TimePeriod:
+    return TimePeriod(
+        TimeStamp((day + timedelta(hours=start_hour)).timestamp()),
+        TimeStamp((day + timedelta(hours=end_hour)).timestamp()),
+    )
+
+
+class FakeBookings(BookingsRepo):
+    """
+    Keeps bookings in memory and records the periods it is asked for.
+    """
+
+    def __init__(self, bookings: list[BookingWithId] | None = None, delay: float = 0):
+        """
+        :param delay: Seconds that reads take, so that concurrent ones overlap.
+        """
+
+        self.bookings = {booking.id: booking for booking in bookings or []}
+        self.delay = delay
+        # Periods and owners of the reads
+        self.fetches: list[tuple[TimePeriod, str | None]] = []
+        self._created = 0
+
+    async def create_booking(self, booking: Booking) -> BookingId:
+        booking_id = BookingId(f"id-{self._created}")
+        self._created += 1
+        self.bookings[booking_id] = BookingWithId(
+            id=booking_id,
+            title=booking.title,
+            owner=booking.owner,
+            period=booking.period,
+            room=booking.room,
+        )
+        return booking_id
+
+    async def create_bookings(
+        self,
+        bookings: list[Booking],
+    ) -> list[BookingId | Exception]:
+        results: list[BookingId | Exception] = []
+        for booking in bookings:
+            if booking.period.start == booking.period.end:
+                results.append(ValueError("Empty period"))
+            else:
+                results.append(await self.create_booking(booking))
+        return results
+
+    async def delete_booking(self, booking_id: BookingId):
+        del self.bookings[booking_id]
+
+    async def delete_bookings(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[Exception | None]:
+        results: list[Exception | None] = []
+        for booking_id in bookings_ids:
+            if booking_id in self.bookings:
+                results.append(None)
+                await self.delete_booking(booking_id)
+            else:
+                results.append(KeyError(booking_id))
+        return results
+
+    async def get_bookings_in_period(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+        filter_user_email: str | None = None,
+    ) -> list[BookingWithId]:
+        self.fetches.append((period, filter_user_email))
+        await asyncio.sleep(self.delay)
+
+        emails = {
+            room.email for room in (rooms if filter_rooms is None else filter_rooms)
+        }
+        return [
+            booking
+            for booking in self.bookings.values()
+            if booking.room.email in emails
+            and booking.period.start < period.end
+            and booking.period.end > period.start
+            and filter_user_email in (None, booking.owner.email)
+        ]
+
+    async def get_rooms_busy_periods(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+    ) -> dict[str, list[TimePeriod]]:
+        self.fetches.append((period, None))
+        await asyncio.sleep(self.delay)
+
+        return {
+            room.email: [
+                booking.period
+                for booking in self.bookings.values()
+                if booking.room.email == room.email
+                and booking.period.start < period.end
+                and booking.period.end > period.start
+            ]
+            for room in (rooms if filter_rooms is None else filter_rooms)
+        }
+
+    async def get_booking_owner(self, booking_id: BookingId) -> User:
+        return self.bookings[booking_id].owner
+
+    async def get_bookings_owners(
+        self,
+        bookings_ids: list[BookingId],
+    ) -> list[User | Exception]:
+        return [
+            booking.owner
+            if (booking := self.bookings.get(booking_id))
+            else KeyError(booking_id)
+            for booking_id in bookings_ids
+        ]
+
+
+class ServiceCalendarBookings(FakeBookings):
+    """
+    Returns bookings of all rooms whatever rooms are asked for, like Outlook
+    does when it merges in the calendar of the service account.
+    """
+
+    async def get_bookings_in_period(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+        filter_user_email: str | None = None,
+    ) -> list[BookingWithId]:
+        return await super().get_bookings_in_period(period, None, filter_user_email)
+
+    async def get_rooms_busy_periods(
+        self,
+        period: TimePeriod,
+        filter_rooms: list[Room] | None = None,
+    ) -> dict[str, list[TimePeriod]]:
+        return await super().get_rooms_busy_periods(period, None)
@@ -0,0 +1,34 @@
+from app.adapters.integration_keys import RATE_WINDOW, IntegrationKeysIndex
+
+
+def test_keys_with_the_same_prefix_are_told_apart():
+    index = IntegrationKeysIndex(
+        {
+            "timetable-0123456789": "timetable",
+            "timetable-9876543210": "kiosk",
+        }
+    )
+
+    timetable = index.find("timetable-0123456789", 0.0)
+    kiosk = index.find("timetable-9876543210", 0.0)
+
+    assert timetable is not None and timetable.name == "timetable"
+    assert kiosk is not None and kiosk.name == "kiosk"
+    assert index.find("timetable-0000000000", 0.0) is None
+    assert index.find("unknown", 0.0) is None
+
+
+def test_requests_are_counted_per_integration_and_window():
+    index = IntegrationKeysIndex({"key-of-timetable": "timetable"})
+
+    index.find("key-of-timetable", 0.0)
+    index.find("key-of-timetable", 1.0)
+    index.find("wrong-key", 1.0)
+    index.find("key-of-timetable", RATE_WINDOW + 1)
+
+    assert index.get_metrics(RATE_WINDOW + 2) == {
+        "timetable": {"requests": 3, "window_requests": 1}
+    }
+    assert index.get_metrics(2 * RATE_WINDOW) == {
+        "timetable": {"requests": 3, "window_requests": 0}
+    }
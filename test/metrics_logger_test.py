@@ -0,0 +1,23 @@
+import logging
+
+import pytest
+
+from app.adapters.metrics_logger import MetricsLogger
+
+
+def test_metrics_of_all_sources_are_logged(caplog: pytest.LogCaptureFixture):
+    def get_broken_metrics():
+        raise RuntimeError("Broken source")
+
+    metrics_logger = MetricsLogger()
+    metrics_logger.add_source("Broken", get_broken_metrics)
+    metrics_logger.add_source("Sync", lambda: {"max_lag": 1.5, "failed_rooms": []})
+
+    with caplog.at_level(logging.INFO, logger="app.adapters.metrics_logger"):
+        metrics_logger.log()
+
+    # A broken source doesn't stop the others
+    assert [record.getMessage() for record in caplog.records] == [
+        "Error while getting Broken metrics: Broken source",
+        'Sync metrics: {"max_lag": 1.5, "failed_rooms": []}',
+    ]
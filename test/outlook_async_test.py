@@ -0,0 +1,326 @@
+import asyncio
+import re
+import time
+from datetime import datetime, timedelta, timezone
+
+import exchangelib
+import httpx
+import pytest
+
+from app.adapters.ews_scheduler import EWSScheduler
+from app.adapters.outlook import (
+    ITERATE_CONCURRENT_ROOMS,
+    ITERATE_MAX_PENDING_PAGES,
+    RoomsRegistry,
+)
+from app.adapters.outlook_async import AsyncOutlookBookings, post
+from app.domain.entities import Room, TimePeriod, TimeStamp
+
+rooms = [Room(f"room{i}@example.com", f"Room #{i}", f"Комната #{i}") for i in range(12)]
+
+FIND_ITEM_RESPONSE = """<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:FindItemResponse
+        xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages"
+        xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>
+        <m:FindItemResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:RootFolder TotalItemsInView="{count}" IncludesLastItemInRange="true">
+            <t:Items>{items}</t:Items>
+          </m:RootFolder>
+        </m:FindItemResponseMessage>
+      </m:ResponseMessages>
+    </m:FindItemResponse>
+  </s:Body>
+</s:Envelope>"""
+
+GET_ITEM_RESPONSE = """<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:GetItemResponse
+        xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages"
+        xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>{messages}</m:ResponseMessages>
+    </m:GetItemResponse>
+  </s:Body>
+</s:Envelope>"""
+
+GET_ITEM_RESPONSE_MESSAGE = """
+<m:GetItemResponseMessage ResponseClass="Success">
+  <m:ResponseCode>NoError</m:ResponseCode>
+  <m:Items>{item}</m:Items>
+</m:GetItemResponseMessage>"""
+
+# Like real EWS, FindItem returns only simple fields
+FOUND_CALENDAR_ITEM = """
+<t:CalendarItem>
+  <t:ItemId Id="{room}-booking" ChangeKey="key"/>
+  <t:Start>2023-06-27T15:00:00Z</t:Start>
+  <t:End>2023-06-27T17:00:00Z</t:End>
+</t:CalendarItem>"""
+
+CALENDAR_ITEM = """
+<t:CalendarItem>
+  <t:ItemId Id="{room}-booking" ChangeKey="key"/>
+  <t:Subject>Lecture</t:Subject>
+  <t:Start>2023-06-27T15:00:00Z</t:Start>
+  <t:End>2023-06-27T17:00:00Z</t:End>
+  <t:Organizer>
+    <t:Mailbox><t:EmailAddress>user@example.com</t:EmailAddress></t:Mailbox>
+  </t:Organizer>
+  <t:RequiredAttendees>
+    <t:Attendee>
+      <t:Mailbox><t:EmailAddress>{room}</t:EmailAddress></t:Mailbox>
+    </t:Attendee>
+  </t:RequiredAttendees>
+</t:CalendarItem>"""
+
+ITEM_ID_REGEXP = re.compile(rb'ItemId Id="([^"]+)-booking"')
+
+
+class FakeEWS:
+    """
+    Answers FindItem requests with the ID of one booking per room mailbox,
+    and GetItem requests with the fields of the bookings.
+    """
+
+    def __init__(self):
+        self.connections = 0
+        # FindItem requests
+        self.requests = 0
+        self.get_item_requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+
+        while not reader.at_eof():
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                break
+
+            headers = {
+                name.lower(): value
+                for name, value in (
+                    line.split(": ", 1)
+                    for line in head.decode().split("\r\n")[1:]
+                    if line
+                )
+            }
+            request = await reader.readexactly(int(headers["content-length"]))
+
+            if b"GetItem" in request:
+                self.get_item_requests += 1
+                body = GET_ITEM_RESPONSE.format(
+                    messages="".join(
+                        GET_ITEM_RESPONSE_MESSAGE.format(
+                            item=CALENDAR_ITEM.format(room=room.decode())
+                        )
+                        for room in ITEM_ID_REGEXP.findall(request)
+                    )
+                ).encode()
+            else:
+                self.requests += 1
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                await asyncio.sleep(0.05)
+                self.in_flight -= 1
+
+                mailbox = headers.get("x-anchormailbox", "")
+                items = (
+                    FOUND_CALENDAR_ITEM.format(room=mailbox)
+                    if mailbox.startswith("room")
+                    else ""
+                )
+                body = FIND_ITEM_RESPONSE.format(
+                    count=int(bool(items)), items=items
+                ).encode()
+
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/xml; charset=utf-8\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+
+        writer.close()
+
+
+class StaticTokenOutlookBookings(AsyncOutlookBookings):
+    def _get_access_token_blocking(self, renew: bool) -> tuple[str, float]:
+        return "token", time.time() + 60 * 60
+
+
+def create_bookings_repo(port: int) -> AsyncOutlookBookings:
+    account_config = exchangelib.Configuration(
+        service_endpoint=f"http://127.0.0.1:{port}/EWS/Exchange.asmx",
+        credentials=exchangelib.OAuth2Credentials(
+            client_id="client",
+            client_secret="secret",
+            tenant_id="tenant",
+        ),
+        auth_type=exchangelib.OAUTH2,
+        version=exchangelib.Version(build=exchangelib.Build(15, 1)),
+    )
+
+    return StaticTokenOutlookBookings(
+        account=exchangelib.Account(
+            primary_smtp_address="service@example.com",
+            config=account_config,
+            autodiscover=False,
+            access_type=exchangelib.DELEGATE,
+        ),
+        account_config=account_config,
+        rooms_registry=RoomsRegistry(rooms),
+        executor=None,
+        scheduler=EWSScheduler(max_concurrent_requests=20),
+    )
+
+
+def test_room_views_are_sent_concurrently_over_kept_alive_connections():
+    async def run():
+        ews = FakeEWS()
+        server = await asyncio.start_server(ews.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        repo = create_bookings_repo(port)
+        period = TimePeriod(
+            TimeStamp(datetime(2023, 6, 27, tzinfo=timezone.utc).timestamp()),
+            TimeStamp(datetime(2023, 6, 28, tzinfo=timezone.utc).timestamp()),
+        )
+
+        bookings = await repo.get_bookings_in_period(period)
+
+        assert sorted(booking.room.email for booking in bookings) == sorted(
+            room.email for room in rooms
+        )
+        assert all(booking.owner.email == "user@example.com" for booking in bookings)
+        # All the views (own calendar and rooms) are in flight at once,
+        # not limited by the executor threads.
+        assert ews.max_in_flight == len(rooms) + 1
+
+        connections = ews.connections
+        await repo.get_bookings_in_period(period)
+        assert ews.connections == connections
+
+        await repo.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(run())
+
+
+def test_bookings_are_iterated_window_by_window_with_bounded_read_ahead():
+    async def run():
+        ews = FakeEWS()
+        server = await asyncio.start_server(ews.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        repo = create_bookings_repo(port)
+        start = datetime(2023, 6, 27, tzinfo=timezone.utc)
+        # Three weekly windows, every view returns the booking of the first
+        period = TimePeriod(
+            TimeStamp(start.timestamp()),
+            TimeStamp((start + timedelta(weeks=3)).timestamp()),
+        )
+
+        pages = [page async for page in repo.iterate_bookings_in_period(period)]
+
+        assert sorted(booking.room.email for page in pages for booking in page) == (
+            sorted(room.email for room in rooms)
+        )
+        assert ews.requests == len(rooms) * 3
+        # Every reader has at most the current and the next window in flight
+        assert ews.max_in_flight <= 2 * ITERATE_CONCURRENT_ROOMS
+
+        # Readers are stopped with the consumer
+        async for _ in repo.iterate_bookings_in_period(period):
+            break
+        await asyncio.sleep(0.2)
+        assert ews.requests <= len(rooms) * 3 + 2 * ITERATE_CONCURRENT_ROOMS + (
+            ITERATE_MAX_PENDING_PAGES
+        )
+        requests = ews.requests
+        await asyncio.sleep(0.2)
+        assert ews.requests == requests
+
+        await repo.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(run())
+
+
+def test_long_room_views_are_read_window_by_window():
+    async def run():
+        ews = FakeEWS()
+        server = await asyncio.start_server(ews.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        repo = create_bookings_repo(port)
+        start = datetime(2023, 6, 27, tzinfo=timezone.utc)
+        period = TimePeriod(
+            TimeStamp(start.timestamp()),
+            TimeStamp((start + timedelta(weeks=3)).timestamp()),
+        )
+
+        bookings = await repo.get_room_bookings_in_period(rooms[0], period)
+
+        assert ews.requests == 3
+        # Every window returns the same item, its fields are read once
+        assert ews.get_item_requests == 1
+        assert [booking.id for booking in bookings] == [f"{rooms[0].email}-booking"]
+        assert bookings[0].owner.email == "user@example.com"
+
+        await repo.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(run())
+
+
+class DroppingTransport(httpx.AsyncBaseTransport):
+    """
+    Drops the first request, like Exchange closing a kept alive connection.
+    """
+
+    def __init__(self):
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.requests == 1:
+            raise httpx.RemoteProtocolError("Server disconnected", request=request)
+        return httpx.Response(200, content=b"body")
+
+
+def test_idempotent_requests_are_sent_again_if_the_connection_drops():
+    async def run():
+        transport = DroppingTransport()
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await post(
+                client, "http://ews/EWS/Exchange.asmx", b"", {}, idempotent=True
+            )
+
+        assert response.content == b"body"
+        assert transport.requests == 2
+
+    asyncio.run(run())
+
+
+def test_other_requests_are_not_sent_again():
+    async def run():
+        transport = DroppingTransport()
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(httpx.RemoteProtocolError):
+                await post(
+                    client, "http://ews/EWS/Exchange.asmx", b"", {}, idempotent=False
+                )
+
+        assert transport.requests == 1
+
+    asyncio.run(run())
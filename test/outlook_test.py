@@ -0,0 +1,222 @@
+import asyncio
+import threading
+import time
+
+import exchangelib
+import pytest
+
+from app.adapters.ews_scheduler import EWSScheduler
+from app.adapters.outlook import (
+    CALENDAR_ITEM_FIELDS,
+    CALENDAR_ITEM_OWNER_FIELDS,
+    OutlookBookings,
+    RoomsRegistry,
+)
+from app.domain.entities import Room, TimePeriod, TimeStamp
+
+rooms = [Room(f"room{i}@example.com", f"Room #{i}", f"Комната #{i}") for i in range(6)]
+broken_room = Room("broken@example.com", "Broken room", "Сломанная комната")
+
+tz = exchangelib.EWSTimeZone("UTC")
+start = exchangelib.EWSDateTime(2023, 6, 27, 15, tzinfo=tz)
+end = exchangelib.EWSDateTime(2023, 6, 27, 17, tzinfo=tz)
+period = TimePeriod(
+    TimeStamp(exchangelib.EWSDateTime(2023, 6, 27, tzinfo=tz).timestamp()),
+    TimeStamp(exchangelib.EWSDateTime(2023, 6, 28, tzinfo=tz).timestamp()),
+)
+
+
+def create_calendar_item(room_email: str) -> exchangelib.CalendarItem:
+    return exchangelib.CalendarItem(
+        id=f"{room_email}-booking",
+        subject="Lecture",
+        start=start,
+        end=end,
+        organizer=exchangelib.Mailbox(email_address="user@example.com"),
+        required_attendees=[
+            exchangelib.Attendee(
+                mailbox=exchangelib.Mailbox(email_address=room_email),
+                response_type="Accept",
+            )
+        ],
+    )
+
+
+class FakeEWS:
+    """
+    Records the calendar views of all the fake accounts.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.created_accounts: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # Returned by GetUserAvailability, and the mailboxes it was asked for
+        self.free_busy_views: list[object] = []
+        self.free_busy_mailboxes: list[str] = []
+        # Fields of all the queries
+        self.requested_fields: list[tuple[str, ...]] = []
+
+    def view(self, email: str) -> list[exchangelib.CalendarItem]:
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        time.sleep(0.05)
+
+        with self.lock:
+            self.in_flight -= 1
+
+        if email.startswith("broken"):
+            raise exchangelib.errors.ErrorInternalServerTransientError("Broken")
+
+        return [create_calendar_item(email)] if email.startswith("room") else []
+
+
+class FakeQuery:
+    def __init__(self, ews: FakeEWS, email: str):
+        self.ews = ews
+        self.email = email
+
+    def only(self, *fields: str) -> list[exchangelib.CalendarItem]:
+        with self.ews.lock:
+            self.ews.requested_fields.append(fields)
+        return self.ews.view(self.email)
+
+
+class FakeCalendar:
+    def __init__(self, ews: FakeEWS, email: str):
+        self.ews = ews
+        self.email = email
+
+    def view(self, start, end) -> FakeQuery:
+        return FakeQuery(self.ews, self.email)
+
+    def all(self) -> "FakeItemsQuery":
+        return FakeItemsQuery(self.ews)
+
+
+class FakeItemsQuery:
+    def __init__(self, ews: FakeEWS):
+        self.ews = ews
+
+    def only(self, *fields: str) -> "FakeItemsQuery":
+        with self.ews.lock:
+            self.ews.requested_fields.append(fields)
+        return self
+
+    def get(self, id: str) -> exchangelib.CalendarItem:
+        return create_calendar_item(rooms[0].email)
+
+
+class FakeProtocol:
+    def __init__(self, ews: FakeEWS):
+        self.ews = ews
+
+    def get_free_busy_info(self, accounts, start, end, requested_view):
+        self.ews.free_busy_mailboxes = [email for email, _, _ in accounts]
+        return iter(self.ews.free_busy_views)
+
+
+class FakeAccount:
+    ews = FakeEWS()
+
+    def __init__(self, primary_smtp_address: str, **kwargs):
+        with self.ews.lock:
+            self.ews.created_accounts.append(primary_smtp_address)
+
+        self.primary_smtp_address = primary_smtp_address
+        self.calendar = FakeCalendar(self.ews, primary_smtp_address)
+        self.protocol = FakeProtocol(self.ews)
+
+
+@pytest.fixture
+def ews(monkeypatch: pytest.MonkeyPatch) -> FakeEWS:
+    monkeypatch.setattr(exchangelib, "Account", FakeAccount)
+    FakeAccount.ews = FakeEWS()
+    return FakeAccount.ews
+
+
+def create_bookings_repo(rooms: list[Room]) -> OutlookBookings:
+    return OutlookBookings(
+        account=exchangelib.Account(primary_smtp_address="service@example.com"),
+        account_config=None,  # type: ignore
+        rooms_registry=RoomsRegistry(rooms),
+        executor=None,
+        scheduler=EWSScheduler(max_concurrent_requests=20),
+    )
+
+
+def test_rooms_calendars_are_viewed_concurrently(ews: FakeEWS):
+    repo = create_bookings_repo(rooms)
+
+    bookings = asyncio.run(repo.get_bookings_in_period(period))
+
+    assert sorted(booking.room.email for booking in bookings) == sorted(
+        room.email for room in rooms
+    )
+    assert all(booking.owner.email == "user@example.com" for booking in bookings)
+    # Own calendar and all the rooms at once
+    assert ews.max_in_flight == len(rooms) + 1
+
+
+def test_room_errors_recreate_only_the_room_account(ews: FakeEWS):
+    repo = create_bookings_repo([rooms[0], broken_room])
+
+    for _ in range(2):
+        with pytest.raises(exchangelib.errors.ErrorInternalServerTransientError):
+            asyncio.run(repo.get_bookings_in_period(period))
+
+    # The pooled account of the other room is kept
+    assert ews.created_accounts.count(rooms[0].email) == 1
+    assert ews.created_accounts.count(broken_room.email) == 2
+
+    bookings = asyncio.run(repo.get_bookings_in_period(period, [rooms[0]]))
+    assert [booking.room for booking in bookings] == [rooms[0]]
+    assert ews.created_accounts.count(rooms[0].email) == 1
+
+
+def test_free_busy_views_are_mapped_to_rooms_in_order(ews: FakeEWS):
+    repo = create_bookings_repo(rooms[:3])
+    ews.free_busy_views = [
+        exchangelib.properties.FreeBusyView(
+            calendar_events=[
+                exchangelib.properties.CalendarEvent(
+                    start=start, end=end, busy_type="Busy"
+                ),
+                exchangelib.properties.CalendarEvent(
+                    start=end,
+                    end=exchangelib.EWSDateTime(2023, 6, 27, 18, tzinfo=tz),
+                    busy_type="Free",
+                ),
+            ]
+        ),
+        exchangelib.properties.FreeBusyView(calendar_events=None),
+        exchangelib.errors.ErrorMailRecipientNotFound("Unknown mailbox"),
+    ]
+
+    busy_periods = asyncio.run(repo.get_rooms_busy_periods(period))
+
+    # One request for all the rooms
+    assert ews.free_busy_mailboxes == [room.email for room in rooms[:3]]
+    assert busy_periods == {
+        rooms[0].email: [
+            TimePeriod(TimeStamp(start.timestamp()), TimeStamp(end.timestamp()))
+        ],
+        rooms[1].email: [],
+        # Rooms that failed are busy for the whole period
+        rooms[2].email: [period],
+    }
+
+
+def test_only_used_calendar_item_fields_are_requested(ews: FakeEWS):
+    repo = create_bookings_repo(rooms[:2])
+
+    asyncio.run(repo.get_bookings_in_period(period))
+    assert ews.requested_fields == [CALENDAR_ITEM_FIELDS] * 3
+
+    ews.requested_fields.clear()
+    owner = asyncio.run(repo.get_booking_owner("booking"))
+    assert owner.email == "user@example.com"
+    assert ews.requested_fields == [CALENDAR_ITEM_OWNER_FIELDS]
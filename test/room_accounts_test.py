@@ -0,0 +1,71 @@
+import threading
+
+import exchangelib
+import pytest
+
+from app.adapters.outlook import RoomAccountsPool
+
+
+class FakeCalendar:
+    def __init__(self, is_healthy: bool):
+        self.is_healthy = is_healthy
+
+    def refresh(self):
+        if not self.is_healthy:
+            raise ConnectionError("Broken account")
+
+
+class FakeAccount:
+    # Construction of accounts with these emails waits for the event
+    slow_emails: set[str] = set()
+    slow_started = threading.Event()
+    slow_event = threading.Event()
+
+    def __init__(self, primary_smtp_address: str, **kwargs):
+        if primary_smtp_address in self.slow_emails:
+            self.slow_started.set()
+            self.slow_event.wait(5)
+
+        self.primary_smtp_address = primary_smtp_address
+        self.calendar = FakeCalendar(not primary_smtp_address.startswith("broken"))
+
+
+@pytest.fixture(autouse=True)
+def fake_account(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(exchangelib, "Account", FakeAccount)
+    FakeAccount.slow_emails = set()
+    FakeAccount.slow_started = threading.Event()
+    FakeAccount.slow_event = threading.Event()
+
+
+def test_slow_account_does_not_block_other_rooms():
+    pool = RoomAccountsPool(None)  # type: ignore
+    FakeAccount.slow_emails = {"slow@example.com"}
+
+    slow = threading.Thread(target=pool.get, args=("slow@example.com",))
+    slow.start()
+    try:
+        assert FakeAccount.slow_started.wait(5)
+
+        fast = threading.Thread(target=pool.get, args=("fast@example.com",))
+        fast.start()
+        fast.join(1)
+        assert not fast.is_alive()
+    finally:
+        FakeAccount.slow_event.set()
+        slow.join()
+
+    assert pool.get("slow@example.com") is pool.get("slow@example.com")
+
+
+def test_unhealthy_accounts_are_recreated():
+    pool = RoomAccountsPool(None)  # type: ignore
+    healthy = pool.get("room@example.com")
+    broken = pool.get("broken@example.com")
+
+    assert pool.check_health_blocking() == {
+        "room@example.com": True,
+        "broken@example.com": False,
+    }
+    assert pool.get("room@example.com") is healthy
+    assert pool.get("broken@example.com") is not broken
@@ -0,0 +1,29 @@
+from app.adapters.room_catalogue import RoomCatalogue, RoomDetails
+from app.domain.entities import Room, RoomType
+
+small = Room("small@example.com", "Small", "Маленькая")
+auditorium = Room("auditorium@example.com", "Auditorium", "Аудитория")
+large = Room("large@example.com", "Large", "Большая")
+
+catalogue = RoomCatalogue(
+    [
+        (small, RoomDetails(id="1", type=RoomType.MEETING_ROOM, capacity=4)),
+        (auditorium, RoomDetails(id="2", type=RoomType.AUDITORIUM, capacity=120)),
+        (large, RoomDetails(id="3", type=RoomType.MEETING_ROOM, capacity=12)),
+    ]
+)
+
+
+def test_rooms_are_found_by_capacity_and_type_in_catalogue_order():
+    assert catalogue.find() == [small, auditorium, large]
+    assert catalogue.find(min_capacity=5) == [auditorium, large]
+    assert catalogue.find(min_capacity=12) == [auditorium, large]
+    assert catalogue.find(min_capacity=121) == []
+    assert catalogue.find(types=[RoomType.MEETING_ROOM]) == [small, large]
+    assert catalogue.find(min_capacity=5, types=[RoomType.MEETING_ROOM]) == [large]
+
+
+def test_rooms_are_found_by_id():
+    assert catalogue.get_by_id("2") == auditorium
+    assert catalogue.get_by_id("4") is None
+    assert catalogue.get_details(large).capacity == 12
@@ -0,0 +1,85 @@
+import asyncio
+from datetime import timedelta
+
+from app.adapters.auth_in_memory import InMemoryAuthRepo
+from app.domain.entities import TimeStamp, User
+from app.domain.use_cases.iam import (
+    VerifiedTokenCache,
+    authorize_user,
+    login_user,
+    logout_user_by_refresh_token,
+)
+
+
+def test_entries_expire_with_their_tokens():
+    cache = VerifiedTokenCache()
+    user = User(id=1, email="user@example.com")
+    now = TimeStamp.now()
+
+    cache.put("token", user, now + timedelta(minutes=1))
+
+    assert cache.get("token", now) == user
+    assert cache.get("token", now + timedelta(minutes=1)) is None
+    assert cache.get_metrics() == {
+        "hits": 1,
+        "misses": 1,
+        "hit_ratio": 0.5,
+        "size": 0,
+    }
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = VerifiedTokenCache(max_size=2)
+    now = TimeStamp.now()
+    expires_at = now + timedelta(minutes=1)
+
+    for i in range(2):
+        cache.put(f"token-{i}", User(id=i, email=f"user{i}@example.com"), expires_at)
+    cache.get("token-0", now)
+    cache.put("token-2", User(id=2, email="user2@example.com"), expires_at)
+
+    assert cache.get("token-0", now) is not None
+    assert cache.get("token-1", now) is None
+
+
+def test_entries_of_user_are_discarded_after_evictions():
+    cache = VerifiedTokenCache(max_size=3)
+    now = TimeStamp.now()
+    expires_at = now + timedelta(minutes=1)
+    user = User(id=1, email="user@example.com")
+    other_user = User(id=2, email="other@example.com")
+
+    for i in range(3):
+        cache.put(f"token-{i}", user, expires_at)
+    # Evicts the oldest token of the user
+    cache.put("other-token", other_user, expires_at)
+    # The same token of another user
+    cache.put("token-2", other_user, expires_at)
+
+    cache.discard_user(user.id)
+
+    assert cache.get("token-1", now) is None
+    assert cache.get("token-2", now) == other_user
+    assert cache.get("other-token", now) == other_user
+    assert cache.get_metrics()["size"] == 2
+
+
+def test_entries_of_user_are_dropped_on_logout():
+    async def run():
+        repo = InMemoryAuthRepo()
+        cache = VerifiedTokenCache()
+        user = await repo.upsert_user("user@example.com")
+        other_user = await repo.upsert_user("other@example.com")
+
+        access_token, refresh_token_info = await login_user(user.id, repo)
+        other_access_token, _ = await login_user(other_user.id, repo)
+        await authorize_user(access_token, repo, cache)
+        await authorize_user(other_access_token, repo, cache)
+
+        await logout_user_by_refresh_token(refresh_token_info.token, repo, cache)
+
+        now = TimeStamp.now()
+        assert cache.get(access_token, now) is None
+        assert cache.get(other_access_token, now) == other_user
+
+    asyncio.run(run())